@@ -0,0 +1 @@
+"""Замеры производительности телефонного справочника."""
@@ -0,0 +1,127 @@
+"""
+Запуск замеров справочника с выводом результатов в JSON.
+
+Каждый сценарий выполняется на свежей копии синтетического справочника: сначала замеряется время,
+затем (на новой копии) пиковый объем выделенной памяти через tracemalloc. Сгенерированные справочники
+кэшируются в каталоге данных, поэтому повторные запуски используют те же файлы.
+
+Примеры запуска из корня проекта:
+    python -m benchmarks --size 10k --output results.json
+    python -m benchmarks --size 1m --scenario quick_search --scenario precise_search
+    python -m benchmarks --size 10k --compare results.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from benchmarks.generator import DEFAULT_DATA_DIR, dataset, parse_size
+from benchmarks.scenarios import SCENARIOS
+from contacts_storage import close_stores
+
+
+def run_scenario(name: str, source: str, rows: int, memory: bool) -> Dict:
+    """Выполняет сценарий на свежих копиях справочника и возвращает результат замера."""
+    prepare = SCENARIOS[name]
+    result = {'scenario': name, 'rows': rows}
+
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w') as devnull:
+        path = shutil.copy(source, os.path.join(workdir, 'contacts.csv'))
+        close_stores()
+        with contextlib.redirect_stdout(devnull):
+            run = prepare(path, rows)
+            gc.collect()
+            started = time.perf_counter()
+            result.update(run())
+            result['seconds'] = time.perf_counter() - started
+        close_stores()
+
+    if memory:
+        with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w') as devnull:
+            path = shutil.copy(source, os.path.join(workdir, 'contacts.csv'))
+            close_stores()
+            with contextlib.redirect_stdout(devnull):
+                run = prepare(path, rows)
+                gc.collect()
+                tracemalloc.start()
+                run()
+                result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            close_stores()
+    return result
+
+
+def git_commit() -> Optional[str]:
+    """Текущий коммит репозитория, если он доступен."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: List[Dict], previous_path: str) -> None:
+    """Печатает отношение времени и памяти к результатам предыдущего запуска."""
+    with open(previous_path, 'r', encoding='utf-8') as file:
+        previous = {(item['scenario'], item['rows']): item for item in json.load(file)['results']}
+    print(f"{'сценарий':<24} {'время':>10} {'было':>10} {'x':>7} {'память':>7}", file=sys.stderr)
+    for item in current:
+        before = previous.get((item['scenario'], item['rows']))
+        if before is None:
+            continue
+        time_ratio = item['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        memory_ratio = ''
+        if item.get('peak_memory_bytes') and before.get('peak_memory_bytes'):
+            memory_ratio = f"{item['peak_memory_bytes'] / before['peak_memory_bytes']:.2f}"
+        print(f"{item['scenario']:<24} {item['seconds']:>10.4f} {before['seconds']:>10.4f} {time_ratio:>7.2f} "
+              f"{memory_ratio:>7}", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', action='append', help="Размер справочника: 10k, 1m, 10m или число (можно несколько)")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='Сценарий (по умолчанию все)')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора данных')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Каталог для сгенерированных справочников')
+    parser.add_argument('--no-memory', action='store_true', help='Не замерять пиковую память')
+    parser.add_argument('--output', help='Файл для результатов в JSON (по умолчанию stdout)')
+    parser.add_argument('--compare', help='JSON предыдущего запуска для сравнения')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.size or ['10k']:
+        rows = parse_size(size)
+        source = dataset(args.data_dir, rows, args.seed)
+        for name in args.scenario or list(SCENARIOS):
+            result = run_scenario(name, source, rows, not args.no_memory)
+            print(f"{name:<24} {rows:>10} {result['seconds']:>10.4f} с", file=sys.stderr)
+            results.append(result)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Детерминированный генератор синтетического телефонного справочника.
+
+Записи имеют те же семь полей, что и contacts.csv: фамилия, имя и отчество согласованы по полу,
+организации составлены из организационно-правовой формы и названия, телефоны - московские рабочие
+и мобильные номера в формате +7XXXXXXXXXX. При одинаковых seed и количестве записей файл получается
+побайтно одинаковым, поэтому результаты замеров разных коммитов сопоставимы.
+
+Запуск из корня проекта:
+    python -m benchmarks.generator --size 1m --output phonebook.csv
+"""
+import argparse
+import os
+import random
+from typing import Iterator, List, Tuple
+
+from contacts_store import HEADER
+
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+
+SURNAME_STEMS = ['Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов', 'Михайлов',
+                 'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семенов', 'Егоров', 'Павлов',
+                 'Козлов', 'Степанов', 'Николаев', 'Орлов', 'Андреев', 'Макаров', 'Никитин', 'Захаров', 'Зайцев',
+                 'Соловьев', 'Борисов', 'Яковлев', 'Григорьев', 'Романов', 'Воробьев', 'Сергеев', 'Кузьмин',
+                 'Фролов', 'Александров', 'Дмитриев', 'Королев', 'Гусев', 'Киселев', 'Ильин', 'Максимов',
+                 'Поляков', 'Сорокин', 'Виноградов', 'Ковалев', 'Белов', 'Медведев', 'Антонов', 'Тарасов']
+MALE_NAMES = ['Александр', 'Алексей', 'Андрей', 'Антон', 'Борис', 'Василий', 'Виктор', 'Владимир', 'Дмитрий',
+              'Евгений', 'Иван', 'Игорь', 'Константин', 'Максим', 'Михаил', 'Николай', 'Олег', 'Павел', 'Петр',
+              'Роман', 'Сергей', 'Федор', 'Юрий']
+FEMALE_NAMES = ['Анна', 'Валентина', 'Галина', 'Дарья', 'Екатерина', 'Елена', 'Ирина', 'Людмила', 'Мария',
+                'Наталья', 'Ольга', 'Светлана', 'Татьяна', 'Юлия']
+# Отчество в мужской и женской форме по имени отца
+PATRONYMICS = [('Александрович', 'Александровна'), ('Алексеевич', 'Алексеевна'), ('Андреевич', 'Андреевна'),
+               ('Борисович', 'Борисовна'), ('Васильевич', 'Васильевна'), ('Викторович', 'Викторовна'),
+               ('Владимирович', 'Владимировна'), ('Дмитриевич', 'Дмитриевна'), ('Иванович', 'Ивановна'),
+               ('Игоревич', 'Игоревна'), ('Михайлович', 'Михайловна'), ('Николаевич', 'Николаевна'),
+               ('Олегович', 'Олеговна'), ('Павлович', 'Павловна'), ('Петрович', 'Петровна'),
+               ('Сергеевич', 'Сергеевна'), ('Федорович', 'Федоровна'), ('Юрьевич', 'Юрьевна')]
+LEGAL_FORMS = ['ООО', 'ЗАО', 'ПАО', 'АО', 'ИП']
+COMPANY_NAMES = ['Рога и Копыта', 'Стройка', 'Газпром', 'Техно', 'Восток', 'Сибирь', 'Ростелеком', 'Югра-М',
+                 'Север', 'Альфа', 'Вектор', 'Меридиан', 'Гарант', 'Прогресс', 'Импульс', 'Феникс', 'Орион',
+                 'Логистик', 'СтройИнвест', 'Медиа Групп']
+WORK_PREFIXES = ['495', '499']
+MOBILE_PREFIXES = ['903', '905', '909', '915', '916', '925', '926', '977', '985']
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+
+
+def generate_rows(rows: int, seed: int = 0) -> Iterator[List[str]]:
+    """
+    Лениво генерирует записи справочника.
+
+    Args:
+        rows (int): Количество записей.
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Yields:
+        List[str]: Значения полей записи в порядке contacts_record.FIELDS; ID начинаются с 1.
+    """
+    rng = random.Random(seed)
+    organizations = [f'{form} "{name}"' for form in LEGAL_FORMS for name in COMPANY_NAMES]
+    for contact_id in range(1, rows + 1):
+        male = rng.random() < 0.55
+        surname = rng.choice(SURNAME_STEMS)
+        patronymic = rng.choice(PATRONYMICS)[0 if male else 1]
+        yield [str(contact_id),
+               surname if male else surname + 'а',
+               rng.choice(MALE_NAMES if male else FEMALE_NAMES),
+               patronymic,
+               rng.choice(organizations),
+               f'+7{rng.choice(WORK_PREFIXES)}{rng.randrange(10 ** 7):07d}',
+               f'+7{rng.choice(MOBILE_PREFIXES)}{rng.randrange(10 ** 7):07d}']
+
+
+def generate_lines(rows: int, seed: int = 0) -> List[str]:
+    """
+    Возвращает строки файла справочника без заголовка.
+
+    Args:
+        rows (int): Количество записей.
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Returns:
+        List[str]: Строки записей без перевода строки.
+    """
+    return [','.join(row) for row in generate_rows(rows, seed)]
+
+
+def write_phonebook(path: str, rows: int, seed: int = 0) -> Tuple[str, int]:
+    """
+    Записывает файл справочника, не держа все записи в памяти.
+
+    Args:
+        path (str): Путь к создаваемому файлу.
+        rows (int): Количество записей.
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Returns:
+        Tuple[str, int]: Путь к файлу и количество записей.
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(HEADER + '\n')
+        batch = []
+        for row in generate_rows(rows, seed):
+            batch.append(','.join(row) + '\n')
+            if len(batch) >= 10_000:
+                file.writelines(batch)
+                batch.clear()
+        file.writelines(batch)
+    return path, rows
+
+
+def parse_size(size: str) -> int:
+    """
+    Переводит размер справочника ('10k', '1m', '10m' или число) в количество записей.
+
+    Args:
+        size (str): Размер.
+
+    Returns:
+        int: Количество записей.
+    """
+    return SIZES[size.lower()] if size.lower() in SIZES else int(size)
+
+
+def dataset(data_dir: str, rows: int, seed: int) -> str:
+    """Возвращает путь к справочнику нужного размера, генерируя его при первом обращении."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'phonebook-{rows}-{seed}.csv')
+    if not os.path.exists(path):
+        write_phonebook(path + '.tmp', rows, seed)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='10k', help="Количество записей: 10k, 1m, 10m или число")
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора')
+    parser.add_argument('--output', required=True, help='Путь к создаваемому файлу')
+    args = parser.parse_args()
+    write_phonebook(args.output, parse_size(args.size), args.seed)
+
+
+if __name__ == '__main__':
+    main()
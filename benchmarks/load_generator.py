@@ -0,0 +1,202 @@
+"""
+Нагрузочный клиент для сервера запросов (contacts_server).
+
+Открывает заданное количество одновременных соединений; каждое отправляет запросы конвейером, держа
+не более --depth неотвеченных запросов. Запросы - смесь поиска, постраничного вывода, выборки по ID
+и поиска по телефону. Задержка запроса измеряется от отправки до получения ответа; в JSON выводятся
+пропускная способность и перцентили задержки p50, p90 и p99.
+
+Если указан --size, сервер запускается отдельным процессом на копии сгенерированного справочника
+и Unix-сокете во временном каталоге; иначе клиент подключается к уже запущенному серверу.
+
+Запуск из корня проекта:
+    python -m benchmarks.load_generator --size 1m --clients 1000 --depth 8
+    python -m benchmarks.load_generator --port 8765 --clients 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from benchmarks.generator import DEFAULT_DATA_DIR, dataset, parse_size
+from benchmarks.scenarios import PRECISE_SEARCH_CRITERIA, QUICK_SEARCH_TERMS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PHONES = ['+7 (916) 123-45-67', '4567', '89031234567', '+74951234567']
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_requests(count: int, rows: int, rng: random.Random) -> List[Dict]:
+    """Составляет последовательность запросов одного клиента."""
+    requests = []
+    for request_id in range(count):
+        kind = rng.random()
+        if kind < 0.3:
+            request = {'op': 'quick_search', 'term': rng.choice(QUICK_SEARCH_TERMS), 'limit': 20}
+        elif kind < 0.5:
+            request = {'op': 'precise_search', 'criteria': rng.choice(PRECISE_SEARCH_CRITERIA), 'limit': 20}
+        elif kind < 0.6:
+            request = {'op': 'reverse_lookup', 'phone': rng.choice(PHONES), 'limit': 20}
+        elif kind < 0.8:
+            request = {'op': 'page', 'page': rng.randint(1, max(rows // 20, 1)), 'per_page': 20}
+        elif kind < 0.95:
+            request = {'op': 'get', 'contact_id': rng.randint(1, max(rows, 1))}
+        else:
+            request = {'op': 'count'}
+        request['id'] = request_id
+        requests.append(request)
+    return requests
+
+
+async def run_client(connect, requests: List[Dict], depth: int, latencies: List[float]) -> int:
+    """Отправляет запросы конвейером и возвращает количество ответов с ошибкой."""
+    reader, writer = await connect()
+    sent_at = deque()
+    window = asyncio.Semaphore(depth)
+    errors = 0
+
+    async def send() -> None:
+        for request in requests:
+            await window.acquire()
+            sent_at.append(time.perf_counter())
+            writer.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    sender = asyncio.ensure_future(send())
+    try:
+        for _ in requests:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Сервер закрыл соединение")
+            latencies.append(time.perf_counter() - sent_at.popleft())
+            window.release()
+            if not json.loads(line)['ok']:
+                errors += 1
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return errors
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Перцентиль по отсортированному списку (ближайший ранг)."""
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+async def run_load(connect, clients: int, depth: int, per_client: int, rows: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    workloads = [make_requests(per_client, rows, random.Random(rng.random())) for _ in range(clients)]
+    latencies: List[float] = []
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_client(connect, requests, depth, latencies) for requests in workloads),
+                                   return_exceptions=True)
+    seconds = time.perf_counter() - started
+    failed = [result for result in results if isinstance(result, BaseException)]
+    latencies.sort()
+    report = {
+        'clients': clients,
+        'depth': depth,
+        'requests': len(latencies),
+        'errors': sum(result for result in results if isinstance(result, int)),
+        'failed_clients': len(failed),
+        'seconds': seconds,
+        'throughput': len(latencies) / seconds if seconds else 0.0,
+    }
+    if latencies:
+        report.update({f'p{int(fraction * 100)}_ms': percentile(latencies, fraction) * 1000
+                       for fraction in (0.5, 0.9, 0.99)})
+        report['max_ms'] = latencies[-1] * 1000
+    if failed:
+        report['first_failure'] = repr(failed[0])
+    return report
+
+
+def raise_open_files_limit(needed: int) -> None:
+    # Каждому соединению нужен дескриптор; мягкий предел поднимается до жесткого, если его не хватает
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def start_server(path: str, socket_path: str) -> subprocess.Popen:
+    """Запускает сервер отдельным процессом и ждет появления сокета."""
+    code = ('import sys\nfrom contacts_server import run_server\n'
+            'run_server(sys.argv[1], unix_path=sys.argv[2])')
+    process = subprocess.Popen([sys.executable, '-c', code, path, socket_path], cwd=PROJECT_DIR,
+                               stdout=subprocess.DEVNULL)
+    while not os.path.exists(socket_path):
+        if process.poll() is not None:
+            raise RuntimeError("Сервер завершился при запуске")
+        time.sleep(0.05)
+    return process
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес сервера')
+    parser.add_argument('--port', type=int, default=8765, help='Порт сервера')
+    parser.add_argument('--unix', help='Путь к Unix-сокету сервера')
+    parser.add_argument('--size', help='Запустить свой сервер на справочнике этого размера: 10k, 1m, 10m или число')
+    parser.add_argument('--rows', type=int, default=10_000,
+                        help='Количество записей на внешнем сервере (для выбора страниц и ID)')
+    parser.add_argument('--clients', type=int, default=1000, help='Количество одновременных соединений')
+    parser.add_argument('--depth', type=int, default=4, help='Неотвеченных запросов на соединение')
+    parser.add_argument('--requests', type=int, default=100, help='Запросов на соединение')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Каталог для сгенерированных справочников')
+    args = parser.parse_args()
+
+    raise_open_files_limit(args.clients + 256)
+    server: Optional[subprocess.Popen] = None
+    workdir = None
+    rows = args.rows
+    socket_path = args.unix
+    try:
+        if args.size:
+            rows = parse_size(args.size)
+            # Сервер работает с копией, чтобы его служебные файлы не смешивались с кэшем справочников
+            workdir = tempfile.mkdtemp(prefix='load-')
+            path = os.path.join(workdir, 'contacts.csv')
+            shutil.copyfile(dataset(args.data_dir, rows, args.seed), path)
+            socket_path = os.path.join(workdir, 'server.sock')
+            print(f"Запуск сервера на {rows} записях...", file=sys.stderr)
+            server = start_server(path, socket_path)
+
+        if socket_path:
+            def connect():
+                return asyncio.open_unix_connection(socket_path, limit=1 << 20)
+        else:
+            def connect():
+                return asyncio.open_connection(args.host, args.port, limit=1 << 20)
+
+        report = asyncio.run(run_load(connect, args.clients, args.depth, args.requests, rows, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report['rows'] = rows
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
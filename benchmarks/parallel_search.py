@@ -0,0 +1,70 @@
+"""
+Масштабирование параллельного поиска (contacts_parallel) по количеству процессов.
+
+Для каждого количества процессов выполняются те же запросы, что в сценариях quick_search и precise_search,
+и время сравнивается с однопоточным перебором файла в хранилище без индекса триграмм. Результаты
+выводятся в JSON.
+
+Запуск из корня проекта:
+    python -m benchmarks.parallel_search --size 1m --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict
+
+import contacts_parallel
+from benchmarks.generator import DEFAULT_DATA_DIR, dataset, parse_size
+from benchmarks.scenarios import PRECISE_SEARCH_CRITERIA, QUICK_SEARCH_TERMS
+from contacts_store import ContactStore
+
+
+def timed(run: Callable[[], int]) -> Dict:
+    """Выполняет запросы и возвращает время и количество найденных записей."""
+    started = time.perf_counter()
+    found = run()
+    return {'seconds': time.perf_counter() - started, 'found': found}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='1m', help="Размер справочника: 10k, 1m, 10m или число")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1],
+                        help='Количество процессов')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора данных')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Каталог для сгенерированных справочников')
+    args = parser.parse_args()
+
+    rows = parse_size(args.size)
+    path = dataset(args.data_dir, rows, args.seed)
+
+    def single() -> int:
+        # Хранилище без индекса: загрузка файла и полный перебор, как при поиске без параллельного режима
+        store = ContactStore(path, trigram_index=False)
+        return sum(len(store.quick_search(term)) for term in QUICK_SEARCH_TERMS) + \
+            sum(len(store.precise_search(**criteria)) for criteria in PRECISE_SEARCH_CRITERIA)
+
+    results = [dict(workers=0, **timed(single))]
+    print(f"{'хранилище':<12} {results[0]['seconds']:10.3f} с", file=sys.stderr)
+    for workers in sorted(set(args.workers)):
+        def parallel() -> int:
+            quick = sum(sum(1 for _ in contacts_parallel.iter_quick_search(path, term, workers))
+                        for term in QUICK_SEARCH_TERMS)
+            return quick + sum(sum(1 for _ in contacts_parallel.iter_precise_search(path, criteria, workers))
+                               for criteria in PRECISE_SEARCH_CRITERIA)
+
+        result = dict(workers=workers, **timed(parallel))
+        result['speedup'] = results[0]['seconds'] / result['seconds']
+        results.append(result)
+        print(f"{workers:<12} {result['seconds']:10.3f} с  x{result['speedup']:.2f}", file=sys.stderr)
+        if result['found'] != results[0]['found']:
+            print(f"Расхождение результатов: {result['found']} вместо {results[0]['found']}", file=sys.stderr)
+
+    json.dump({'rows': rows, 'cpu_count': os.cpu_count(), 'results': results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
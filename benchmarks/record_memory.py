@@ -0,0 +1,47 @@
+"""
+Сравнение памяти, занимаемой записями контактов в виде словарей и в виде Contact.
+
+Запуск из корня проекта:
+    python -m benchmarks.record_memory --rows 1000000
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.generator import generate_lines
+from contacts_record import FIELDS, Contact
+
+
+def measure(lines: List[str], build: Callable[[List[str]], object]) -> int:
+    """Возвращает объем памяти в байтах, который занимают записи, построенные из строк."""
+    gc.collect()
+    tracemalloc.start()
+    records = build(lines)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Количество записей')
+    args = parser.parse_args()
+
+    lines = generate_lines(args.rows)
+    variants = {
+        'dict': lambda data: [dict(zip(FIELDS, line.split(','))) for line in data],
+        'Contact': lambda data: [Contact(*line.split(','), intern=False) for line in data],
+        'Contact + intern': lambda data: [Contact(*line.split(',')) for line in data],
+    }
+    baseline = None
+    for name, build in variants.items():
+        size = measure(lines, build)
+        baseline = baseline or size
+        print(f"{name:<18} {size / 2 ** 20:10.1f} МБ  {size / args.rows:7.1f} байт/запись  "
+              f"{size / baseline:6.1%} от dict")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Сценарии замеров основных операций справочника.
+
+Каждый сценарий состоит из подготовки, которая не входит в замер (например, загрузка хранилища
+перед поиском), и замеряемой части. Подготовка получает путь к свежей копии справочника
+и возвращает функцию замеряемой части; та возвращает словарь с дополнительными сведениями
+(количество найденных записей и т. п.).
+"""
+import random
+from typing import Callable, Dict, List
+
+from benchmarks.generator import generate_rows, write_phonebook
+from contacts_delete import delete_contact, delete_matching
+from contacts_display import display_contacts, read_contacts
+from contacts_import import import_contacts
+from contacts_manage import add_contact, organize_contacts
+from contacts_search import fuzzy_search, precise_search, quick_search, reverse_lookup
+from contacts_record import FIELDS
+from contacts_storage import close_stores, count_contacts, get_store
+
+Run = Callable[[], Dict]
+Prepare = Callable[[str, int], Run]
+
+QUICK_SEARCH_TERMS = ['Иванов', 'петр', 'ООО "Газ', '+7916', 'овна', 'Стройка', 'Сергеевич', 'xyz']
+PRECISE_SEARCH_CRITERIA = [
+    {'Фамилия': '^Иванов'},
+    {'Фамилия': '^Смирнова$', 'Имя': '^Анна$'},
+    {'Организация': '.*Рога и Копыта.*'},
+    {'ID': '12345'},
+    {'Рабочий телефон': r'^\+7495\d{3}00'},
+    {'Имя': 'р.й', 'Отчество': 'вна$'},
+]
+FUZZY_SEARCH_TERMS = ['Васильэв', 'Vasiliev', 'Кузнецоф', 'Smirnova Anna', 'Сергеевичь', 'Shchukin']
+
+
+def _warm(path: str) -> None:
+    len(get_store(path))
+
+
+def read_cold(path: str, rows: int) -> Run:
+    """read_contacts на файле без служебных файлов и загруженного хранилища."""
+    return lambda: {'records': len(read_contacts(path))}
+
+
+def load_store(path: str, rows: int) -> Run:
+    """Первая загрузка хранилища: разбор файла, построение снимка и индекса триграмм."""
+    return lambda: {'records': len(get_store(path))}
+
+
+def load_store_snapshot(path: str, rows: int) -> Run:
+    """Повторная загрузка хранилища в новом процессе, когда снимок и индексы уже построены."""
+    _warm(path)
+    close_stores()
+    return lambda: {'records': len(get_store(path))}
+
+
+def count_banner(path: str, rows: int) -> Run:
+    """Подсчет записей для приветствия по заголовку снимка."""
+    _warm(path)
+    close_stores()
+    return lambda: {'records': count_contacts(path)}
+
+
+def quick_search_warm(path: str, rows: int) -> Run:
+    """Быстрый поиск по набору фрагментов в загруженном хранилище."""
+    _warm(path)
+    return lambda: {'queries': len(QUICK_SEARCH_TERMS),
+                    'found': sum(len(quick_search(path, term)) for term in QUICK_SEARCH_TERMS)}
+
+
+def precise_search_warm(path: str, rows: int) -> Run:
+    """Фильтрация по регулярным выражениям в загруженном хранилище."""
+    _warm(path)
+    return lambda: {'queries': len(PRECISE_SEARCH_CRITERIA),
+                    'found': sum(len(precise_search(path, **criteria)) for criteria in PRECISE_SEARCH_CRITERIA)}
+
+
+def fuzzy_search_warm(path: str, rows: int) -> Run:
+    """Нечеткий поиск по ФИО с опечатками и латиницей; индекс строится при подготовке."""
+    _warm(path)
+    fuzzy_search(path, FUZZY_SEARCH_TERMS[0])
+    return lambda: {'queries': len(FUZZY_SEARCH_TERMS),
+                    'found': sum(len(fuzzy_search(path, term)) for term in FUZZY_SEARCH_TERMS)}
+
+
+def reverse_lookup_warm(path: str, rows: int) -> Run:
+    """Поиск по номеру телефона (в другой записи) и по последним цифрам номера в загруженном хранилище."""
+    _warm(path)
+    sample = get_store(path).slice(0, 1000)
+    phones = [f"8 ({contact.work_phone[2:5]}) {contact.work_phone[5:]}" for contact in sample]
+    suffixes = [contact.personal_phone[-6:] for contact in sample]
+    return lambda: {'queries': len(phones) + len(suffixes),
+                    'found': sum(len(reverse_lookup(path, phone)) for phone in phones + suffixes)}
+
+
+def add_bulk(path: str, rows: int) -> Run:
+    """Пакетное добавление: новые записи, дубликаты существующих и повторы внутри пакета."""
+    _warm(path)
+    batch_size = max(100, min(10_000, rows // 10))
+    rng = random.Random(1)
+    existing = [dict(contact) for contact in get_store(path).slice(0, batch_size)]
+    fresh = [dict(zip(FIELDS, row)) for row in generate_rows(batch_size, seed=rows + 1)]
+    batch: List[Dict[str, str]] = []
+    for contact in fresh:
+        roll = rng.random()
+        source = rng.choice(existing) if roll < 0.1 else rng.choice(batch) if roll < 0.15 and batch else contact
+        batch.append({key: value for key, value in source.items() if key != 'ID'})
+    return lambda: {'batch': len(batch), 'added': _add(path, batch)}
+
+
+def _add(path: str, batch: List[Dict[str, str]]) -> int:
+    before = len(get_store(path))
+    add_contact(path, batch)
+    return len(get_store(path)) - before
+
+
+def import_file(path: str, rows: int) -> Run:
+    """Импорт файла CSV размером в половину справочника; часть записей совпадает с существующими."""
+    _warm(path)
+    source = path + '.import.csv'
+    write_phonebook(source, rows // 2, seed=0)  # Те же данные, что в начале справочника, - дубликаты
+    with open(source, 'a', encoding='utf-8') as file:
+        file.writelines(','.join(row) + '\n' for row in generate_rows(rows // 2, seed=rows + 2))
+
+    def run() -> Dict:
+        report = import_contacts(path, source)
+        return {'read': report.rows, 'added': report.added, 'duplicates': report.duplicates,
+                'rejected': report.rejected}
+
+    return run
+
+
+def delete_by_ids(path: str, rows: int) -> Run:
+    """Удаление пакета случайных ID одним вызовом и серии одиночных удалений."""
+    _warm(path)
+    rng = random.Random(2)
+    batch = [str(rng.randint(1, rows)) for _ in range(min(1000, rows // 10))]
+    singles = [str(rng.randint(1, rows)) for _ in range(100)]
+
+    def run() -> Dict:
+        delete_contact(path, batch)
+        for contact_id in singles:
+            delete_contact(path, [contact_id])
+        return {'batch': len(batch), 'singles': len(singles)}
+
+    return run
+
+
+def delete_streaming(path: str, rows: int) -> Run:
+    """Удаление пакета ID и удаление по регулярному выражению потоковой перезаписью незагруженного файла."""
+    rng = random.Random(2)
+    batch = [str(rng.randint(1, rows)) for _ in range(min(1000, rows // 10))]
+
+    def run() -> Dict:
+        return {'batch': len(batch), 'deleted': delete_contact(path, batch),
+                'matching': delete_matching(path, Организация='^ИП ')}
+
+    return run
+
+
+def organize(path: str, rows: int) -> Run:
+    """Сортировка справочника с перенумерацией ID."""
+
+    def run() -> Dict:
+        organize_contacts(path)
+        return {'records': rows}
+
+    return run
+
+
+def display_paging(path: str, rows: int) -> Run:
+    """Показ первой, средней и последней страниц по 20 записей (включая построение индекса смещений)."""
+    per_page = 20
+    last_page = -(-rows // per_page)
+
+    def run() -> Dict:
+        for page in (1, last_page // 2 or 1, last_page):
+            display_contacts(path, page, per_page)
+        return {'pages': 3}
+
+    return run
+
+
+def display_paging_warm(path: str, rows: int) -> Run:
+    """Показ страниц при уже построенном индексе смещений."""
+    display_contacts(path, 1, 20)
+    return display_paging(path, rows)
+
+
+SCENARIOS: Dict[str, Prepare] = {
+    'read_contacts': read_cold,
+    'load_store': load_store,
+    'load_store_snapshot': load_store_snapshot,
+    'count_banner': count_banner,
+    'quick_search': quick_search_warm,
+    'precise_search': precise_search_warm,
+    'fuzzy_search': fuzzy_search_warm,
+    'reverse_lookup': reverse_lookup_warm,
+    'add_contact_bulk': add_bulk,
+    'import_contacts': import_file,
+    'delete_contact': delete_by_ids,
+    'delete_contact_streaming': delete_streaming,
+    'organize_contacts': organize,
+    'display_contacts': display_paging,
+    'display_contacts_warm': display_paging_warm,
+}
@@ -0,0 +1,119 @@
+"""
+Время запуска команд main.py.
+
+Каждая команда запускается отдельным процессом интерпретатора несколько раз, как из сценария оболочки;
+замеряется полное время от запуска до завершения. Затем команда запускается еще раз с ``-X importtime``,
+и по его выводу считаются суммарное время импорта, количество загруженных модулей и самые дорогие
+импорты верхнего уровня. Результаты выводятся в JSON.
+
+Запуск из корня проекта:
+    python -m benchmarks.startup --size 10k --repeat 20
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.generator import DEFAULT_DATA_DIR, dataset, parse_size
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(PROJECT_DIR, 'main.py')
+
+COMMANDS = {
+    'help': ['--help'],
+    'count': ['count'],
+    'search': ['search', 'Иванов', '--limit', '10'],
+    'search_fuzzy': ['search', 'Vasiliev', '--fuzzy', '--limit', '10'],
+    'filter': ['filter', 'Фамилия=^Смирнова$', 'Имя=^Анна$'],
+    'page': ['page', '3'],
+}
+TOP_IMPORTS = 10
+
+
+def run(path: str, arguments: List[str], importtime: bool = False) -> subprocess.CompletedProcess:
+    options = ['-X', 'importtime'] if importtime else []
+    return subprocess.run([sys.executable, *options, MAIN, '--file', path, *arguments], cwd=PROJECT_DIR,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+def parse_importtime(stderr: str) -> Dict:
+    """Разбирает вывод -X importtime: суммарное время импорта и самые дорогие модули верхнего уровня."""
+    total_us = 0
+    modules = 0
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        modules += 1
+        # Модули, импортированные непосредственно, выводятся с отступом в один пробел
+        if not name[1:].startswith(' '):
+            top_level.append((int(cumulative_us), name.strip()))
+    top_level.sort(reverse=True)
+    return {
+        'import_ms': total_us / 1000,
+        'modules': modules,
+        'top_imports': [{'module': name, 'cumulative_ms': cumulative / 1000}
+                        for cumulative, name in top_level[:TOP_IMPORTS]],
+    }
+
+
+def _python_startup() -> float:
+    # Время запуска пустого интерпретатора - нижняя граница для любой команды
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'])
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(path: str, arguments: List[str], repeat: int) -> Dict:
+    # Первый запуск строит снимок и индексы, поэтому в замер не входит
+    run(path, arguments)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(path, arguments)
+        times.append((time.perf_counter() - started) * 1000)
+    result = {'median_ms': statistics.median(times), 'min_ms': min(times), 'max_ms': max(times)}
+    result.update(parse_importtime(run(path, arguments, importtime=True).stderr))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='10k', help="Размер справочника: 10k, 1m, 10m или число")
+    parser.add_argument('--command', action='append', choices=sorted(COMMANDS), help='Команда (по умолчанию все)')
+    parser.add_argument('--repeat', type=int, default=10, help='Запусков каждой команды')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора данных')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Каталог для сгенерированных справочников')
+    args = parser.parse_args()
+
+    rows = parse_size(args.size)
+    workdir = tempfile.mkdtemp(prefix='startup-')
+    try:
+        # Команды работают с копией, чтобы снимок и индексы не смешивались с кэшем справочников
+        path = os.path.join(workdir, 'contacts.csv')
+        shutil.copyfile(dataset(args.data_dir, rows, args.seed), path)
+        python_ms = statistics.median(_python_startup() for _ in range(args.repeat))
+        results = []
+        for name in args.command or list(COMMANDS):
+            result = dict(command=name, **measure(path, COMMANDS[name], args.repeat))
+            results.append(result)
+            print(f"{name:<14} {result['median_ms']:8.1f} мс, импорт {result['import_ms']:6.1f} мс, "
+                  f"модулей {result['modules']}", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    json.dump({'rows': rows, 'python': sys.version.split()[0], 'python_startup_ms': python_ms,
+               'results': results}, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == '__main__':
+    main()
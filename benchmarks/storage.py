@@ -0,0 +1,128 @@
+"""
+Сравнение хранилищ справочника: файл CSV в памяти (contacts_store) и база SQLite (contacts_sqlite).
+
+Справочник переносится из CSV в SQLite (время переноса входит в результаты), после чего одни и те же
+операции выполняются в обоих хранилищах: открытие в новом процессе с подсчетом записей, быстрый поиск,
+фильтрация, нечеткий поиск, поиск по телефону, упорядоченная выборка, чтение страниц и записей по ID,
+добавление, изменение и удаление. Количество найденных записей сверяется между хранилищами.
+Результаты и размеры файлов на диске выводятся в JSON.
+
+Запуск из корня проекта:
+    python -m benchmarks.storage --size 1m
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.generator import DEFAULT_DATA_DIR, dataset, parse_size
+from benchmarks.scenarios import FUZZY_SEARCH_TERMS, PRECISE_SEARCH_CRITERIA, QUICK_SEARCH_TERMS
+from contacts_storage import Storage, close_stores, migrate, open_storage
+
+ORDERED_QUERIES = [
+    {'field': 'Фамилия', 'prefix': 'Ва'},
+    {'field': 'Организация', 'equal': ['ООО "Газпром"']},
+    {'field': 'Фамилия', 'equal': ['Смирнова', 'Анна']},
+    {'field': 'ID', 'low': 1000, 'high': 2000},
+]
+SAMPLE = 1000
+WRITES = 100
+
+
+def timed(run: Callable[[], int]) -> Dict:
+    """Выполняет операцию и возвращает время и количество найденных или измененных записей."""
+    started = time.perf_counter()
+    found = run()
+    return {'seconds': time.perf_counter() - started, 'found': found}
+
+
+def operations(store: Storage, rows: int) -> Dict[str, Callable[[], int]]:
+    """Замеряемые операции над хранилищем в порядке выполнения; записи изменяются в последнюю очередь."""
+    rng = random.Random(1)
+    ids = [str(rng.randrange(1, rows + 1)) for _ in range(SAMPLE)]
+    sample = [store.get(contact_id) for contact_id in ids[:WRITES]]
+    phones = [f"8 ({contact.work_phone[2:5]}) {contact.work_phone[5:]}" for contact in sample]
+    suffixes = [contact.personal_phone[-6:] for contact in sample]
+    pages = [rng.randrange(0, max(1, rows - 20)) for _ in range(WRITES)]
+    new_contacts = [{'Фамилия': f'Тестов{number}', 'Имя': 'Тест', 'Отчество': 'Тестович',
+                     'Организация': 'ООО "Замер"', 'Рабочий телефон': '', 'Личный телефон': ''}
+                    for number in range(SAMPLE)]
+    deleted = rng.sample(range(1, rows + 1), WRITES)
+    return {
+        'quick_search': lambda: sum(len(store.quick_search(term)) for term in QUICK_SEARCH_TERMS),
+        'precise_search': lambda: sum(len(store.precise_search(**criteria)) for criteria in PRECISE_SEARCH_CRITERIA),
+        'fuzzy_search_first': lambda: len(store.fuzzy_search(FUZZY_SEARCH_TERMS[0])),
+        'fuzzy_search': lambda: sum(len(store.fuzzy_search(term)) for term in FUZZY_SEARCH_TERMS),
+        'phone_lookup': lambda: sum(len(store.find_by_phone(phone)) for phone in phones) +
+                                sum(len(store.find_by_phone_suffix(digits)) for digits in suffixes),
+        'ordered': lambda: sum(len(store.ordered(**query)) for query in ORDERED_QUERIES),
+        'page': lambda: sum(len(store.slice(start, start + 20)) for start in pages),
+        'get_by_id': lambda: sum(store.get(contact_id) is not None for contact_id in ids),
+        'add': lambda: sum(store.add(new_contacts[start:start + 10])[0] for start in range(0, SAMPLE, 10)),
+        'update': lambda: sum(store.update([contact_id], {'Имя': 'Замер'}) for contact_id in ids[:WRITES]),
+        'delete': lambda: sum(store.delete([str(contact_id)]) for contact_id in deleted),
+    }
+
+
+def disk_size(path: str) -> int:
+    """Размер файла справочника вместе со служебными файлами (снимок, индексы, журнал, WAL)."""
+    directory, name = os.path.split(path)
+    return sum(os.path.getsize(os.path.join(directory, entry)) for entry in os.listdir(directory)
+               if entry == name or entry.startswith(name + '.') or entry.startswith(name + '-'))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='1m', help="Размер справочника: 10k, 1m, 10m или число")
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора данных')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Каталог для сгенерированных справочников')
+    args = parser.parse_args()
+
+    rows = parse_size(args.size)
+    workdir = tempfile.mkdtemp(prefix='storage-')
+    try:
+        paths = {'csv': os.path.join(workdir, 'contacts.csv'), 'sqlite': os.path.join(workdir, 'contacts.db')}
+        shutil.copyfile(dataset(args.data_dir, rows, args.seed), paths['csv'])
+        migration = timed(lambda: migrate(paths['csv'], paths['sqlite']))
+        print(f"{'migrate':<20} {migration['seconds']:10.3f} с", file=sys.stderr)
+        close_stores()
+        # Снимок и индексы CSV строятся при первой загрузке вне замера, чтобы открытие замерялось
+        # как повторный запуск программы
+        warm = open_storage(paths['csv'])
+        len(warm)
+        warm.close()
+        results: List[Dict] = []
+        stores = {}
+        for backend, path in paths.items():
+            stores[backend] = open_storage(path)
+            results.append(dict(operation='open_count', backend=backend, **timed(lambda: len(stores[backend]))))
+        plans = {backend: operations(store, rows) for backend, store in stores.items()}
+        for name in plans['csv']:
+            measured = {}
+            for backend in paths:
+                measured[backend] = dict(operation=name, backend=backend, **timed(plans[backend][name]))
+                results.append(measured[backend])
+            print(f"{name:<20} " + '  '.join(f"{backend} {result['seconds']:8.3f} с"
+                                             for backend, result in measured.items()), file=sys.stderr)
+            if measured['csv']['found'] != measured['sqlite']['found']:
+                print(f"Расхождение результатов {name}: {measured['csv']['found']} и {measured['sqlite']['found']}",
+                      file=sys.stderr)
+        for store in stores.values():
+            store.close()
+        sizes = {backend: disk_size(path) for backend, path in paths.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    json.dump({'rows': rows, 'sqlite': sqlite3.sqlite_version, 'migrate': migration, 'disk_bytes': sizes,
+               'results': results}, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == '__main__':
+    main()
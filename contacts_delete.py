@@ -1,14 +1,36 @@
-from contacts_display import read_contacts
-from contacts_search import quick_search
-from typing import List, Dict
+import os
+from typing import Callable, Dict, Iterable, List
 
+import contacts_metrics
+from contacts_journal import Journal
+from contacts_lock import write_lock
+from contacts_query import compile_query
+from contacts_record import Contact
+from contacts_storage import get_store
+from contacts_store import HEADER, parse_line
+from decorators import instrumented
 
-def prompt_delete_or_refine_search(filename: str, found_contacts: List[Dict[str, str]]) -> None:
+
+def refine_contacts(found_contacts: List[Contact], search_term: str) -> List[Contact]:
+    """
+    Уточняет уже найденные контакты по фрагменту, не перечитывая файл.
+
+    :param found_contacts: Ранее найденные контакты.
+    :param search_term: Фрагмент, который должен содержаться в одном из полей (без учета регистра).
+    :return: Контакты из found_contacts, содержащие фрагмент, в прежнем порядке.
+    """
+    term = search_term.lower()
+    return [contact for contact in found_contacts if any(term in value.lower() for value in contact.values())]
+
+
+def prompt_delete_or_refine_search(filename: str, found_contacts: List[Contact]) -> None:
     """
     Предлагает пользователю удалить найденные контакты или уточнить поиск.
 
+    Уточнение отбирает записи среди уже найденных контактов.
+
     :param filename: Имя файла, из которого будут удаляться контакты.
-    :param found_contacts: Список словарей с найденными контактами.
+    :param found_contacts: Список найденных контактов.
     """
     while True:
         print("Найденные контакты:")
@@ -23,18 +45,18 @@ def prompt_delete_or_refine_search(filename: str, found_contacts: List[Dict[str,
             "или введите уточняющие данные для поиска: ").replace(' ', '').strip().lower()
 
         if response == 'y':
-            delete_contact(filename, [contact['ID'] for contact in found_contacts])
-            print(f"Удалено контактов: {len(found_contacts)}")
+            deleted = delete_contact(filename, [contact['ID'] for contact in found_contacts])
+            print(f"Удалено контактов: {deleted}")
             break
         elif response == 'n':
             break
         elif all(char.isdigit() or char == ',' for char in response):  # Улучшенная проверка ввода
-            ids_to_delete = response.split(',')
-            delete_contact(filename, ids_to_delete)
-            print(f"Удалено контактов: {len(ids_to_delete)}")
+            ids_to_delete = [contact_id for contact_id in response.split(',') if contact_id]
+            deleted = delete_contact(filename, ids_to_delete)
+            print(f"Удалено контактов: {deleted}")
             break
         else:
-            refined_found_contacts = quick_search(filename, response)
+            refined_found_contacts = refine_contacts(found_contacts, response)
             if refined_found_contacts:
                 print(f"Найдено записей: {len(refined_found_contacts)}")
                 found_contacts = refined_found_contacts  # Обновляем список найденных контактов для возможного удаления
@@ -42,19 +64,86 @@ def prompt_delete_or_refine_search(filename: str, found_contacts: List[Dict[str,
                 print("По вашему запросу контакты не найдены. Попробуйте уточнить критерии поиска.")
 
 
-def delete_contact(filename: str, found_contacts_ids: List[str]) -> None:
+def _rewrite_without(filename: str, predicate: Callable[[Contact], bool]) -> int:
+    # Один проход по файлу: строки удаляемых контактов пропускаются, остальные копируются без изменений
+    # во временный файл, который затем атомарно подменяет исходный
+    temp_path = filename + '.tmp'
+    deleted = scanned = 0
+    with open(filename, 'r', encoding='utf-8') as source, open(temp_path, 'w', encoding='utf-8') as target:
+        target.write(next(source, HEADER + '\n'))
+        for line in source:
+            contact = parse_line(line)
+            if contact is None:
+                continue
+            scanned += 1
+            if predicate(contact):
+                deleted += 1
+            else:
+                target.write(line if line.endswith('\n') else line + '\n')
+        target.flush()
+        os.fsync(target.fileno())
+        contacts_metrics.count('rows_scanned', scanned)
+        contacts_metrics.count('bytes_read', os.fstat(source.fileno()).st_size)
+        contacts_metrics.count('bytes_written', os.fstat(target.fileno()).st_size)
+    if deleted:
+        get_store(filename).replace_file(temp_path)
+    else:
+        os.remove(temp_path)
+    return deleted
+
+
+@instrumented()
+def delete_where(filename: str, predicate: Callable[[Contact], bool]) -> int:
     """
-    Удаляет контакты из файла по их идентификаторам.
+    Удаляет за один проход все контакты, для которых predicate возвращает True.
+
+    Если справочник хранится не в файле CSV, уже загружен в хранилище или в журнале есть изменения,
+    удаление выполняется хранилищем; иначе файл переписывается потоком, без загрузки всех контактов
+    в память. Выбор и удаление выполняются под блокировкой записи, чтобы не потерять изменения
+    других процессов.
 
     :param filename: Имя файла, из которого будут удаляться контакты.
-    :param found_contacts_ids: Список идентификаторов контактов для удаления.
+    :param predicate: Условие удаления контакта.
+    :return: Количество удаленных контактов.
     """
-    contacts = read_contacts(filename)
-    contacts_to_keep = [contact for contact in contacts if contact['ID'] not in found_contacts_ids]
+    store = get_store(filename)
+    with write_lock(filename):
+        if not store.flat_file or store.loaded or Journal(filename).size():
+            return store.delete([contact.id for contact in store.iter_contacts() if predicate(contact)])
+        return _rewrite_without(filename, predicate)
 
-    write_contacts(filename, contacts_to_keep)
+
+@instrumented()
+def delete_matching(filename: str, **search_criteria) -> int:
+    """
+    Удаляет контакты, у которых все указанные поля соответствуют регулярным выражениям.
+
+    :param filename: Имя файла, из которого будут удаляться контакты.
+    :param search_criteria: Критерии в том же виде, что и для точного поиска.
+    :return: Количество удаленных контактов.
+    :raises re.error: Если одно из выражений некорректно.
+    """
+    return delete_where(filename, compile_query(search_criteria).matches)
+
+
+@instrumented()
+def delete_contact(filename: str, found_contacts_ids: Iterable[str]) -> int:
+    """
+    Удаляет контакты из файла по их идентификаторам.
+
+    :param filename: Имя файла, из которого будут удаляться контакты.
+    :param found_contacts_ids: Идентификаторы контактов для удаления.
+    :return: Количество удаленных контактов.
+    """
+    store = get_store(filename)
+    with write_lock(filename):
+        if not store.flat_file or store.loaded or Journal(filename).size():
+            return store.delete(found_contacts_ids)
+        ids = set(found_contacts_ids)
+        return _rewrite_without(filename, lambda contact: contact.id in ids) if ids else 0
 
 
+@instrumented()
 def write_contacts(filename: str, contacts: List[Dict[str, str]]) -> None:
     """
     Записывает обновленный список контактов обратно в файл.
@@ -62,9 +151,4 @@ def write_contacts(filename: str, contacts: List[Dict[str, str]]) -> None:
     :param filename: Имя файла для записи.
     :param contacts: Список контактов для записи.
     """
-    with open(filename, 'w', encoding='utf-8') as file:
-        file.write("ID,Фамилия,Имя,Отчество,Организация,Рабочий телефон,Личный телефон\n")  # Заголовок для удобства
-        for contact in contacts:
-            file.write(','.join([str(contact[key]) for key in
-                                 ['ID', 'Фамилия', 'Имя', 'Отчество', 'Организация', 'Рабочий телефон',
-                                  'Личный телефон']]) + '\n')
+    get_store(filename).replace_all(contacts)
@@ -1,7 +1,48 @@
-from typing import List, Dict
+import os
+from typing import Iterator, List, Tuple
 
+import contacts_metrics
+from contacts_journal import Journal
+from contacts_offsets import OffsetIndex
+from contacts_record import Contact
+from contacts_storage import get_store
+from contacts_store import parse_line
+from decorators import instrumented
 
-def read_contacts(filename: str) -> List[Dict[str, str]]:
+
+def iter_contacts(filename: str) -> Iterator[Contact]:
+    """
+    Лениво читает контакты из файла, не загружая весь справочник в память.
+
+    Если справочник хранится не в файле CSV, файл уже загружен в хранилище или в журнале есть
+    неперенесенные изменения, контакты берутся из хранилища.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+
+    Yields:
+        Contact: Контакт (поддерживает доступ к полям как к словарю).
+    """
+    store = get_store(filename)
+    if not store.flat_file or store.loaded or Journal(filename).size():
+        yield from store.iter_contacts()
+        return
+    with open(filename, 'r', encoding='utf-8') as file:
+        contacts_metrics.count('bytes_read', os.fstat(file.fileno()).st_size)
+        next(file, None)  # Пропускаем заголовок файла
+        rows = 0
+        try:
+            for line in file:
+                contact = parse_line(line)
+                if contact is not None:
+                    rows += 1
+                    yield contact
+        finally:
+            contacts_metrics.count('rows_scanned', rows)
+
+
+@instrumented()
+def read_contacts(filename: str) -> List[Contact]:
     """
     Читает контакты из файла и возвращает список словарей, где каждый словарь представляет отдельный контакт.
 
@@ -9,24 +50,46 @@ def read_contacts(filename: str) -> List[Dict[str, str]]:
         filename (str): Путь к файлу с контактами.
 
     Returns:
-        List[Dict[str, str]]: Список контактов, где каждый контакт представлен в виде словаря.
+        List[Contact]: Список контактов, где каждый контакт представлен записью Contact с доступом к полям как к словарю.
     """
-    contacts = []
-    with open(filename, 'r', encoding='utf-8') as file:
-        next(file)  # Пропускаем заголовок файла
-        for line in file:
-            parts = line.strip().split(',')
-            contact_dict = {
-                'ID': parts[0],
-                'Фамилия': parts[1],
-                'Имя': parts[2],
-                'Отчество': parts[3],
-                'Организация': parts[4],
-                'Рабочий телефон': parts[5],
-                'Личный телефон': parts[6],
-            }
-            contacts.append(contact_dict)
-    return contacts
+    return list(iter_contacts(filename))
+
+
+@instrumented()
+def read_page(filename: str, page: int, per_page: int) -> Tuple[List[Contact], int]:
+    """
+    Читает одну страницу контактов.
+
+    Страница читается напрямую из файла по индексу смещений строк, без разбора остальных записей.
+    Если в журнале есть неперенесенные изменения, страница берется из хранилища с наложенным журналом.
+    Справочник, который хранится не в файле CSV, читается постранично средствами своего хранилища.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        page (int): Номер страницы, начиная с 1.
+        per_page (int): Количество контактов на одной странице.
+
+    Returns:
+        Tuple[List[Contact], int]: Контакты страницы (пустой список, если такой страницы нет)
+            и общее количество страниц.
+    """
+    store = get_store(filename)
+    if not store.flat_file or Journal(filename).size():
+        total_records = len(store)
+        read_range = store.slice
+    else:
+        index = OffsetIndex.open(filename)
+        total_records = index.count
+
+        def read_range(start: int, stop: int) -> List[Contact]:
+            return [parse_line(line) for line in index.page(start, stop - start)]
+
+    total_pages = -(-total_records // per_page)  # Округление вверх
+    if page > total_pages or page < 1:
+        return [], total_pages
+    start_index = (page - 1) * per_page
+    end_index = min(start_index + per_page, total_records)
+    return read_range(start_index, end_index), total_pages
 
 
 def display_contacts(filename: str, page: int = 1, per_page: int = 5) -> None:
@@ -41,18 +104,14 @@ def display_contacts(filename: str, page: int = 1, per_page: int = 5) -> None:
     Returns:
         None
     """
-    contacts = read_contacts(filename)
-    total_records = len(contacts)
-    total_pages = -(-total_records // per_page)  # Округление вверх
+    contacts, total_pages = read_page(filename, page, per_page)
 
-    if page > total_pages or page < 1:
+    if not contacts:
         print("Нет такой страницы.")
         return
 
     print(f"\nСтраница {page} из {total_pages}:")
-    start_index = (page - 1) * per_page
-    end_index = min(start_index + per_page, total_records)
 
-    for contact in contacts[start_index:end_index]:
+    for contact in contacts:
         contact_info = ', '.join([f'{key}: {value}' for key, value in contact.items()])
         print(contact_info)
@@ -0,0 +1,376 @@
+"""
+Нечеткий поиск по фамилии, имени и отчеству с учетом опечаток и латинской транслитерации.
+
+Для каждого слова ФИО индекс хранит два ключа: фонетический (упрощенный русский Metaphone: гласные
+сводятся к а/и/у, звонкие согласные оглушаются на конце и перед глухими, мягкий и твердый знаки
+отбрасываются, женские окончания фамилий приводятся к мужским) и транслитерацию латиницей.
+Запрос кириллицей ищется по фонетическому ключу, запрос латиницей - по транслитерации и по
+фонетическому ключу своей записи кириллицей, поэтому «Васильэв» и «Vasiliev» находят «Васильев».
+Кандидаты берутся из индекса по точному совпадению ключа, а также по ключам, отличающимся от
+фонетического ключа запроса одной правкой (замена, вставка, удаление буквы или перестановка соседних):
+для этого ключи индекса раскладываются по вариантам с одной удаленной буквой (соседство удалений),
+и два ключа на расстоянии одной правки всегда имеют общий вариант. Так находятся и опечатки
+в согласных («Васлиьев», «Кузмецов»), которые меняют фонетический ключ. Кандидаты затем
+упорядочиваются по расстоянию Левенштейна с ограничением.
+
+Фонетические ключи записаны кириллицей, транслитерация - латиницей, поэтому оба вида ключей хранятся
+в одном словаре без пересечений.
+
+Индекс сохраняется рядом с файлом (``<файл>.fuzzy``) так же, как индекс телефонов: вхождения только
+добавляются, устаревшие отсеиваются проверкой кандидатов и удаляются при сохранении.
+"""
+import functools
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from contacts_sidecar import load_sidecar, postings_to_positions, postings_to_rowids, save_sidecar
+
+INDEX_VERSION = 1
+
+_WORDS = re.compile(r'[^\W\d_]+')
+
+_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'e', 'ж': 'zh', 'з': 'z', 'и': 'i',
+    'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't',
+    'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '',
+    'э': 'e', 'ю': 'yu', 'я': 'ya',
+}
+# Сочетания латинских букв проверяются от длинных к коротким
+_TO_CYRILLIC = [
+    ('shch', 'щ'), ('sch', 'щ'), ('zh', 'ж'), ('kh', 'х'), ('ts', 'ц'), ('tz', 'ц'), ('ch', 'ч'), ('sh', 'ш'),
+    ('yu', 'ю'), ('ju', 'ю'), ('ya', 'я'), ('ja', 'я'), ('yo', 'ё'), ('jo', 'ё'), ('ye', 'е'), ('je', 'е'),
+    ('ck', 'к'), ('ph', 'ф'), ('x', 'кс'), ('a', 'а'), ('b', 'б'), ('c', 'к'), ('d', 'д'), ('e', 'е'), ('f', 'ф'),
+    ('g', 'г'), ('h', 'х'), ('i', 'и'), ('j', 'й'), ('k', 'к'), ('l', 'л'), ('m', 'м'), ('n', 'н'), ('o', 'о'),
+    ('p', 'п'), ('q', 'к'), ('r', 'р'), ('s', 'с'), ('t', 'т'), ('u', 'у'), ('v', 'в'), ('w', 'в'), ('z', 'з'),
+]
+_VOWELS = 'аеёиоуыэюя'
+_FEMININE_ENDINGS = [('ская', 'ский'), ('цкая', 'цкий'), ('ова', 'ов'), ('ева', 'ев'), ('ина', 'ин'), ('ына', 'ын')]
+_VOWEL_GROUPS = [('йо', 'и'), ('ио', 'и'), ('йе', 'и'), ('ие', 'и')]
+_VOWEL_CLASSES = str.maketrans({'о': 'а', 'ы': 'а', 'я': 'а', 'е': 'и', 'ё': 'и', 'э': 'и', 'й': 'и', 'ю': 'у'})
+_DEVOICED = {'б': 'п', 'в': 'ф', 'г': 'к', 'д': 'т', 'ж': 'ш', 'з': 'с'}
+_VOICELESS = set('пфктшсхцчщ')
+
+# Фонетические ключи короче этой длины ищутся только точно: у коротких ключей соседство удалений
+# совпадает с большей частью справочника
+MIN_NEIGHBOUR_KEY = 3
+
+Postings = Union[int, List[int]]
+
+
+def is_latin(word: str) -> bool:
+    """
+    Проверяет, записано ли слово латиницей.
+
+    Args:
+        word (str): Слово из функции words.
+
+    Returns:
+        bool: True, если в слове только символы ASCII.
+    """
+    return word.isascii()
+
+
+def words(value: str) -> List[str]:
+    """Разбивает значение на слова из букв в нижнем регистре; «ё» заменяется на «е»."""
+    return _WORDS.findall(value.lower().replace('ё', 'е'))
+
+
+def transliterate(word: str) -> str:
+    """
+    Записывает слово кириллицей латиницей (упрощенная схема загранпаспорта, без «ь» и «ъ»).
+
+    Args:
+        word (str): Слово в нижнем регистре.
+
+    Returns:
+        str: Транслитерация; латинские буквы остаются как есть.
+    """
+    return ''.join(_TO_LATIN.get(char, char) for char in word)
+
+
+def to_cyrillic(word: str) -> str:
+    """
+    Записывает латинское слово кириллицей для вычисления фонетического ключа.
+
+    «y» после гласной читается как «й», после согласной в конце слова - как «ий» (Dmitry), иначе как «ы».
+
+    Args:
+        word (str): Слово латиницей в нижнем регистре.
+
+    Returns:
+        str: Слово кириллицей.
+    """
+    result = []
+    position = 0
+    while position < len(word):
+        if word[position] == 'y' and word[position + 1:position + 2] not in ('a', 'e', 'o', 'u'):
+            if result and result[-1] in _VOWELS:
+                result.append('й')
+            else:
+                result.append('ий' if position + 1 == len(word) else 'ы')
+            position += 1
+            continue
+        for latin, cyrillic in _TO_CYRILLIC:
+            if word.startswith(latin, position):
+                result.append(cyrillic)
+                position += len(latin)
+                break
+        else:
+            result.append(word[position])
+            position += 1
+    return ''.join(result)
+
+
+def phonetic_key(word: str) -> str:
+    """
+    Вычисляет фонетический ключ слова кириллицей.
+
+    Args:
+        word (str): Слово в нижнем регистре.
+
+    Returns:
+        str: Ключ, одинаковый для слов, которые звучат похоже («Васильев», «Васильэв», «Василиев»,
+            «Васильева»).
+    """
+    for ending, masculine in _FEMININE_ENDINGS:
+        if word.endswith(ending):
+            word = word[:-len(ending)] + masculine
+            break
+    word = word.replace('ь', '').replace('ъ', '')
+    for group, replacement in _VOWEL_GROUPS:
+        word = word.replace(group, replacement)
+    word = word.translate(_VOWEL_CLASSES).replace('тс', 'ц').replace('дс', 'ц')
+    chars = list(word)
+    for position, char in enumerate(chars):
+        if char in _DEVOICED and (position + 1 == len(chars) or chars[position + 1] in _VOICELESS):
+            chars[position] = _DEVOICED[char]
+    key = []
+    for char in chars:
+        if not key or key[-1] != char:
+            key.append(char)
+    return ''.join(key)
+
+
+@functools.lru_cache(maxsize=65536)
+def word_keys(word: str) -> Tuple[str, str]:
+    """
+    Возвращает ключи индекса, по которым ищется слово.
+
+    Args:
+        word (str): Слово из функции words.
+
+    Returns:
+        Tuple[str, str]: Фонетический ключ и транслитерация латиницей.
+    """
+    # Ключи кэшируются: в справочнике мало различных фамилий, имен и отчеств
+    if is_latin(word):
+        return phonetic_key(to_cyrillic(word)), word
+    return phonetic_key(word), transliterate(word)
+
+
+def deletions(key: str) -> Set[str]:
+    """
+    Возвращает соседство удалений ключа: сам ключ и варианты с одной удаленной буквой.
+
+    Если два ключа отличаются одной заменой, вставкой, удалением или перестановкой соседних букв,
+    их соседства пересекаются.
+
+    Args:
+        key (str): Ключ индекса.
+
+    Returns:
+        Set[str]: Варианты ключа.
+    """
+    return {key} | {key[:position] + key[position + 1:] for position in range(len(key))}
+
+
+def bounded_levenshtein(first: str, second: str, limit: int) -> int:
+    """
+    Вычисляет расстояние Левенштейна, прекращая счет, когда оно заведомо больше limit.
+
+    Args:
+        first (str): Первая строка.
+        second (str): Вторая строка.
+        limit (int): Наибольшее интересующее расстояние.
+
+    Returns:
+        int: Расстояние или limit + 1, если оно больше limit.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    if len(first) > len(second):
+        first, second = second, first
+    previous = list(range(len(first) + 1))
+    for row, char in enumerate(second, start=1):
+        current = [row]
+        for column, other in enumerate(first, start=1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (char != other)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def default_distance(word: str) -> int:
+    """Допустимое количество опечаток в слове запроса: одна на каждые три буквы, но не меньше одной."""
+    return max(1, len(word) // 3)
+
+
+def rank(query: List[str], candidates: Iterable[Tuple[int, Mapping[str, str]]],
+         max_distance: Optional[int] = None) -> List[Mapping[str, str]]:
+    """
+    Отбирает и упорядочивает кандидатов нечеткого поиска.
+
+    Каждое слово запроса должно быть не дальше допустимого расстояния от одного из слов ФИО кандидата
+    (для латинского слова запроса - от транслитерации слова ФИО).
+
+    Args:
+        query (List[str]): Слова запроса из функции words.
+        candidates (Iterable[Tuple[int, Mapping[str, str]]]): Пары (номер строки, контакт) в порядке следования.
+        max_distance (Optional[int]): Наибольшее расстояние для одного слова; по умолчанию default_distance.
+
+    Returns:
+        List[Mapping[str, str]]: Подходящие контакты по возрастанию суммарного расстояния, при равенстве -
+            в порядке номеров строк.
+    """
+    # Расстояние до одного и того же слова ФИО считается один раз: кандидаты часто разделяют фамилии и имена
+    distances: Dict[Tuple[str, str], int] = {}
+    ranked = []
+    for rowid, contact in candidates:
+        candidate_words = words(' '.join((contact['Фамилия'], contact['Имя'], contact['Отчество'])))
+        total = 0
+        for word in query:
+            limit = default_distance(word) if max_distance is None else max_distance
+            best = limit + 1
+            for candidate in candidate_words:
+                if is_latin(word):
+                    candidate = transliterate(candidate)
+                distance = distances.get((word, candidate))
+                if distance is None:
+                    distance = distances[word, candidate] = bounded_levenshtein(word, candidate, limit)
+                best = min(best, distance)
+            if best > limit:
+                break
+            total += best
+        else:
+            ranked.append((total, rowid, contact))
+    ranked.sort(key=lambda item: item[:2])
+    return [contact for _, _, contact in ranked]
+
+
+class FuzzyIndex:
+    """
+    Индекс ключ слова ФИО -> номера строк хранилища контактов.
+
+    Для большинства ключей хранится список номеров строк, для редких - один номер. Соседство удалений
+    фонетических ключей (вариант -> ключи) строится при первом поиске и не сохраняется: различных ключей
+    в справочнике намного меньше, чем записей.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Postings] = {}
+        self._neighbours: Optional[Dict[str, Set[str]]] = None
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def add(self, rowid: int, values: Iterable[str]) -> None:
+        """
+        Добавляет в индекс ключи слов записи.
+
+        Args:
+            rowid (int): Номер строки в хранилище.
+            values (Iterable[str]): Фамилия, имя и отчество записи.
+        """
+        for value in values:
+            for word in words(value):
+                for key in word_keys(word):
+                    postings = self._postings.get(key)
+                    if postings is None:
+                        self._postings[key] = rowid
+                        if self._neighbours is not None:
+                            self._add_neighbours(key)
+                    elif isinstance(postings, list):
+                        if postings[-1] != rowid:
+                            postings.append(rowid)
+                    elif postings != rowid:
+                        self._postings[key] = [postings, rowid]
+        self.dirty = True
+
+    def _add_neighbours(self, key: str) -> None:
+        # Транслитерации в соседство не входят: латинский запрос ищется и по своему фонетическому ключу
+        if not is_latin(key):
+            for variant in deletions(key):
+                self._neighbours.setdefault(variant, set()).add(key)
+
+    def _similar_keys(self, key: str) -> Set[str]:
+        if len(key) < MIN_NEIGHBOUR_KEY:
+            return {key}
+        if self._neighbours is None:
+            self._neighbours = {}
+            for indexed in self._postings:
+                self._add_neighbours(indexed)
+        keys = {key}
+        for variant in deletions(key):
+            keys.update(self._neighbours.get(variant, ()))
+        return keys
+
+    def candidates(self, word: str) -> Set[int]:
+        """
+        Возвращает номера строк записей, в ФИО которых могло быть слово, похожее на указанное.
+
+        Кандидаты - записи с той же транслитерацией или с фонетическим ключом, отличающимся от ключа
+        слова не больше чем одной правкой.
+
+        Args:
+            word (str): Слово запроса из функции words.
+
+        Returns:
+            Set[int]: Номера строк (могут быть устаревшими).
+        """
+        phonetic, transliteration = word_keys(word)
+        rowids = set()
+        for key in self._similar_keys(phonetic) | {transliteration}:
+            postings = self._postings.get(key)
+            if isinstance(postings, list):
+                rowids.update(postings)
+            elif postings is not None:
+                rowids.add(postings)
+        return rowids
+
+    def save(self, path: str, signature: Tuple[int, ...], positions: Mapping[int, int]) -> None:
+        """
+        Сохраняет индекс рядом с файлом контактов, перенумеровывая строки по их позициям в файле.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            signature (Tuple[int, ...]): Подпись файла контактов, для которого построен индекс.
+            positions (Mapping[int, int]): Соответствие номера строки ее позиции в файле (см. contacts_sidecar).
+        """
+        save_sidecar(path, INDEX_VERSION, signature, postings_to_positions(self._postings, positions))
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, signature: Tuple[int, ...], rowids: Sequence[int]) -> Optional['FuzzyIndex']:
+        """
+        Загружает сохраненный индекс, если он построен для файла с той же подписью.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            signature (Tuple[int, ...]): Текущая подпись файла контактов.
+            rowids (Sequence[int]): Номера строк записей хранилища в порядке следования в файле; позиции
+                из файла индекса переводятся в них.
+
+        Returns:
+            Optional[FuzzyIndex]: Индекс или None, если файла нет или он устарел.
+        """
+        postings = load_sidecar(path, INDEX_VERSION, signature)
+        if postings is not None:
+            postings = postings_to_rowids(postings, rowids)
+        if postings is None:
+            return None
+        index = cls()
+        index._postings = postings
+        return index
@@ -0,0 +1,234 @@
+"""
+Пакетный импорт контактов из файлов CSV и JSONL.
+
+Исходный файл читается потоком порциями по CHUNK_SIZE записей, поэтому его размер не ограничен памятью.
+Каждая запись проверяется, телефоны приводятся к виду +7XXXXXXXXXX, после чего порция целиком передается
+хранилищу: дубликаты отсекаются по индексу хэшей содержимого, ID выдаются подряд после наибольшего,
+а новые строки дописываются в файл одной буферизованной записью.
+
+Поддерживаемые форматы:
+    CSV   - строка заголовка с русскими названиями полей (ID можно опустить) либо строки без заголовка
+            из шести полей в порядке меню добавления или из семи полей с ID;
+    JSONL - по одному JSON-объекту с русскими названиями полей на строку.
+ID из исходного файла не используются: импортированным контактам выдаются новые.
+"""
+import csv
+import json
+import os
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import contacts_metrics
+from contacts_phone import normalize_phone
+from contacts_record import FIELDS
+from contacts_storage import get_store
+from decorators import instrumented
+
+CHUNK_SIZE = 10_000
+PHONE_FIELDS = ('Рабочий телефон', 'Личный телефон')
+# Сколько отклоненных записей показывать в отчете
+MAX_REPORTED_ERRORS = 10
+
+Row = Tuple[int, Optional[Dict[str, str]], str]
+
+
+class ImportReport:
+    """
+    Итоги импорта.
+
+    Attributes:
+        rows (int): Прочитано записей.
+        added (int): Добавлено контактов.
+        duplicates (int): Пропущено дубликатов.
+        rejected (int): Отклонено некорректных записей.
+        errors (List[str]): Описания первых отклоненных записей.
+        seconds (float): Длительность импорта.
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.added = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Скорость обработки в записях в секунду."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def reject(self, line_number: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"строка {line_number}: {reason}")
+
+    def __str__(self) -> str:
+        return (f"Обработано записей: {self.rows} за {self.seconds:.2f} с ({self.rate:.0f} записей/с). "
+                f"Добавлено: {self.added}, дубликатов: {self.duplicates}, отклонено: {self.rejected}.")
+
+
+def value_error(field: str, value: str) -> str:
+    """
+    Проверяет, что значение поля можно записать в строку файла контактов.
+
+    Args:
+        field (str): Имя поля.
+        value (str): Значение поля.
+
+    Returns:
+        str: Причина отклонения или пустая строка, если значение допустимо.
+    """
+    if ',' in value or '\n' in value or '\r' in value:
+        return f"поле '{field}' содержит запятую или перевод строки"
+    return ''
+
+
+def validate(contact: Dict[str, str]) -> Tuple[Optional[Dict[str, str]], str]:
+    """
+    Проверяет и нормализует импортируемую запись.
+
+    Args:
+        contact (Dict[str, str]): Поля записи (ID игнорируется).
+
+    Returns:
+        Tuple[Optional[Dict[str, str]], str]: Запись без ID с нормализованными значениями и пустая строка
+            либо None и причина отклонения.
+    """
+    record = {}
+    for field in FIELDS[1:]:
+        value = contact.get(field)
+        value = '' if value is None else str(value).strip()
+        reason = value_error(field, value)
+        if reason:
+            return None, reason
+        record[field] = value
+    if not record['Фамилия'] and not record['Имя']:
+        return None, "не указаны ни фамилия, ни имя"
+    for field in PHONE_FIELDS:
+        phone = normalize_phone(record[field])
+        if phone is None:
+            return None, f"некорректный телефон в поле '{field}': {record[field]}"
+        record[field] = phone
+    if not any(record[field] for field in PHONE_FIELDS):
+        return None, "не указан ни один телефон"
+    return record, ''
+
+
+def _read_csv(path: str) -> Iterator[Row]:
+    with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+        reader = csv.reader(file)
+        fields = None
+        for values in reader:
+            if not any(value.strip() for value in values):
+                continue
+            if fields is None:
+                fields = [value.strip() for value in values]
+                if set(fields) <= set(FIELDS):
+                    continue  # Строка заголовка
+                fields = FIELDS if len(values) == len(FIELDS) else FIELDS[1:]
+            if len(values) != len(fields):
+                yield reader.line_num, None, f"ожидалось полей: {len(fields)}, получено: {len(values)}"
+                continue
+            yield reader.line_num, dict(zip(fields, values)), ''
+
+
+def _read_jsonl(path: str) -> Iterator[Row]:
+    with open(path, 'r', encoding='utf-8-sig') as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                contact = json.loads(line)
+            except ValueError as error:
+                yield line_number, None, f"некорректный JSON: {error}"
+                continue
+            if not isinstance(contact, dict):
+                yield line_number, None, "ожидался JSON-объект"
+                continue
+            yield line_number, contact, ''
+
+
+def read_rows(path: str) -> Iterator[Row]:
+    """
+    Лениво читает записи импортируемого файла.
+
+    Формат определяется по расширению: .jsonl и .ndjson читаются как JSONL, остальные - как CSV.
+
+    Args:
+        path (str): Путь к импортируемому файлу.
+
+    Yields:
+        Row: Номер строки в файле, словарь полей и пустая строка либо, если запись не удалось
+            разобрать, None и описание ошибки.
+    """
+    if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson'):
+        return _read_jsonl(path)
+    return _read_csv(path)
+
+
+@instrumented()
+def import_contacts(filename: str, path: str, chunk_size: int = CHUNK_SIZE) -> ImportReport:
+    """
+    Импортирует контакты из файла CSV или JSONL в файл контактов.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        path (str): Путь к импортируемому файлу.
+        chunk_size (int): Количество записей, обрабатываемых и записываемых за один раз.
+
+    Returns:
+        ImportReport: Итоги импорта.
+
+    Raises:
+        OSError: Если импортируемый файл не удалось прочитать.
+    """
+    report = ImportReport()
+    store = get_store(filename)
+    started = time.perf_counter()
+    rows = read_rows(path)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        batch = []
+        for line_number, contact, reason in chunk:
+            report.rows += 1
+            if contact is not None:
+                contact, reason = validate(contact)
+            if contact is None:
+                report.reject(line_number, reason)
+            else:
+                batch.append(contact)
+        if batch:
+            added, duplicates = store.add(batch)
+            report.added += added
+            report.duplicates += duplicates
+    report.seconds = time.perf_counter() - started
+    contacts_metrics.count('rows_scanned', report.rows)
+    contacts_metrics.count('bytes_read', os.path.getsize(path))
+    return report
+
+
+def import_file(filename: str, path: str) -> None:
+    """
+    Импортирует контакты из файла и выводит отчет.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        path (str): Путь к импортируемому файлу.
+
+    Returns:
+        None
+    """
+    try:
+        report = import_contacts(filename, path)
+    except (OSError, UnicodeDecodeError, csv.Error) as error:
+        print(f"Не удалось прочитать файл {path}: {error}")
+        return
+    print(report)
+    for error in report.errors:
+        print(f"  Отклонено: {error}")
+    if report.rejected > len(report.errors):
+        print(f"  ... и еще {report.rejected - len(report.errors)}")
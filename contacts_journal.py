@@ -0,0 +1,136 @@
+"""
+Журнал изменений файла контактов.
+
+Вместо перезаписи всего файла при каждом изменении операции добавления, обновления и удаления
+дописываются в журнал ``<файл>.journal`` по одной JSON-строке. При чтении журнал накладывается
+на содержимое файла, а при уплотнении изменения переносятся в сам файл.
+
+Первая строка журнала содержит подпись файла контактов (время модификации и размер), к которому
+относятся записанные операции. Если подпись не совпадает с текущей, журнал уже перенесен в файл
+(например, процесс завершился между заменой файла и очисткой журнала) и не применяется.
+
+Операции применяются до первой поврежденной строки: незавершенной последней строки (запись, прерванная
+аварийным завершением) или строки, которая не разбирается как операция (частичная запись другой
+программой, повреждение диска). Следующая запись в журнал отрезает его по этой строке, чтобы новые
+операции не оказались после нее.
+"""
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import contacts_metrics
+
+
+class Journal:
+    """Журнал операций над файлом контактов."""
+
+    def __init__(self, filename: str) -> None:
+        self.path = filename + '.journal'
+        # Смещение первой поврежденной строки, найденной последним чтением журнала
+        self._damaged_at: Optional[int] = None
+
+    def size(self) -> int:
+        """
+        Возвращает размер журнала в байтах.
+
+        Returns:
+            int: Размер журнала или 0, если журнала нет.
+        """
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def _base(self) -> Optional[Tuple[int, int]]:
+        try:
+            with open(self.path, 'rb') as file:
+                header = file.readline()
+        except FileNotFoundError:
+            return None
+        if not header.endswith(b'\n'):
+            return None
+        try:
+            return tuple(json.loads(header)['base'])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def read(self, base: Tuple[int, int]) -> List[Dict]:
+        """
+        Читает операции, записанные для файла контактов с указанной подписью.
+
+        Операции читаются до первой поврежденной строки. Незавершенная последняя строка (запись, прерванная
+        аварийным завершением) пропускается молча, о поврежденной строке в середине журнала выводится
+        предупреждение.
+
+        Args:
+            base (Tuple[int, int]): Подпись файла контактов (время модификации в наносекундах и размер).
+
+        Returns:
+            List[Dict]: Операции в порядке записи.
+        """
+        self._damaged_at = None
+        try:
+            with open(self.path, 'rb') as file:
+                lines = file.readlines()
+                contacts_metrics.count('bytes_read', os.fstat(file.fileno()).st_size)
+        except FileNotFoundError:
+            return []
+        if not lines or not lines[0].endswith(b'\n'):
+            return []
+        try:
+            if tuple(json.loads(lines[0])['base']) != tuple(base):
+                return []
+        except (ValueError, KeyError, TypeError):
+            return []
+        operations = []
+        position = len(lines[0])
+        for number, line in enumerate(lines[1:], start=2):
+            if not line.endswith(b'\n'):
+                self._damaged_at = position
+                break
+            try:
+                operation = json.loads(line)
+            except ValueError:
+                operation = None
+            if not isinstance(operation, dict) or 'op' not in operation:
+                self._damaged_at = position
+                print(f"Журнал {self.path} поврежден в строке {number}: эта и следующие операции не применены",
+                      file=sys.stderr)
+                break
+            operations.append(operation)
+            position += len(line)
+        return operations
+
+    def append(self, operation: Dict, base: Tuple[int, int]) -> None:
+        """
+        Дописывает операцию в журнал и сбрасывает ее на диск.
+
+        Если журнала нет или он относится к другой версии файла контактов, журнал начинается заново.
+
+        Args:
+            operation (Dict): Операция ('op' - add, update или delete, и ее параметры).
+            base (Tuple[int, int]): Подпись файла контактов, к которому относится операция.
+        """
+        mode = 'a' if self._base() == tuple(base) else 'w'
+        with open(self.path, mode, encoding='utf-8') as file:
+            if mode == 'a' and self._damaged_at is not None:
+                # Поврежденный хвост отрезается, иначе новые операции не были бы применены при чтении
+                file.truncate(self._damaged_at)
+                file.seek(0, os.SEEK_END)
+            self._damaged_at = None
+            start = file.tell()
+            if mode == 'w':
+                file.write(json.dumps({'base': list(base)}) + '\n')
+            file.write(json.dumps(operation, ensure_ascii=False) + '\n')
+            file.flush()
+            contacts_metrics.count('bytes_written', file.tell() - start)
+            os.fsync(file.fileno())
+
+    def reset(self) -> None:
+        """Удаляет журнал после переноса изменений в файл контактов."""
+        self._damaged_at = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,56 @@
+"""
+Блокировка записи в файл контактов между процессами.
+
+Несколько копий программы могут работать с одним файлом. Запись (дописывание в файл или журнал,
+уплотнение, сортировка, перезапись) выполняется под рекомендательной блокировкой fcntl на файле
+``<файл>.lock``. Блокировка держится только на время самой записи, а не ожидания ввода пользователя;
+чтение блокировку не берет, поэтому читатели не ждут пишущих.
+
+Внутри процесса блокировка повторно входима: вложенные операции (например, уплотнение журнала внутри
+удаления) не блокируют сами себя. На платформах без fcntl блокировка не выполняется.
+"""
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Блокировки, удерживаемые процессом: путь файла блокировки -> глубина вложенности
+_held: Dict[str, int] = {}
+
+
+def lock_path(filename: str) -> str:
+    return os.path.abspath(filename) + '.lock'
+
+
+@contextmanager
+def write_lock(filename: str) -> Iterator[None]:
+    """
+    Захватывает исключительную блокировку записи в файл контактов на время блока with.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+    """
+    path = lock_path(filename)
+    if path in _held:
+        _held[path] += 1
+        try:
+            yield
+        finally:
+            _held[path] -= 1
+        return
+
+    # Файл блокировки не удаляется: иначе два процесса могли бы заблокировать разные файлы с одним именем
+    with open(path, 'ab') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        _held[path] = 1
+        try:
+            yield
+        finally:
+            del _held[path]
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
@@ -1,7 +1,10 @@
 import re
 from typing import List, Dict, Union
 
-from contacts_display import read_contacts
+from contacts_import import value_error
+from contacts_sort import DEFAULT_MEMORY_LIMIT, external_sort
+from contacts_storage import get_store
+from decorators import instrumented
 
 
 def generate_next_id(existing_contacts: List[Dict[str, str]]) -> str:
@@ -19,6 +22,7 @@ def generate_next_id(existing_contacts: List[Dict[str, str]]) -> str:
     return str(last_id + 1)  # Возвращаем следующий ID как строку
 
 
+@instrumented()
 def add_contact(filename: str, contacts_data: Union[str, List[Dict[str, str]]]) -> None:
     """
     Добавляет новые контакты в файл. Поддерживает два формата входных данных: строку и список словарей.
@@ -31,12 +35,6 @@ def add_contact(filename: str, contacts_data: Union[str, List[Dict[str, str]]])
     Returns:
         None
     """
-    existing_contacts = read_contacts(filename)
-    next_id = max([int(contact['ID']) for contact in existing_contacts], default=0) + 1 if existing_contacts else 1
-
-    new_contacts = []
-    duplicates = 0
-
     # Обработка входных данных в зависимости от их типа
     if isinstance(contacts_data, str):
         contacts_list = [
@@ -51,25 +49,13 @@ def add_contact(filename: str, contacts_data: Union[str, List[Dict[str, str]]])
         print("Некорректный формат входных данных.")
         return
 
-    for contact in contacts_list:
-        # Добавляем ID только новым контактам, если ID не задан
-        contact['ID'] = contact.get('ID', str(next_id))
-
-        # Проверка на дубликаты без учета ID
-        if any(all(contact[k] == existing[k] for k in contact if k != 'ID') for existing in existing_contacts):
-            duplicates += 1
-        else:
-            new_contacts.append(contact)
-            next_id = int(contact['ID']) + 1  # Подготовка ID для следующего контакта
-
-    # Запись новых контактов в файл
-    with open(filename, 'a', encoding='utf-8') as file:
-        for contact in new_contacts:
-            file.write(','.join([contact['ID']] + [contact[k] for k in
-                                                   ['Фамилия', 'Имя', 'Отчество', 'Организация', 'Рабочий телефон',
-                                                    'Личный телефон']]) + '\n')
-
-    print(f"Добавлено контактов: {len(new_contacts)}.")
+    try:
+        added, duplicates = get_store(filename).add(contacts_list)
+    except ValueError as error:
+        print(f"Контакты не добавлены: {error}.")
+        return
+
+    print(f"Добавлено контактов: {added}.")
     if duplicates:
         print(f"Обнаружено дублирующихся контактов: {duplicates}, они не были добавлены.")
 
@@ -84,11 +70,11 @@ def update_selected_contacts(filename: str) -> None:
     Returns:
         None
     """
-    all_contacts = read_contacts(filename)
+    store = get_store(filename)
 
-    # Поиск контактов
+    # Поиск контактов по индексу хранилища, без чтения всего справочника
     search_query = input("Введите данные для поиска контактов, которые хотите редактировать: ")
-    found_contacts = [contact for contact in all_contacts if search_query.lower() in ' '.join(contact.values()).lower()]
+    found_contacts = store.quick_search(search_query)
 
     if found_contacts:
         print("Найденные контакты:")
@@ -118,20 +104,28 @@ def update_selected_contacts(filename: str) -> None:
 
         updates = {}
         for field in ['Фамилия', 'Имя', 'Отчество', 'Организация', 'Рабочий телефон', 'Личный телефон']:
-            new_value = input(f"Введите новое значение для {field} (оставьте пустым, если не хотите менять): ")
+            while True:
+                new_value = input(f"Введите новое значение для {field} (оставьте пустым, если не хотите менять): ")
+                # Запятая или перевод строки нарушили бы разбивку строки файла на поля
+                reason = value_error(field, new_value)
+                if not reason:
+                    break
+                print(f"Некорректное значение: {reason}. Попробуйте снова.")
             if new_value:
                 updates[field] = new_value
 
-        for contact in selected_contacts:
-            for key, new_value in updates.items():
-                contact[key] = new_value
-
-        save_updated_contacts(filename, all_contacts)
-        print("Контакты были успешно обновлены.")
+        # Контакты могли измениться в другой копии программы, пока пользователь вводил значения:
+        # изменения проверяются по версии, которую видел пользователь
+        updated, conflicts = store.update_checked(selected_contacts, updates)
+        print(f"Контакты были успешно обновлены: {updated}.")
+        if conflicts:
+            print(f"Контакты с ID {', '.join(conflicts)} были изменены или удалены другим пользователем, "
+                  f"изменения для них не сохранены. Повторите редактирование.")
     else:
         print("Контакты не найдены.")
 
 
+@instrumented()
 def save_updated_contacts(filename: str, contacts: List[Dict[str, str]]) -> None:
     """
     Сохраняет обновленный список контактов в файл.
@@ -143,33 +137,23 @@ def save_updated_contacts(filename: str, contacts: List[Dict[str, str]]) -> None
     Returns:
         None
     """
-    with open(filename, 'w', encoding='utf-8') as file:
-        # Предполагается наличие заголовка в файле
-        file.write("ID,Фамилия,Имя,Отчество,Организация,Рабочий телефон,Личный телефон\n")
-        for contact in contacts:
-            file.write(','.join(
-                [contact['ID'], contact['Фамилия'], contact['Имя'], contact['Отчество'], contact['Организация'],
-                 contact['Рабочий телефон'], contact['Личный телефон']]) + '\n')
+    get_store(filename).replace_all(contacts)
 
 
-def organize_contacts(filename: str) -> None:
+@instrumented()
+def organize_contacts(filename: str, memory_limit: int = DEFAULT_MEMORY_LIMIT) -> None:
     """
     Организует контакты в файле, сортируя их по фамилии и имени, и присваивает новые ID с начала.
 
+    Сортировка внешняя (см. contacts_sort): записи сортируются порциями не больше memory_limit байт
+    во временных файлах и сливаются, поэтому справочник не обязан помещаться в памяти.
+
     Args:
         filename (str): Имя файла с контактами.
+        memory_limit (int): Примерный объем памяти в байтах для одной порции сортировки.
 
     Returns:
         None
     """
-    contacts = read_contacts(filename)
-    # Сортировка контактов по Фамилии, а затем по Имени
-    sorted_contacts = sorted(contacts, key=lambda x: (x['Фамилия'], x['Имя']))
-
-    # Переназначение ID, начиная с 1
-    for i, contact in enumerate(sorted_contacts, start=1):
-        contact['ID'] = str(i)
-
-    # Сохранение организованных контактов обратно в файл
-    save_updated_contacts(filename, sorted_contacts)
+    external_sort(filename, memory_limit)
     print("Контакты были успешно организованы.")
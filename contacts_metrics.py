@@ -0,0 +1,141 @@
+"""
+Необязательный сбор показателей работы справочника.
+
+Сбор включается переменной окружения PHONEBOOK_PROFILE=1 или флагом ``--profile`` командной строки.
+Учитываются количество вызовов и распределение времени операций (см. decorators.instrumented),
+количество просмотренных записей, прочитанные и записанные байты и доля попаданий в кэши (хранилище
+в памяти, снимок, сохраненные индексы). При выходе из программы сводка выводится в stderr.
+
+Если задать PHONEBOOK_CPROFILE=<файл> или флаг ``--cprofile <файл>``, сбор включается и весь сеанс
+дополнительно профилируется cProfile, а результат сохраняется в указанный файл (смотреть через python -m pstats).
+
+Пока сбор выключен, каждая функция модуля сводится к проверке одного флага.
+"""
+import atexit
+import os
+import sys
+from collections import Counter
+from typing import Dict, List, Optional
+
+ENV_VAR = 'PHONEBOOK_PROFILE'
+CPROFILE_ENV_VAR = 'PHONEBOOK_CPROFILE'
+
+enabled = False
+
+_calls: Dict[str, 'CallStats'] = {}
+_counters: Counter = Counter()
+# Имя кэша -> [попаданий, промахов]
+_caches: Dict[str, List[int]] = {}
+_profiler: Optional['cProfile.Profile'] = None
+_profile_path: Optional[str] = None
+
+
+class CallStats:
+    """
+    Время вызовов одной операции.
+
+    Attributes:
+        calls (int): Количество вызовов.
+        seconds (float): Суммарное время.
+        histogram (Counter): Количество вызовов по интервалам времени: интервал k - от 2^(k-1) до 2^k мс,
+            интервал 0 - меньше 1 мс.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.histogram: Counter = Counter()
+
+    def add(self, seconds: float) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.histogram[int(seconds * 1000).bit_length()] += 1
+
+
+def enable(profile_path: Optional[str] = None) -> None:
+    """
+    Включает сбор показателей до конца сеанса и вывод сводки при выходе.
+
+    Args:
+        profile_path (Optional[str]): Файл для результатов cProfile; если не указан, cProfile не запускается.
+    """
+    global enabled, _profiler, _profile_path
+    if not enabled:
+        enabled = True
+        atexit.register(report)
+    if profile_path and _profiler is None:
+        import cProfile  # Нужен только при профилировании
+
+        _profile_path = profile_path
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def record_call(name: str, seconds: float) -> None:
+    """Учитывает вызов операции name длительностью seconds."""
+    if enabled:
+        stats = _calls.get(name)
+        if stats is None:
+            stats = _calls[name] = CallStats()
+        stats.add(seconds)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Увеличивает счетчик name (например, rows_scanned или bytes_read) на amount."""
+    if enabled:
+        _counters[name] += amount
+
+
+def cache(name: str, hit: bool) -> None:
+    """Учитывает обращение к кэшу name: попадание или промах."""
+    if enabled:
+        stats = _caches.setdefault(name, [0, 0])
+        stats[0 if hit else 1] += 1
+
+
+def _bucket_label(bucket: int) -> str:
+    return f"<{1 << bucket} мс"
+
+
+def summary() -> str:
+    """
+    Формирует текстовую сводку собранных показателей.
+
+    Returns:
+        str: Сводка: операции с гистограммами времени, счетчики и попадания в кэши.
+    """
+    lines = ["Показатели работы справочника:"]
+    if _calls:
+        lines.append(f"  {'Операция':<28} {'вызовов':>8} {'всего, с':>10} {'среднее, мс':>12}")
+        for name, stats in sorted(_calls.items(), key=lambda item: -item[1].seconds):
+            lines.append(f"  {name:<28} {stats.calls:>8} {stats.seconds:>10.3f} "
+                         f"{stats.seconds / stats.calls * 1000:>12.2f}")
+            lines.append("    " + ', '.join(f"{_bucket_label(bucket)}: {calls}"
+                                            for bucket, calls in sorted(stats.histogram.items())))
+    if _counters:
+        lines.append("  Счетчики:")
+        lines.extend(f"    {name}: {value}" for name, value in sorted(_counters.items()))
+    if _caches:
+        lines.append("  Кэши:")
+        for name, (hits, misses) in sorted(_caches.items()):
+            lines.append(f"    {name}: попаданий {hits} из {hits + misses} ({hits / (hits + misses):.0%})")
+    return '\n'.join(lines)
+
+
+def report() -> None:
+    """Выводит сводку в stderr и сохраняет результаты cProfile, если он был запущен."""
+    global _profiler
+    if _profiler is not None:
+        _profiler.disable()
+        try:
+            _profiler.dump_stats(_profile_path)
+        except OSError as error:
+            print(f"Не удалось сохранить профиль в {_profile_path}: {error}", file=sys.stderr)
+        else:
+            print(f"Профиль cProfile сохранен в {_profile_path}", file=sys.stderr)
+        _profiler = None
+    print(summary(), file=sys.stderr)
+
+
+if os.environ.get(ENV_VAR, '') not in ('', '0') or os.environ.get(CPROFILE_ENV_VAR):
+    enable(os.environ.get(CPROFILE_ENV_VAR) or None)
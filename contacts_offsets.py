@@ -0,0 +1,157 @@
+"""
+Индекс смещений строк файла контактов для постраничного просмотра.
+
+Для каждой STRIDE-й записи хранится байтовое смещение ее строки в файле, поэтому страницу можно
+показать, перейдя к ближайшей контрольной точке и разобрав только нужные строки. Индекс сохраняется
+рядом с файлом (``<файл>.offsets``). Если файл с момента построения индекса только дописывался,
+индекс дополняется с места остановки, иначе строится заново.
+"""
+import mmap
+import os
+import pickle
+from array import array
+from typing import List, Optional
+
+import contacts_metrics
+
+INDEX_VERSION = 1
+STRIDE = 256
+TAIL_SIZE = 64
+
+
+class OffsetIndex:
+    """
+    Контрольные точки смещений записей файла контактов.
+
+    Attributes:
+        count (int): Количество записей в файле (без заголовка и пустых строк).
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.count = 0
+        self._offsets = array('Q')
+        self._size = 0
+        self._mtime_ns = 0
+        self._tail = b''
+
+    @staticmethod
+    def path_for(filename: str) -> str:
+        return filename + '.offsets'
+
+    @classmethod
+    def invalidate(cls, filename: str) -> None:
+        """
+        Удаляет сохраненный индекс после перезаписи файла контактов.
+
+        Args:
+            filename (str): Путь к файлу с контактами.
+        """
+        try:
+            os.remove(cls.path_for(filename))
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def open(cls, filename: str) -> 'OffsetIndex':
+        """
+        Возвращает актуальный индекс: загружает сохраненный, дополняет его или строит заново.
+
+        Args:
+            filename (str): Путь к файлу с контактами.
+
+        Returns:
+            OffsetIndex: Индекс, соответствующий текущему содержимому файла.
+        """
+        stat = os.stat(filename)
+        index = cls._load(filename)
+        if index is not None and (index._size, index._mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            contacts_metrics.cache('offset_index', True)
+            return index
+        contacts_metrics.cache('offset_index', False)
+        if index is not None and index._size and stat.st_size > index._size and index._tail.endswith(b'\n') \
+                and index._tail_matches():
+            index._scan(index._size)  # Файл только дописывался
+        else:
+            index = cls(filename)
+            index._scan(0)
+        index._save()
+        return index
+
+    @classmethod
+    def _load(cls, filename: str) -> Optional['OffsetIndex']:
+        try:
+            with open(cls.path_for(filename), 'rb') as file:
+                version, size, mtime_ns, count, tail, offsets = pickle.load(file)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+        if version != INDEX_VERSION:
+            return None
+        index = cls(filename)
+        index._size, index._mtime_ns, index.count, index._tail, index._offsets = size, mtime_ns, count, tail, offsets
+        return index
+
+    def _save(self) -> None:
+        temp_path = f'{self.path_for(self.filename)}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump((INDEX_VERSION, self._size, self._mtime_ns, self.count, self._tail, self._offsets), file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path_for(self.filename))
+        except OSError:
+            pass  # Индекс будет построен заново при следующем обращении
+
+    def _tail_matches(self) -> bool:
+        with open(self.filename, 'rb') as file:
+            file.seek(self._size - len(self._tail))
+            return file.read(len(self._tail)) == self._tail
+
+    def _scan(self, start: int) -> None:
+        # Просматривает файл с байтового смещения start, продолжая нумерацию записей
+        with open(self.filename, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            file.seek(start)
+            if start == 0:
+                start += len(file.readline())  # Заголовок файла
+            position = start
+            for line in file:
+                if line.strip():
+                    if self.count % STRIDE == 0:
+                        self._offsets.append(position)
+                    self.count += 1
+                position += len(line)
+            contacts_metrics.count('bytes_read', position - start)
+            self._size = position
+            self._mtime_ns = stat.st_mtime_ns
+            file.seek(max(0, position - TAIL_SIZE))
+            self._tail = file.read(position - file.tell())
+
+    def page(self, start: int, count: int) -> List[str]:
+        """
+        Читает строки записей с позициями от start, не более count штук.
+
+        Args:
+            start (int): Позиция первой записи (с нуля).
+            count (int): Количество записей.
+
+        Returns:
+            List[str]: Строки файла без перевода строки.
+        """
+        if start >= self.count or count <= 0:
+            return []
+        lines = []
+        with open(self.filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            view.seek(self._offsets[start // STRIDE])
+            begin = view.tell()
+            skip = start % STRIDE
+            while len(lines) < count and view.tell() < self._size:
+                line = view.readline()
+                if not line.strip():
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                lines.append(line.decode('utf-8').rstrip('\r\n'))
+            contacts_metrics.count('bytes_read', view.tell() - begin)
+            contacts_metrics.count('rows_scanned', start % STRIDE + len(lines))
+        return lines
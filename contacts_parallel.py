@@ -0,0 +1,181 @@
+"""
+Параллельный поиск по файлу контактов без загрузки его в память.
+
+Файл делится на диапазоны байтов, границы которых выровнены по переводам строк, и диапазоны
+просматриваются в пуле процессов: каждый процесс отображает файл в память через mmap, разбирает
+строки своего диапазона так же, как хранилище (parse_line), и проверяет их теми же условиями, что
+и однопоточный поиск. Найденные строки возвращаются в порядке следования в файле.
+
+Поиск используется автоматически, если справочник хранится в файле CSV больше PARALLEL_MIN_SIZE байт,
+еще не загруженном в хранилище, в журнале нет неперенесенных изменений и для файла нет актуального
+снимка (см. should_scan). Просмотр выполняется для файла не больше одного раза за процесс: если процесс
+ищет повторно (меню), хранилище загружается и следующие запросы используют его индексы, а снимок
+и файлы индексов, сохраненные при этом, ускоряют и последующие запуски.
+"""
+import mmap
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import contacts_metrics
+from contacts_journal import Journal
+from contacts_query import compile_query
+from contacts_record import Contact
+from contacts_snapshot import fresh_header
+from contacts_storage import get_store
+from contacts_store import parse_line
+
+# Минимальный размер файла, начиная с которого поиск выполняется параллельно
+PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+# Диапазонов на один процесс: мелкие диапазоны выравнивают нагрузку между процессами
+RANGES_PER_WORKER = 4
+
+ByteRange = Tuple[int, int]
+
+# Файлы, уже просмотренные параллельно в этом процессе
+_scanned = set()
+
+
+def worker_count() -> int:
+    """Количество процессов для параллельного поиска по умолчанию."""
+    return os.cpu_count() or 1
+
+
+def should_scan(filename: str, workers: Optional[int] = None) -> bool:
+    """
+    Определяет, выгоднее ли искать параллельным просмотром файла, чем через хранилище.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        workers (Optional[int]): Количество процессов; по умолчанию по числу ядер.
+
+    Returns:
+        bool: True, если файл CSV большой, не загружен в хранилище, журнал пуст, актуального снимка нет,
+            файл еще не просматривался в этом процессе и доступно больше одного ядра.
+    """
+    if (workers or worker_count()) < 2 or os.path.abspath(filename) in _scanned:
+        return False
+    store = get_store(filename)
+    if not store.flat_file or store.loaded or Journal(filename).size():
+        return False
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return False
+    if stat.st_size < PARALLEL_MIN_SIZE:
+        return False
+    # По актуальному снимку хранилище загружается быстрее одного просмотра файла и дальше ищет по индексам
+    return fresh_header(store.snapshot_path, filename, (stat.st_mtime_ns, stat.st_size)) is None
+
+
+def split_ranges(filename: str, parts: int) -> List[ByteRange]:
+    """
+    Делит записи файла на диапазоны байтов, начинающиеся и заканчивающиеся на границах строк.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        parts (int): Желаемое количество диапазонов.
+
+    Returns:
+        List[ByteRange]: Непустые диапазоны (начало, конец) в порядке следования; заголовок файла не входит.
+    """
+    with open(filename, 'rb') as file:
+        file.readline()  # Заголовок файла
+        start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        boundaries = [start]
+        for part in range(1, parts):
+            position = start + (size - start) * part // parts
+            if position <= boundaries[-1]:
+                continue
+            file.seek(position - 1)
+            file.readline()  # Дочитываем строку, в которую попала граница
+            if file.tell() >= size:
+                break
+            if file.tell() > boundaries[-1]:
+                boundaries.append(file.tell())
+        boundaries.append(size)
+    return [(begin, end) for begin, end in zip(boundaries, boundaries[1:]) if end > begin]
+
+
+def _read_range(filename: str, byte_range: ByteRange) -> List[str]:
+    begin, end = byte_range
+    with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        text = view[begin:end].decode('utf-8')
+    if '\r' in text:
+        # Так же, как при чтении файла в текстовом режиме
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.split('\n')
+
+
+def _quick_search_range(filename: str, byte_range: ByteRange, term: str) -> List[str]:
+    found = []
+    for line in _read_range(filename, byte_range):
+        # Строка целиком отсекается без разбора, если фрагмента нет даже с учетом разделителей
+        if term not in line.lower():
+            continue
+        contact = parse_line(line)
+        if contact is not None and any(term in value.lower() for value in contact.values()):
+            found.append(line)
+    return found
+
+
+def _precise_search_range(filename: str, byte_range: ByteRange, search_criteria: Dict[str, str]) -> List[str]:
+    plan = compile_query(search_criteria)
+    found = []
+    for line in _read_range(filename, byte_range):
+        contact = parse_line(line)
+        if contact is not None and plan.matches(contact):
+            found.append(line)
+    return found
+
+
+def _scan(filename: str, search: Callable[[str, ByteRange, Any], List[str]], argument: Any,
+          workers: Optional[int]) -> Iterator[Contact]:
+    # Пул процессов импортируется только при параллельном просмотре: модуль multiprocessing заметно
+    # замедляет запуск программы
+    from concurrent.futures import ProcessPoolExecutor
+
+    _scanned.add(os.path.abspath(filename))
+    workers = workers or worker_count()
+    ranges = split_ranges(filename, workers * RANGES_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        count = len(ranges)
+        for (begin, end), lines in zip(ranges, executor.map(search, [filename] * count, ranges, [argument] * count)):
+            contacts_metrics.count('bytes_read', end - begin)
+            for line in lines:
+                yield parse_line(line)
+
+
+def iter_quick_search(filename: str, search_term: str, workers: Optional[int] = None) -> Iterator[Contact]:
+    """
+    Параллельно ищет контакты, у которых любое поле содержит фрагмент без учета регистра.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        search_term (str): Поисковый запрос.
+        workers (Optional[int]): Количество процессов; по умолчанию по числу ядер.
+
+    Yields:
+        Contact: Найденный контакт в порядке следования в файле.
+    """
+    return _scan(filename, _quick_search_range, search_term.lower(), workers)
+
+
+def iter_precise_search(filename: str, search_criteria: Dict[str, str],
+                        workers: Optional[int] = None) -> Iterator[Contact]:
+    """
+    Параллельно ищет контакты, у которых все указанные поля соответствуют регулярным выражениям.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        search_criteria (Dict[str, str]): Критерии поиска, где ключ - имя поля, а значение - регулярное выражение.
+        workers (Optional[int]): Количество процессов; по умолчанию по числу ядер.
+
+    Yields:
+        Contact: Найденный контакт в порядке следования в файле.
+
+    Raises:
+        re.error: Если одно из выражений некорректно (проверяется до запуска процессов).
+    """
+    compile_query(search_criteria)
+    return _scan(filename, _precise_search_range, search_criteria, workers)
@@ -0,0 +1,176 @@
+"""
+Нормализация телефонов и индекс обратного поиска по номеру.
+
+Номера в файле записаны по-разному (+74951234567, 8 (495) 123-45-67, 495-123-45-67), поэтому индекс хранит
+их в едином виде E.164 (+74951234567). Точный поиск по номеру - одно обращение к словарю. Для поиска
+по последним цифрам номера поддерживается отсортированный список перевернутых номеров, который
+строится при первом таком запросе после изменений.
+
+Индекс сохраняется рядом с файлом (``<файл>.phones``) так же, как индекс триграмм: вхождения только
+добавляются, устаревшие отсеиваются проверкой кандидатов и удаляются при сохранении.
+"""
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from contacts_sidecar import load_sidecar, postings_to_positions, postings_to_rowids, save_sidecar
+
+INDEX_VERSION = 1
+
+_PHONE_SEPARATORS = re.compile(r'[\s\-().]')
+
+Postings = Union[int, List[int]]
+
+
+def normalize_phone(value: str) -> Optional[str]:
+    """
+    Приводит телефон к формату E.164.
+
+    Российские номера (8XXXXXXXXXX, 7XXXXXXXXXX, XXXXXXXXXX) записываются как +7XXXXXXXXXX, номера с '+'
+    сохраняются без разделителей. Пустое значение остается пустым.
+
+    Args:
+        value (str): Телефон в произвольной записи.
+
+    Returns:
+        Optional[str]: Нормализованный номер или None, если значение не похоже на телефон.
+    """
+    value = _PHONE_SEPARATORS.sub('', value)
+    if not value:
+        return ''
+    international = value.startswith('+')
+    digits = value[1:] if international else value
+    if not digits.isdigit() or not digits.isascii():
+        return None
+    if len(digits) == 10 and not international:
+        return '+7' + digits
+    if len(digits) == 11 and digits[0] in '78' and (not international or digits[0] == '7'):
+        return '+7' + digits[1:]
+    if international and 8 <= len(digits) <= 15:
+        return '+' + digits
+    return None
+
+
+def phone_keys(phones: Iterable[str]) -> List[str]:
+    """
+    Возвращает ключи индекса для телефонов записи.
+
+    Args:
+        phones (Iterable[str]): Телефоны записи.
+
+    Returns:
+        List[str]: Номера в формате E.164 без повторов; пустые и некорректные значения пропускаются.
+    """
+    keys = []
+    for phone in phones:
+        key = normalize_phone(phone)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+class PhoneIndex:
+    """
+    Индекс номер телефона -> номера строк хранилища контактов.
+
+    Для большинства номеров хранится один номер строки, для общих номеров (например, рабочего телефона
+    организации) - список.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Postings] = {}
+        self._reversed: Optional[List[str]] = None
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def add(self, rowid: int, phones: Iterable[str]) -> None:
+        """
+        Добавляет в индекс телефоны записи.
+
+        Args:
+            rowid (int): Номер строки в хранилище.
+            phones (Iterable[str]): Телефоны записи в произвольной записи.
+        """
+        for key in phone_keys(phones):
+            postings = self._postings.get(key)
+            if postings is None:
+                self._postings[key] = rowid
+                self._reversed = None
+            elif isinstance(postings, list):
+                if postings[-1] != rowid:
+                    postings.append(rowid)
+            elif postings != rowid:
+                self._postings[key] = [postings, rowid]
+        self.dirty = True
+
+    def candidates(self, phone: str) -> List[int]:
+        """
+        Возвращает номера строк записей, у которых мог быть указанный номер.
+
+        Args:
+            phone (str): Номер в формате E.164.
+
+        Returns:
+            List[int]: Номера строк в порядке добавления (могут быть устаревшими).
+        """
+        postings = self._postings.get(phone)
+        if postings is None:
+            return []
+        return list(postings) if isinstance(postings, list) else [postings]
+
+    def suffix_candidates(self, digits: str) -> List[int]:
+        """
+        Возвращает номера строк записей с номерами, оканчивающимися на указанные цифры.
+
+        Args:
+            digits (str): Последние цифры номера.
+
+        Returns:
+            List[int]: Номера строк по возрастанию (могут быть устаревшими).
+        """
+        if self._reversed is None:
+            self._reversed = sorted(key[:0:-1] for key in self._postings)
+        prefix = digits[::-1]
+        rowids = set()
+        position = bisect_left(self._reversed, prefix)
+        while position < len(self._reversed) and self._reversed[position].startswith(prefix):
+            rowids.update(self.candidates('+' + self._reversed[position][::-1]))
+            position += 1
+        return sorted(rowids)
+
+    def save(self, path: str, signature: Tuple[int, ...], positions: Mapping[int, int]) -> None:
+        """
+        Сохраняет индекс рядом с файлом контактов, перенумеровывая строки по их позициям в файле.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            signature (Tuple[int, ...]): Подпись файла контактов, для которого построен индекс.
+            positions (Mapping[int, int]): Соответствие номера строки ее позиции в файле (см. contacts_sidecar).
+        """
+        save_sidecar(path, INDEX_VERSION, signature, postings_to_positions(self._postings, positions))
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, signature: Tuple[int, ...], rowids: Sequence[int]) -> Optional['PhoneIndex']:
+        """
+        Загружает сохраненный индекс, если он построен для файла с той же подписью.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            signature (Tuple[int, ...]): Текущая подпись файла контактов.
+            rowids (Sequence[int]): Номера строк записей хранилища в порядке следования в файле; позиции
+                из файла индекса переводятся в них.
+
+        Returns:
+            Optional[PhoneIndex]: Индекс или None, если файла нет или он устарел.
+        """
+        postings = load_sidecar(path, INDEX_VERSION, signature)
+        if postings is not None:
+            postings = postings_to_rowids(postings, rowids)
+        if postings is None:
+            return None
+        index = cls()
+        index._postings = postings
+        return index
@@ -0,0 +1,169 @@
+"""
+Планы запросов для точного поиска по регулярным выражениям.
+
+Критерии поиска компилируются один раз в план, который кэшируется по самим критериям, поэтому
+повторные фильтры не тратят время на компиляцию. Выражения, состоящие из литерала или начинающиеся
+с него, проверяются сравнением строк до обращения к регулярному выражению. Литеральные начала выражений
+с якорем '^' план сообщает хранилищу, чтобы оно выбрало кандидатов по упорядоченному индексу.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_SPECIAL = set('.^$*+?{}[]\\|()')
+_QUANTIFIERS = set('*+?{')
+# Символы, которые re.IGNORECASE считает равными другим буквам, хотя str.lower() их различает
+# ('ſ' и 's', 'ς' и 'σ', 'ᲂ' и 'о'), 'İ', который str.lower() превращает в два символа, и 'Σ', который
+# str.lower() в конце слова превращает в 'ς'
+_CASE_VARIANTS = str.maketrans({
+    0x00B5: '\u03bc', 0x0130: 'i', 0x0131: 'i', 0x017F: 's', 0x0345: '\u03b9', 0x03A3: '\u03c3', 0x03C2: '\u03c3',
+    0x03D0: '\u03b2', 0x03D1: '\u03b8', 0x03D5: '\u03c6', 0x03D6: '\u03c0', 0x03F0: '\u03ba', 0x03F1: '\u03c1',
+    0x03F5: '\u03b5', 0x1C80: '\u0432', 0x1C81: '\u0434', 0x1C82: '\u043e', 0x1C83: '\u0441', 0x1C84: '\u0442',
+    0x1C85: '\u0442', 0x1C86: '\u044a', 0x1C87: '\u0463', 0x1C88: '\ua64b', 0x1E9B: '\u1e61', 0x1FBE: '\u03b9',
+    0x1FD3: '\u0390', 0x1FE3: '\u03b0', 0xFB05: '\ufb06',
+})
+_HAS_CASE_VARIANT = re.compile(f"[{''.join(map(chr, _CASE_VARIANTS))}]")
+
+
+def fold_case(value: str) -> str:
+    """
+    Приводит строку к нижнему регистру так, чтобы равенство результатов совпадало со сравнением символов
+    без учета регистра в регулярных выражениях (re.IGNORECASE).
+
+    Args:
+        value (str): Исходная строка.
+
+    Returns:
+        str: Строка в нижнем регистре.
+    """
+    if value.isascii() or _HAS_CASE_VARIANT.search(value) is None:
+        return value.lower()
+    return value.translate(_CASE_VARIANTS).lower()
+
+
+def split_literal_prefix(pattern: str) -> Tuple[str, str]:
+    """
+    Отделяет от регулярного выражения литеральное начало.
+
+    Args:
+        pattern (str): Регулярное выражение без якоря '^'.
+
+    Returns:
+        Tuple[str, str]: Литеральный префикс (с раскрытыми экранированными символами) и остаток выражения.
+            Если в выражении есть альтернатива '|', префикс пустой.
+    """
+    if '|' in pattern:
+        return '', pattern
+    literal = []  # Пары (символ, позиция начала в выражении)
+    position = 0
+    while position < len(pattern):
+        char = pattern[position]
+        if char == '\\' and position + 1 < len(pattern) and not pattern[position + 1].isalnum():
+            literal.append((pattern[position + 1], position))
+            position += 2
+        elif char not in _SPECIAL:
+            literal.append((char, position))
+            position += 1
+        else:
+            break
+        if position < len(pattern) and pattern[position] in _QUANTIFIERS:
+            # Квантификатор относится к последнему символу, поэтому тот уже не входит в литерал
+            position = literal.pop()[1]
+            break
+    return ''.join(char for char, _ in literal), pattern[position:]
+
+
+def _criterion(field: str, pattern: str) -> Tuple[int, Callable[[Dict[str, str]], bool], Optional[str], str]:
+    """
+    Строит проверку одного критерия.
+
+    Returns:
+        Tuple[int, Callable, Optional[str], str]: Стоимость проверки (для упорядочивания), сама проверка,
+            точное значение поля в нижнем регистре, если критерий требует равенства, и литеральное начало
+            значения в нижнем регистре, если выражение начинается с '^' (иначе пустая строка).
+    """
+    if field == 'ID':
+        pattern = f"^{pattern}$"
+    anchored = pattern.startswith('^')
+    body = pattern[1:] if anchored else pattern
+    literal, rest = split_literal_prefix(body)
+    literal = fold_case(literal)
+    prefix = literal if anchored else ''
+
+    if rest == '$' and anchored:
+        return 0, lambda contact: fold_case(contact.get(field, "")) == literal, literal, prefix
+    if rest == '' and anchored:
+        return 1, lambda contact: fold_case(contact.get(field, "")).startswith(literal), None, prefix
+    if rest == '':
+        return 1, lambda contact: literal in fold_case(contact.get(field, "")), None, prefix
+    if rest == '$':
+        return 1, lambda contact: fold_case(contact.get(field, "")).endswith(literal), None, prefix
+
+    regex = re.compile(pattern, re.IGNORECASE)
+    if anchored and literal:
+        return 2, lambda contact: (fold_case(contact.get(field, "")).startswith(literal)
+                                   and regex.search(contact.get(field, "")) is not None), None, prefix
+    return 3, lambda contact: regex.search(contact.get(field, "")) is not None, None, prefix
+
+
+class QueryPlan:
+    """
+    Скомпилированный набор критериев точного поиска.
+
+    Attributes:
+        id_literal (Optional[str]): Точное значение ID, если критерий по ID не содержит метасимволов.
+            По нему хранилище выбирает запись через индекс вместо перебора.
+        prefixes (Dict[str, Tuple[str, bool]]): Поле -> (литеральное начало значения в нижнем регистре
+            (см. fold_case), требует ли критерий равенства этому литералу) для выражений с якорем '^'
+            и непустым литералом. По ним хранилище выбирает кандидатов из упорядоченного индекса (см. contacts_sorted).
+    """
+
+    def __init__(self, criteria: Tuple[Tuple[str, str], ...]) -> None:
+        checks = []
+        self.id_literal: Optional[str] = None
+        self.prefixes: Dict[str, Tuple[str, bool]] = {}
+        for field, pattern in criteria:
+            cost, check, exact, prefix = _criterion(field, pattern)
+            if prefix:
+                self.prefixes[field] = (prefix, exact is not None)
+            # Значение из индекса сравнивается без учета регистра только для строк без букв
+            if field == 'ID' and exact is not None and exact.upper() == exact:
+                self.id_literal = exact
+            checks.append((cost, check))
+        self._checks: List[Callable[[Dict[str, str]], bool]] = [check for _, check in
+                                                                sorted(checks, key=lambda item: item[0])]
+
+    def matches(self, contact: Dict[str, str]) -> bool:
+        """Проверяет, соответствует ли контакт всем критериям."""
+        return all(check(contact) for check in self._checks)
+
+    def filter(self, contacts: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        """Лениво отбирает контакты, соответствующие всем критериям."""
+        checks = self._checks
+        for contact in contacts:
+            for check in checks:
+                if not check(contact):
+                    break
+            else:
+                yield contact
+
+
+@lru_cache(maxsize=256)
+def _compile(criteria: Tuple[Tuple[str, str], ...]) -> QueryPlan:
+    return QueryPlan(criteria)
+
+
+def compile_query(search_criteria: Dict[str, str]) -> QueryPlan:
+    """
+    Возвращает план запроса для критериев поиска, используя кэш ранее скомпилированных планов.
+
+    Args:
+        search_criteria (Dict[str, str]): Критерии поиска, где ключ - имя поля, а значение - регулярное выражение.
+
+    Returns:
+        QueryPlan: План запроса.
+
+    Raises:
+        re.error: Если одно из выражений некорректно.
+    """
+    return _compile(tuple(sorted(search_criteria.items())))
@@ -0,0 +1,99 @@
+"""
+Компактная запись контакта.
+
+Вместо словаря с семью ключами каждая запись хранится в объекте с __slots__, а повторяющиеся значения
+(фамилии, имена, отчества, организации) интернируются, поэтому одинаковые строки в памяти не дублируются.
+Запись не изменяется на месте и поддерживает доступ как к словарю по русским названиям полей.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Iterator, List, Tuple
+
+FIELDS = ['ID', 'Фамилия', 'Имя', 'Отчество', 'Организация', 'Рабочий телефон', 'Личный телефон']
+
+
+class Contact(Mapping):
+    """
+    Запись контакта с доступом к полям как к словарю.
+
+    Записи разделяются между хранилищем и вызывающим кодом, поэтому их не изменяют на месте:
+    измененная копия создается методом replace(). Фамилия, имя, отчество и организация интернируются.
+
+    Пример:
+        contact['Фамилия'], contact.get('Имя'), dict(contact), contact.replace({'Имя': 'Петр'})
+    """
+
+    __slots__ = ('id', 'last_name', 'first_name', 'middle_name', 'organization', 'work_phone', 'personal_phone')
+
+    _ATTRIBUTES = dict(zip(FIELDS, __slots__))
+
+    def __init__(self, contact_id: str, last_name: str, first_name: str, middle_name: str, organization: str,
+                 work_phone: str, personal_phone: str, intern: bool = True) -> None:
+        if intern:
+            last_name, first_name = sys.intern(last_name), sys.intern(first_name)
+            middle_name, organization = sys.intern(middle_name), sys.intern(organization)
+        self.id = contact_id
+        self.last_name = last_name
+        self.first_name = first_name
+        self.middle_name = middle_name
+        self.organization = organization
+        self.work_phone = work_phone
+        self.personal_phone = personal_phone
+
+    @classmethod
+    def from_mapping(cls, mapping: 'Mapping[str, str]', intern: bool = True) -> 'Contact':
+        """
+        Создает запись из словаря. Отсутствующие поля считаются пустыми.
+
+        Args:
+            mapping (Mapping[str, str]): Словарь с полями контакта.
+            intern (bool): Интернировать ли повторяющиеся значения.
+
+        Returns:
+            Contact: Запись контакта.
+        """
+        if isinstance(mapping, cls):
+            return mapping
+        return cls(*(str(mapping.get(field, '')) for field in FIELDS), intern=intern)
+
+    def __getitem__(self, field: str) -> str:
+        try:
+            return getattr(self, self._ATTRIBUTES[field])
+        except KeyError:
+            raise KeyError(field) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __contains__(self, field: object) -> bool:
+        return field in self._ATTRIBUTES
+
+    def __repr__(self) -> str:
+        return f"Contact({dict(self)!r})"
+
+    def __reduce__(self):
+        return self.__class__, self.values()
+
+    def values(self) -> Tuple[str, ...]:
+        """Значения полей в порядке FIELDS."""
+        return (self.id, self.last_name, self.first_name, self.middle_name, self.organization, self.work_phone,
+                self.personal_phone)
+
+    def items(self) -> List[Tuple[str, str]]:
+        """Пары (поле, значение) в порядке FIELDS."""
+        return list(zip(FIELDS, self.values()))
+
+    def replace(self, updates: 'Mapping[str, str]') -> 'Contact':
+        """
+        Возвращает копию записи с измененными полями.
+
+        Args:
+            updates (Mapping[str, str]): Новые значения полей.
+
+        Returns:
+            Contact: Новая запись.
+        """
+        return Contact(*(str(updates.get(field, value)) for field, value in zip(FIELDS, self.values())))
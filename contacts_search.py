@@ -1,32 +1,81 @@
-import re
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, Sequence
 
+import contacts_parallel
+from contacts_phone import normalize_phone
+from contacts_record import Contact
+from contacts_storage import get_store
+from decorators import instrumented
 
-def quick_search(filename: str, search_term: str) -> List[Dict[str, str]]:
+
+def iter_quick_search(filename: str, search_term: str) -> Iterator[Contact]:
     """
-    Выполняет быстрый поиск контактов по фрагменту слова в любом из полей контакта, включая ID.
+    Лениво выдает контакты, содержащие фрагмент слова в любом из полей, включая ID.
+
+    Большой файл, еще не загруженный в хранилище, просматривается параллельно (см. contacts_parallel).
 
     Args:
         filename (str): Путь к файлу с контактами.
         search_term (str): Поисковый запрос.
 
-    Returns:
-        List[Dict[str, str]]: Список найденных контактов, где каждый контакт представлен в виде словаря.
+    Yields:
+        Contact: Найденный контакт.
+    """
+    if contacts_parallel.should_scan(filename):
+        return contacts_parallel.iter_quick_search(filename, search_term)
+    return get_store(filename).iter_quick_search(search_term)
+
+
+def iter_precise_search(filename: str, **search_criteria) -> Iterator[Contact]:
+    """
+    Лениво выдает контакты, соответствующие всем критериям поиска по регулярным выражениям.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        **search_criteria: Критерии поиска, где ключ - имя поля контакта, а значение - регулярное выражение для поиска.
+
+    Yields:
+        Contact: Найденный контакт.
+    """
+    return iter_matching(filename, search_criteria)
+
+
+def iter_matching(filename: str, search_criteria: Dict[str, str]) -> Iterator[Contact]:
     """
-    headers = ['ID', 'Фамилия', 'Имя', 'Отчество', 'Организация', 'Рабочий телефон', 'Личный телефон']
-    found_contacts = []
+    То же, что iter_precise_search, но критерии передаются словарем. Используется, когда имена полей
+    приходят извне (например, от клиента сервера) и не должны попадать в именованные аргументы функций.
 
-    with open(filename, 'r', encoding='utf-8') as file:
-        next(file)  # Пропускаем заголовок
-        for line in file:
-            contact = dict(zip(headers, line.strip().split(',')))
-            if any(search_term.lower() in value.lower() for value in contact.values()):
-                found_contacts.append(contact)
+    Большой файл, еще не загруженный в хранилище, просматривается параллельно (см. contacts_parallel).
 
-    return found_contacts
+    Args:
+        filename (str): Путь к файлу с контактами.
+        search_criteria (Dict[str, str]): Критерии поиска, где ключ - имя поля контакта, а значение - регулярное
+            выражение для поиска.
+
+    Yields:
+        Contact: Найденный контакт.
+    """
+    if contacts_parallel.should_scan(filename):
+        return contacts_parallel.iter_precise_search(filename, search_criteria)
+    return get_store(filename).iter_precise_search(**search_criteria)
+
+
+@instrumented()
+def quick_search(filename: str, search_term: str) -> List[Contact]:
+    """
+    Выполняет быстрый поиск контактов по фрагменту слова в любом из полей контакта, включая ID.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        search_term (str): Поисковый запрос.
+
+    Returns:
+        List[Contact]: Список найденных контактов, где каждый контакт представлен записью Contact с доступом к полям как к словарю.
+    """
+    return list(iter_quick_search(filename, search_term))
 
 
-def precise_search(filename: str, **search_criteria) -> List[Dict[str, str]]:
+@instrumented()
+def precise_search(filename: str, **search_criteria) -> List[Contact]:
     """
     Выполняет точный поиск контактов по заданным критериям, используя регулярные выражения.
 
@@ -35,27 +84,71 @@ def precise_search(filename: str, **search_criteria) -> List[Dict[str, str]]:
         **search_criteria: Критерии поиска, где ключ - имя поля контакта, а значение - регулярное выражение для поиска.
 
     Returns:
-        List[Dict[str, str]]: Список найденных контактов, соответствующих всем критериям поиска.
-    """
-    headers = ['ID', 'Фамилия', 'Имя', 'Отчество', 'Организация', 'Рабочий телефон', 'Личный телефон']
-    found_contacts = []
-
-    with open(filename, 'r', encoding='utf-8') as file:
-        next(file)
-        contacts = [dict(zip(headers, line.strip().split(','))) for line in file]
-
-    for contact in contacts:
-        match = True
-        for field, pattern in search_criteria.items():
-            if field == 'ID':
-                if not re.search(f"^{pattern}$", contact.get(field, ""), re.IGNORECASE):
-                    match = False
-                    break
-            else:
-                if not re.search(pattern, contact.get(field, ""), re.IGNORECASE):
-                    match = False
-                    break
-        if match:
-            found_contacts.append(contact)
-
-    return found_contacts
+        List[Contact]: Список найденных контактов, соответствующих всем критериям поиска.
+    """
+    return list(iter_precise_search(filename, **search_criteria))
+
+
+@instrumented()
+def fuzzy_search(filename: str, search_term: str) -> List[Contact]:
+    """
+    Выполняет нечеткий поиск по фамилии, имени и отчеству: находит контакты, записанные с опечатками
+    ('Васильэв') или запрошенные латиницей ('Vasiliev'). Кандидаты берутся из фонетического индекса,
+    без перебора всех записей.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        search_term (str): Поисковый запрос.
+
+    Returns:
+        List[Contact]: Список найденных контактов, от наиболее похожих к наименее похожим.
+    """
+    return get_store(filename).fuzzy_search(search_term)
+
+
+@instrumented()
+def reverse_lookup(filename: str, phone: str, min_suffix_digits: int = 4) -> List[Contact]:
+    """
+    Находит контакты по номеру телефона в любой записи ('+74951234567', '8 (495) 123-45-67') или по его
+    последним цифрам. Поиск выполняется по индексу телефонов, без перебора записей.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        phone (str): Полный номер или последние цифры номера.
+        min_suffix_digits (int): Минимальное количество цифр для поиска по окончанию номера.
+
+    Returns:
+        List[Contact]: Список найденных контактов.
+    """
+    store = get_store(filename)
+    if normalize_phone(phone):
+        return store.find_by_phone(phone)
+    digits = ''.join(char for char in phone if char.isdigit())
+    if len(digits) < min_suffix_digits:
+        return []
+    return store.find_by_phone_suffix(digits)
+
+
+@instrumented()
+def ordered_search(filename: str, field: str, equal: Sequence[str] = (), prefix: Optional[str] = None,
+                   low: Optional[str] = None, high: Optional[str] = None) -> List[Contact]:
+    """
+    Выбирает контакты по упорядоченному индексу (см. contacts_sorted) и возвращает их отсортированными,
+    не переписывая файл: фамилии с префиксом 'Ва', сотрудников одной организации по ФИО, диапазон ID.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        field (str): Поле, по которому в первую очередь упорядочен индекс (по умолчанию есть индексы по
+            'ID', 'Фамилия' и 'Организация').
+        equal (Sequence[str]): Точные значения первых полей индекса, начиная с field.
+        prefix (Optional[str]): Префикс значения поля, следующего за полями из equal.
+        low (Optional[str]): Нижняя граница значения следующего поля (включительно).
+        high (Optional[str]): Верхняя граница значения следующего поля (включительно).
+
+    Returns:
+        List[Contact]: Найденные контакты в порядке индекса.
+
+    Raises:
+        ValueError: Если по полю нет упорядоченного индекса или условия некорректны.
+    """
+    return get_store(filename).ordered(field, equal, prefix, low, high)
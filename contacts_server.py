@@ -0,0 +1,273 @@
+"""
+Сервер запросов к телефонному справочнику.
+
+Долгоживущий процесс держит справочник загруженным в память и принимает запросы на локальном
+TCP-порту или Unix-сокете, поэтому запрос не платит за запуск интерпретатора и разбор файла.
+
+Протокол - JSON, разделенный переводами строк: клиент отправляет по одному объекту запроса на строку,
+сервер отвечает по одному объекту на строку в том же порядке. Клиент может отправлять следующие запросы,
+не дожидаясь ответов (конвейерная обработка). Запрос содержит поле "op" и параметры операции, а также
+необязательное поле "id", которое возвращается в ответе:
+
+    {"id": 1, "op": "quick_search", "term": "иванов", "limit": 100}
+    {"id": 1, "ok": true, "result": {"contacts": [...], "more": false}}
+    {"id": 2, "ok": false, "error": "..."}
+
+Операции: quick_search (term), precise_search (criteria), fuzzy_search (term), reverse_lookup (phone),
+page (page, per_page), get (contact_id), count, add (contacts), update (ids, fields и необязательный
+expected - контакты в том виде, в котором их видел клиент, для проверки версий), delete (ids или criteria).
+
+Запуск из корня проекта:
+    python main.py serve --port 8765
+    python main.py serve --unix /tmp/phonebook.sock
+"""
+import asyncio
+import json
+import re
+from itertools import islice
+from typing import Any, Callable, Dict, Optional
+
+from contacts_delete import delete_contact, delete_where
+from contacts_display import read_page
+from contacts_import import validate, value_error
+from contacts_query import compile_query
+from contacts_record import FIELDS
+from contacts_search import fuzzy_search, iter_matching, iter_quick_search, reverse_lookup
+from contacts_storage import get_store
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 1000
+# Длина очереди входящих соединений и максимальная длина строки запроса
+BACKLOG = 4096
+MAX_REQUEST_SIZE = 1 << 20
+
+
+class RequestError(ValueError):
+    """Некорректный запрос клиента."""
+
+
+def _limited(contacts, limit: int) -> Dict[str, Any]:
+    found = list(islice(contacts, limit + 1))
+    return {'contacts': [dict(contact) for contact in found[:limit]], 'more': len(found) > limit}
+
+
+def _param(request: Dict, name: str, kind: type, default: Any = None) -> Any:
+    value = request.get(name, default)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise RequestError(f"Параметр '{name}' должен иметь тип {kind.__name__}")
+    return value
+
+
+def _limit(request: Dict) -> int:
+    limit = _param(request, 'limit', int, DEFAULT_LIMIT)
+    if limit < 0:
+        raise RequestError("Параметр 'limit' не может быть отрицательным")
+    return limit
+
+
+def _criteria(request: Dict) -> Dict[str, str]:
+    criteria = {field: str(value) for field, value in _param(request, 'criteria', dict).items()}
+    unknown = [field for field in criteria if field not in FIELDS]
+    if unknown:
+        raise RequestError(f"Неизвестные поля: {', '.join(unknown)}")
+    return criteria
+
+
+class PhonebookService:
+    """
+    Обработчик запросов к одному файлу контактов.
+
+    Все операции выполняются в потоке цикла событий: хранилище не рассчитано на одновременный доступ
+    из нескольких потоков, а индексы делают отдельный запрос достаточно коротким.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self._operations: Dict[str, Callable[[Dict], Any]] = {
+            'quick_search': self.quick_search,
+            'precise_search': self.precise_search,
+            'fuzzy_search': self.fuzzy_search,
+            'reverse_lookup': self.reverse_lookup,
+            'page': self.page,
+            'get': self.get,
+            'count': self.count,
+            'add': self.add,
+            'update': self.update,
+            'delete': self.delete,
+        }
+
+    def handle(self, request: Any) -> Dict[str, Any]:
+        """
+        Выполняет запрос и формирует ответ.
+
+        Args:
+            request (Any): Разобранный JSON запроса.
+
+        Returns:
+            Dict[str, Any]: Ответ с полем ok и результатом либо описанием ошибки.
+        """
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise RequestError("Запрос должен быть JSON-объектом")
+            operation = self._operations.get(request.get('op'))
+            if operation is None:
+                raise RequestError(f"Неизвестная операция: {request.get('op')}")
+            return {'id': request_id, 'ok': True, 'result': operation(request)}
+        except (RequestError, re.error) as error:
+            return {'id': request_id, 'ok': False, 'error': str(error)}
+        except Exception as error:
+            # Сбой одного запроса не должен закрывать соединение с остальными запросами клиента
+            return {'id': request_id, 'ok': False, 'error': f"Внутренняя ошибка: {type(error).__name__}: {error}"}
+
+    def quick_search(self, request: Dict) -> Dict[str, Any]:
+        return _limited(iter_quick_search(self.filename, _param(request, 'term', str)), _limit(request))
+
+    def precise_search(self, request: Dict) -> Dict[str, Any]:
+        return _limited(iter_matching(self.filename, _criteria(request)), _limit(request))
+
+    def fuzzy_search(self, request: Dict) -> Dict[str, Any]:
+        return _limited(fuzzy_search(self.filename, _param(request, 'term', str)), _limit(request))
+
+    def reverse_lookup(self, request: Dict) -> Dict[str, Any]:
+        return _limited(reverse_lookup(self.filename, _param(request, 'phone', str)), _limit(request))
+
+    def page(self, request: Dict) -> Dict[str, Any]:
+        per_page = _param(request, 'per_page', int, 20)
+        if per_page <= 0:
+            raise RequestError("Параметр 'per_page' должен быть положительным")
+        contacts, total_pages = read_page(self.filename, _param(request, 'page', int, 1), per_page)
+        return {'contacts': [dict(contact) for contact in contacts], 'pages': total_pages}
+
+    def get(self, request: Dict) -> Optional[Dict[str, str]]:
+        contact_id = request.get('contact_id')
+        if not isinstance(contact_id, (str, int)) or isinstance(contact_id, bool):
+            raise RequestError("Параметр 'contact_id' должен быть строкой или числом")
+        contact = get_store(self.filename).get(str(contact_id))
+        return None if contact is None else dict(contact)
+
+    def count(self, request: Dict) -> int:
+        return len(get_store(self.filename))
+
+    def add(self, request: Dict) -> Dict[str, Any]:
+        contacts, rejected = [], []
+        for position, contact in enumerate(_param(request, 'contacts', list)):
+            record, reason = validate(contact) if isinstance(contact, dict) else (None, "ожидался JSON-объект")
+            if record is None:
+                rejected.append({'index': position, 'error': reason})
+            else:
+                contacts.append(record)
+        try:
+            added, duplicates = get_store(self.filename).add(contacts) if contacts else (0, 0)
+        except ValueError as error:
+            raise RequestError(str(error)) from None
+        return {'added': added, 'duplicates': duplicates, 'rejected': rejected}
+
+    def update(self, request: Dict) -> Dict[str, Any]:
+        fields = {field: str(value) for field, value in _param(request, 'fields', dict).items() if field != 'ID'}
+        unknown = [field for field in fields if field not in FIELDS]
+        if unknown:
+            raise RequestError(f"Неизвестные поля: {', '.join(unknown)}")
+        for field, value in fields.items():
+            reason = value_error(field, value)
+            if reason:
+                raise RequestError(f"Некорректное значение: {reason}")
+        store = get_store(self.filename)
+        if 'expected' in request:
+            expected = _param(request, 'expected', list)
+            if not all(isinstance(contact, dict) and 'ID' in contact for contact in expected):
+                raise RequestError("Параметр 'expected' должен быть списком контактов с полем ID")
+            updated, conflicts = store.update_checked(
+                [{field: str(contact.get(field, '')) for field in FIELDS} for contact in expected], fields)
+            return {'updated': updated, 'conflicts': conflicts}
+        ids = [str(contact_id) for contact_id in _param(request, 'ids', list)]
+        return {'updated': store.update(ids, fields), 'conflicts': []}
+
+    def delete(self, request: Dict) -> Dict[str, int]:
+        if 'criteria' in request:
+            criteria = _criteria(request)
+            if not criteria:
+                raise RequestError("Параметр 'criteria' не может быть пустым")
+            return {'deleted': delete_where(self.filename, compile_query(criteria).matches)}
+        return {'deleted': delete_contact(self.filename, [str(contact_id) for contact_id in _param(request, 'ids', list)])}
+
+
+async def _serve_client(service: PhonebookService, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter) -> None:
+    # Запросы одного соединения выполняются по порядку. Ответ отправляется сразу, а drain ждет только
+    # при переполнении буфера отправки, поэтому клиент может отправлять запросы конвейером
+    try:
+        while True:
+            try:
+                line = await reader.readuntil(b'\n')
+            except asyncio.IncompleteReadError as error:
+                line = error.partial
+                if not line.strip():
+                    break
+            except asyncio.LimitOverrunError:
+                writer.write(json.dumps({'id': None, 'ok': False, 'error': "Слишком длинный запрос"}).encode() + b'\n')
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                response = {'id': None, 'ok': False, 'error': f"Некорректный JSON: {error}"}
+            else:
+                response = service.handle(request)
+            writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(filename: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                unix_path: Optional[str] = None) -> None:
+    """
+    Загружает справочник и обслуживает запросы до остановки процесса.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        host (str): Адрес для TCP-подключений.
+        port (int): Порт для TCP-подключений.
+        unix_path (Optional[str]): Путь к Unix-сокету; если указан, TCP не используется.
+    """
+    service = PhonebookService(filename)
+    print(f"Загрузка справочника {filename}...")
+    print(f"Загружено контактов: {len(get_store(filename))}")
+
+    def handler(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        return _serve_client(service, reader, writer)
+
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(handler, unix_path, limit=MAX_REQUEST_SIZE, backlog=BACKLOG)
+        print(f"Сервер слушает {unix_path}")
+    else:
+        server = await asyncio.start_server(handler, host, port, limit=MAX_REQUEST_SIZE, backlog=BACKLOG)
+        print(f"Сервер слушает {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def run_server(filename: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+               unix_path: Optional[str] = None) -> None:
+    """
+    Запускает сервер и останавливает его по Ctrl+C.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        host (str): Адрес для TCP-подключений.
+        port (int): Порт для TCP-подключений.
+        unix_path (Optional[str]): Путь к Unix-сокету.
+    """
+    try:
+        asyncio.run(serve(filename, host, port, unix_path))
+    except KeyboardInterrupt:
+        print("Сервер остановлен.")
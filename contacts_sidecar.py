@@ -0,0 +1,147 @@
+"""
+Служебные файлы индексов рядом с файлом контактов (``<файл>.trigram``, ``.phones``, ``.fuzzy``, ``.sorted``).
+
+Файл индекса - pickle кортежа (версия формата, подпись файла контактов, данные индекса). Он записывается
+во временный файл с номером процесса в имени и атомарно подменяет прежний, поэтому несколько процессов
+могут сохранять индекс одновременно. Индекс загружается, только если версия и подпись совпадают.
+
+Индексы в памяти ссылаются на записи по номерам строк хранилища. Номера строк не совпадают в разных
+процессах: процесс, который сам удалил запись, хранит пропуск на ее месте, а процесс, загрузивший тот же
+файл с журналом заново, - нет. Поэтому в файл записываются позиции записей в файле (0, 1, 2, ...),
+а при загрузке позиции переводятся обратно в номера строк текущего процесса.
+"""
+import os
+import pickle
+from array import array
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple, TypeVar, Union
+
+Postings = Union[int, List[int], array]
+Key = TypeVar('Key', bound=Hashable)
+
+
+def save_sidecar(path: str, version: int, signature: Tuple[int, ...], payload: object) -> None:
+    """
+    Атомарно сохраняет данные индекса.
+
+    Args:
+        path (str): Путь к файлу индекса.
+        version (int): Версия формата индекса.
+        signature (Tuple[int, ...]): Подпись файла контактов, для которого построен индекс.
+        payload (object): Данные индекса с позициями записей вместо номеров строк.
+
+    Raises:
+        OSError: Если файл не удалось записать.
+    """
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        pickle.dump((version, signature, payload), file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def load_sidecar(path: str, version: int, signature: Tuple[int, ...]) -> Optional[object]:
+    """
+    Загружает данные индекса, если файл есть и сохранен в той же версии формата для файла с той же подписью.
+
+    Args:
+        path (str): Путь к файлу индекса.
+        version (int): Версия формата индекса.
+        signature (Tuple[int, ...]): Текущая подпись файла контактов.
+
+    Returns:
+        Optional[object]: Данные индекса или None, если файла нет, он поврежден или устарел.
+    """
+    try:
+        with open(path, 'rb') as file:
+            saved_version, saved_signature, payload = pickle.load(file)
+    except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+        return None
+    if saved_version != version or tuple(saved_signature) != tuple(signature):
+        return None
+    return payload
+
+
+def row_positions(rowids: Iterable[int]) -> Dict[int, int]:
+    """
+    Сопоставляет номерам строк позиции записей в файле.
+
+    Args:
+        rowids (Iterable[int]): Номера строк существующих записей в порядке следования в файле.
+
+    Returns:
+        Dict[int, int]: Номер строки -> позиция.
+    """
+    return {rowid: position for position, rowid in enumerate(rowids)}
+
+
+def is_dense(rowids: Sequence[int]) -> bool:
+    """Совпадают ли номера строк (возрастающие, без повторов) с позициями записей, то есть нет ли пропусков."""
+    return not rowids or rowids[-1] == len(rowids) - 1
+
+
+def to_rowids(positions: Iterable[int], rowids: Sequence[int]) -> Iterable[int]:
+    """
+    Переводит позиции записей из файла индекса в номера строк текущего процесса.
+
+    Args:
+        positions (Iterable[int]): Позиции записей.
+        rowids (Sequence[int]): Номера строк существующих записей в порядке следования в файле.
+
+    Returns:
+        Iterable[int]: Номера строк в том же порядке.
+
+    Raises:
+        IndexError: Если позиция больше количества записей.
+    """
+    return positions if is_dense(rowids) else map(rowids.__getitem__, positions)
+
+
+def postings_to_positions(postings: Mapping[Key, Postings], positions: Mapping[int, int]) -> Dict[Key, Postings]:
+    """
+    Готовит словарь вхождений (ключ -> номер строки, список или массив номеров строк) к сохранению.
+
+    Номера строк заменяются позициями; вхождения удаленных записей отбрасываются, ключи без вхождений
+    не сохраняются. Список из одного вхождения сохраняется как число.
+
+    Args:
+        postings (Mapping[Key, Postings]): Вхождения по ключам.
+        positions (Mapping[int, int]): Номер строки -> позиция (см. row_positions).
+
+    Returns:
+        Dict[Key, Postings]: Вхождения с позициями.
+    """
+    saved = {}
+    for key, rowids in postings.items():
+        if isinstance(rowids, array):
+            dense = array(rowids.typecode, (positions[rowid] for rowid in rowids if rowid in positions))
+        else:
+            dense = [positions[rowid] for rowid in (rowids if isinstance(rowids, list) else [rowids])
+                     if rowid in positions]
+            if len(dense) == 1:
+                dense = dense[0]
+        if isinstance(dense, int) or dense:
+            saved[key] = dense
+    return saved
+
+
+def postings_to_rowids(postings: Dict[Key, Postings], rowids: Sequence[int]) -> Optional[Dict[Key, Postings]]:
+    """
+    Переводит позиции в загруженном словаре вхождений в номера строк текущего процесса.
+
+    Args:
+        postings (Dict[Key, Postings]): Вхождения с позициями.
+        rowids (Sequence[int]): Номера строк существующих записей в порядке следования в файле.
+
+    Returns:
+        Optional[Dict[Key, Postings]]: Вхождения с номерами строк (если пропусков в номерах строк нет - тот же
+            словарь) или None, если позиция больше количества записей.
+    """
+    if is_dense(rowids):
+        return postings
+    lookup = rowids.__getitem__
+    try:
+        return {key: lookup(value) if isinstance(value, int)
+                else array(value.typecode, map(lookup, value)) if isinstance(value, array)
+                else list(map(lookup, value))
+                for key, value in postings.items()}
+    except IndexError:
+        return None
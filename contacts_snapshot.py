@@ -0,0 +1,202 @@
+"""
+Двоичный колоночный снимок файла контактов.
+
+Снимок (``<файл>.snapshot``) хранит значения каждого поля отдельной колонкой: строки UTF-8, разделенные
+переводом строки, и таблицу байтовых смещений начала каждого значения. Файл отображается в память
+через mmap, поэтому заголовок с количеством записей читается мгновенно, а колонка целиком
+разбирается одним вызовом split.
+
+Снимок соответствует исходному файлу, если совпадают размер и время модификации (см. fresh_header).
+Файл, измененный незадолго до записи снимка, могли переписать на месте с тем же размером в пределах
+точности отметок времени файловой системы; для такого снимка дополнительно сверяется CRC32.
+
+Формат (little-endian):
+    заголовок  - MAGIC, версия, число колонок, число записей, размер и время модификации
+                 исходного файла, CRC32 исходного файла;
+    каталог    - для каждой колонки: смещение таблицы смещений, смещение данных, длина данных;
+    колонки    - таблица из (записей + 1) чисел uint64 и данные колонки.
+"""
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from itertools import accumulate
+from typing import List, Optional, Sequence, Tuple
+
+MAGIC = b'PBSNAP\x00\x00'
+VERSION = 1
+_HEADER = struct.Struct('<8sIIQQQI4x')
+_COLUMN = struct.Struct('<QQQ')
+# Наибольшая точность времени модификации среди распространенных файловых систем (FAT - 2 секунды)
+MTIME_GRANULARITY_NS = 2_000_000_000
+
+
+def file_crc32(filename: str) -> int:
+    """
+    Вычисляет CRC32 содержимого файла.
+
+    Args:
+        filename (str): Путь к файлу.
+
+    Returns:
+        int: Контрольная сумма.
+    """
+    crc = 0
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def write_snapshot(path: str, rows: Sequence[Sequence[str]], columns: int, source: str,
+                   source_signature: Tuple[int, int]) -> bool:
+    """
+    Записывает снимок строк исходного файла контактов.
+
+    Args:
+        path (str): Путь к файлу снимка.
+        rows (Sequence[Sequence[str]]): Записи исходного файла в порядке следования.
+        columns (int): Количество полей в записи.
+        source (str): Путь к исходному файлу контактов.
+        source_signature (Tuple[int, int]): Время модификации в наносекундах и размер исходного файла,
+            из которого прочитаны записи.
+
+    Returns:
+        bool: True, если снимок записан; False, если исходный файл успел измениться.
+    """
+    crc = file_crc32(source)
+    stat = os.stat(source)
+    if (stat.st_mtime_ns, stat.st_size) != tuple(source_signature):
+        return False
+    position = _HEADER.size + _COLUMN.size * columns
+    directory = []
+    tables = []
+    for values in (zip(*rows) if rows else [()] * columns):
+        # Длины значений в байтах (плюс разделитель) считаются без цикла на уровне Python
+        offsets = array('Q', accumulate(map((1).__add__, map(len, map(str.encode, values))), initial=0))
+        blob = '\n'.join(values).encode('utf-8')
+        directory.append(_COLUMN.pack(position, position + len(offsets) * offsets.itemsize, len(blob)))
+        tables.append((offsets, blob))
+        position += len(offsets) * offsets.itemsize + len(blob)
+
+    temp_path = f'{path}.{os.getpid()}.tmp'  # Снимок может одновременно записывать и другой процесс
+    with open(temp_path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, columns, len(rows), stat.st_size, stat.st_mtime_ns, crc))
+        file.writelines(directory)
+        for offsets, blob in tables:
+            offsets.tofile(file)
+            file.write(blob)
+    os.replace(temp_path, path)
+    return True
+
+
+def read_header(path: str) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Читает заголовок снимка, не открывая колонки.
+
+    Args:
+        path (str): Путь к файлу снимка.
+
+    Returns:
+        Optional[Tuple[int, int, int, int]]: Количество записей, размер, время модификации и CRC32 исходного
+            файла или None, если снимка нет или формат не поддерживается.
+    """
+    try:
+        with open(path, 'rb') as file:
+            data = file.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, _, rows, size, mtime_ns, crc = _HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return rows, size, mtime_ns, crc
+
+
+def fresh_header(path: str, source: str, source_signature: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Читает заголовок снимка, если снимок соответствует текущему состоянию исходного файла.
+
+    Размер и время модификации сверяются всегда. Если исходный файл изменен меньше чем
+    за MTIME_GRANULARITY_NS до записи снимка, переписанный на месте файл мог сохранить те же размер
+    и время модификации, поэтому дополнительно сверяется CRC32 исходного файла.
+
+    Args:
+        path (str): Путь к файлу снимка.
+        source (str): Путь к исходному файлу контактов.
+        source_signature (Tuple[int, int]): Текущие время модификации в наносекундах и размер исходного файла.
+
+    Returns:
+        Optional[Tuple[int, int, int, int]]: Заголовок (см. read_header) или None, если снимка нет
+            или он устарел.
+    """
+    header = read_header(path)
+    mtime_ns, size = source_signature
+    if header is None or header[1:3] != (size, mtime_ns):
+        return None
+    try:
+        written_ns = os.stat(path).st_mtime_ns
+        if mtime_ns + MTIME_GRANULARITY_NS >= written_ns and file_crc32(source) != header[3]:
+            return None
+    except OSError:
+        return None
+    return header
+
+
+class Snapshot:
+    """
+    Снимок, отображенный в память.
+
+    Attributes:
+        rows (int): Количество записей.
+        source_size (int): Размер исходного файла.
+        source_mtime_ns (int): Время модификации исходного файла.
+        source_crc32 (int): CRC32 исходного файла.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, columns, self.rows, self.source_size, self.source_mtime_ns, self.source_crc32 = \
+            _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"Неподдерживаемый формат снимка: {path}")
+        view = memoryview(self._map)
+        self._columns = []
+        for column in range(columns):
+            offsets_position, blob_position, blob_length = _COLUMN.unpack_from(
+                self._map, _HEADER.size + column * _COLUMN.size)
+            offsets = view[offsets_position:offsets_position + (self.rows + 1) * 8].cast('Q')
+            self._columns.append((offsets, view[blob_position:blob_position + blob_length]))
+
+    def close(self) -> None:
+        """Освобождает отображение файла."""
+        for offsets, blob in self._columns:
+            offsets.release()
+            blob.release()
+        self._columns = []
+        self._map.close()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def column(self, column: int) -> List[str]:
+        """
+        Возвращает все значения колонки.
+
+        Args:
+            column (int): Номер колонки.
+
+        Returns:
+            List[str]: Значения в порядке записей.
+        """
+        if not self.rows:
+            return []
+        return str(self._columns[column][1], 'utf-8').split('\n')
+
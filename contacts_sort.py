@@ -0,0 +1,186 @@
+"""
+Внешняя сортировка файла контактов по фамилии и имени.
+
+Справочник может не помещаться в памяти, поэтому записи читаются потоком и накапливаются порциями
+ограниченного объема. Каждая порция сортируется и сбрасывается во временный файл-серию, после чего
+серии сливаются через heapq.merge, а результат с новыми ID построчно пишется во временный файл,
+который атомарно подменяет исходный. Справочник в другом хранилище (например, SQLite) получает
+отсортированные записи потоком через Storage.replace_all.
+
+Ключи сортировки вычисляются один раз для каждой записи, а не при каждом сравнении. Если в системе есть
+русская локаль, используется ее правило сравнения (locale.strxfrm); иначе буквы сравниваются без учета
+регистра, а «ё» приравнивается к «е».
+"""
+import heapq
+import locale
+import os
+import pickle
+import sys
+import tempfile
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+import contacts_metrics
+from contacts_display import iter_contacts
+from contacts_lock import write_lock
+from contacts_record import Contact
+from contacts_storage import get_store
+from contacts_store import HEADER
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+RUSSIAN_LOCALES = ['ru_RU.UTF-8', 'ru_RU.utf8', 'ru_RU', 'Russian_Russia.1251']
+# Записей в одном сохраняемом блоке серии и серий, сливаемых за один проход
+RUN_BATCH = 4096
+MAX_MERGE_FANIN = 128
+
+Row = Tuple[str, Tuple[str, ...]]
+_sort_key = itemgetter(0)
+
+
+def _fallback_transform(value: str) -> str:
+    return value.casefold().replace('ё', 'е')
+
+
+@contextmanager
+def russian_collation() -> Iterator[Callable[[str], str]]:
+    """
+    Включает русскую локаль сравнения строк на время сортировки.
+
+    Yields:
+        Callable[[str], str]: Функция, переводящая строку в ключ сравнения (locale.strxfrm или
+            упрощенное правило, если русской локали нет).
+    """
+    previous = locale.setlocale(locale.LC_COLLATE)
+    for name in RUSSIAN_LOCALES:
+        try:
+            locale.setlocale(locale.LC_COLLATE, name)
+        except locale.Error:
+            continue
+        try:
+            yield locale.strxfrm
+        finally:
+            locale.setlocale(locale.LC_COLLATE, previous)
+        return
+    yield _fallback_transform
+
+
+def sort_key(contact: Contact, transform: Callable[[str], str]) -> str:
+    """
+    Строит ключ сортировки по фамилии, затем по имени.
+
+    Ключ - одна строка: сначала ключи сравнения фамилии и имени, затем сами значения, чтобы записи,
+    равные с точки зрения локали, упорядочивались одинаково при каждом запуске.
+
+    Args:
+        contact (Contact): Контакт.
+        transform (Callable[[str], str]): Функция получения ключа сравнения строки.
+
+    Returns:
+        str: Ключ сортировки.
+    """
+    return '\x00'.join((transform(contact.last_name), transform(contact.first_name),
+                        contact.last_name, contact.first_name))
+
+
+def _row_size(row: Row) -> int:
+    # Примерный объем памяти, занимаемый записью порции
+    return sys.getsizeof(row[0]) + sum(map(sys.getsizeof, row[1])) + 160
+
+
+def _write_run(rows: Iterable[Row], path: str) -> str:
+    with open(path, 'wb') as file:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= RUN_BATCH:
+                pickle.dump(batch, file, protocol=pickle.HIGHEST_PROTOCOL)
+                batch = []
+        if batch:
+            pickle.dump(batch, file, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Row]:
+    with open(path, 'rb') as file:
+        while True:
+            try:
+                batch = pickle.load(file)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _merge_runs(runs: List[str]) -> List[str]:
+    # Сливает соседние серии группами, пока их не останется столько, сколько можно открыть одновременно.
+    # Порядок серий сохраняется, чтобы сортировка оставалась устойчивой.
+    while len(runs) > MAX_MERGE_FANIN:
+        merged_runs = []
+        for start in range(0, len(runs), MAX_MERGE_FANIN):
+            group = runs[start:start + MAX_MERGE_FANIN]
+            merged = heapq.merge(*map(_read_run, group), key=_sort_key)
+            merged_runs.append(_write_run(merged, group[0] + '.merged'))
+            for path in group:
+                os.remove(path)
+        runs = merged_runs
+    return runs
+
+
+def external_sort(filename: str, memory_limit: int = DEFAULT_MEMORY_LIMIT) -> int:
+    """
+    Сортирует файл контактов по фамилии и имени, присваивая ID с 1, не загружая весь файл в память.
+
+    Изменения из журнала учитываются. Сортировка устойчива: записи с одинаковыми ключами сохраняют
+    прежний порядок. На все время сортировки берется блокировка записи, чтобы изменения других процессов
+    не потерялись при подмене файла.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+        memory_limit (int): Примерный объем памяти в байтах для одной порции записей.
+
+    Returns:
+        int: Количество записей в отсортированном файле.
+    """
+    with write_lock(filename):
+        directory = os.path.dirname(os.path.abspath(filename))
+        temp_path = filename + '.tmp'
+        with russian_collation() as transform, tempfile.TemporaryDirectory(prefix='.sort-', dir=directory) as workdir:
+            runs: List[str] = []
+            chunk: List[Row] = []
+            used = 0
+            for contact in iter_contacts(filename):
+                row = (sort_key(contact, transform), contact.values()[1:])
+                chunk.append(row)
+                used += _row_size(row)
+                if used >= memory_limit:
+                    chunk.sort(key=_sort_key)
+                    runs.append(_write_run(chunk, os.path.join(workdir, f'run-{len(runs)}')))
+                    chunk, used = [], 0
+            chunk.sort(key=_sort_key)
+            if runs:
+                runs = _merge_runs(runs)
+                merged = heapq.merge(*map(_read_run, runs), iter(chunk), key=_sort_key)
+            else:
+                merged = iter(chunk)
+
+            contacts_metrics.count('sort_runs', len(runs))
+            count = 0
+            store = get_store(filename)
+            if not store.flat_file:
+                # Хранилище, которое пишет не в файл CSV, принимает отсортированные записи потоком
+                def renumbered() -> Iterator[Contact]:
+                    nonlocal count
+                    for count, (_, values) in enumerate(merged, start=1):
+                        yield Contact(str(count), *values)
+
+                store.replace_all(renumbered())
+                return count
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                file.write(HEADER + '\n')
+                for count, (_, values) in enumerate(merged, start=1):
+                    file.write(f"{count},{','.join(values)}\n")
+                file.flush()
+                os.fsync(file.fileno())
+                contacts_metrics.count('bytes_written', os.fstat(file.fileno()).st_size)
+        store.replace_file(temp_path)
+        return count
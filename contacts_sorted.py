@@ -0,0 +1,310 @@
+"""
+Упорядоченные вторичные индексы по настраиваемым наборам полей.
+
+Индекс - отсортированный массив кортежей (ключи полей..., номер строки), в котором границы запроса
+находятся делением пополам (bisect). Запросы на равенство ведущих полей, на префикс или диапазон
+следующего поля выполняются за O(log n + k) и выдают записи в порядке индекса: индекс
+(Организация, Фамилия, Имя, Отчество) выдает сотрудников одной организации, отсортированных по ФИО,
+без сортировки всего файла.
+
+Текстовые поля сравниваются без учета регистра так же, как в регулярных выражениях (см. contacts_query.fold_case),
+ID - как числа (нечисловые ID идут после всех числовых).
+В отличие от индексов триграмм и телефонов, вхождения не только добавляются, но и удаляются при изменении
+и удалении записей, поэтому кандидаты из индекса не бывают устаревшими.
+
+Индексы сохраняются рядом с файлом (``<файл>.sorted``) по колонкам, как снимок: для каждого поля -
+список различных ключей и массив их номеров, для номеров строк - массив позиций записей в файле.
+"""
+import bisect
+import math
+import sys
+from array import array
+from operator import itemgetter
+from typing import List, Mapping, Optional, Sequence, Tuple, Union
+
+from contacts_query import fold_case
+from contacts_sidecar import load_sidecar, save_sidecar, to_rowids
+
+INDEX_VERSION = 2
+
+# Наборы полей индексов по умолчанию: ID, ФИО и организация с ФИО
+DEFAULT_COLUMNS = (
+    ('ID',),
+    ('Фамилия', 'Имя', 'Отчество'),
+    ('Организация', 'Фамилия', 'Имя', 'Отчество'),
+)
+NUMERIC_FIELDS = {'ID'}
+
+Key = Union[int, float, str]
+
+
+class _Top:
+    """Значение больше любого ключа; используется как верхняя граница при поиске делением пополам."""
+
+    __slots__ = ()
+
+    def __lt__(self, other: object) -> bool:
+        return False
+
+    def __gt__(self, other: object) -> bool:
+        return True
+
+
+_TOP = _Top()
+
+
+def column_key(field: str, value: str) -> Key:
+    """
+    Вычисляет ключ значения поля в индексе.
+
+    Args:
+        field (str): Имя поля.
+        value (str): Значение поля в записи.
+
+    Returns:
+        Key: Число для ID (math.inf для нечислового ID), для остальных полей - значение в нижнем регистре.
+    """
+    if field in NUMERIC_FIELDS:
+        return int(value) if value.isdigit() else math.inf
+    return sys.intern(fold_case(value))
+
+
+def query_key(field: str, value: Union[int, str]) -> Key:
+    """
+    Приводит значение из условия запроса к виду ключа поля.
+
+    Raises:
+        ValueError: Если значение числового поля не число.
+    """
+    if field in NUMERIC_FIELDS:
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Значение поля {field} должно быть числом: {value!r}") from None
+    return fold_case(str(value))
+
+
+def prefix_successor(prefix: str) -> str:
+    """Возвращает наименьшую строку, которая больше всех строк с префиксом prefix, или '', если такой нет."""
+    for position in range(len(prefix) - 1, -1, -1):
+        if ord(prefix[position]) < sys.maxunicode:
+            return prefix[:position] + chr(ord(prefix[position]) + 1)
+    return ''
+
+
+def check_conditions(columns: Sequence[str], equal: Sequence[Union[int, str]], prefix: Optional[str],
+                     low: Optional[Union[int, str]], high: Optional[Union[int, str]]) -> Optional[str]:
+    """
+    Проверяет условия запроса к упорядоченному индексу по полям columns.
+
+    Returns:
+        Optional[str]: Поле, к которому относятся префикс или диапазон, или None, если их нет.
+
+    Raises:
+        ValueError: Если условий больше, чем полей индекса, префикс задан вместе с диапазоном или для
+            числового поля.
+    """
+    ranged = prefix is not None or low is not None or high is not None
+    if len(equal) + ranged > len(columns):
+        raise ValueError(f"Индекс по полям {', '.join(columns)} не поддерживает столько условий")
+    if prefix is not None and (low is not None or high is not None):
+        raise ValueError("Префикс и диапазон нельзя задавать одновременно")
+    if not ranged:
+        return None
+    field = columns[len(equal)]
+    if prefix is not None and field in NUMERIC_FIELDS:
+        raise ValueError(f"Поиск по префиксу для числового поля {field} не поддерживается")
+    return field
+
+
+class SortedIndex:
+    """
+    Отсортированный массив ключей записей по набору полей.
+
+    Attributes:
+        columns (Tuple[str, ...]): Поля индекса в порядке сортировки.
+        dirty (bool): Изменялся ли индекс после загрузки или сохранения.
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns = tuple(columns)
+        self._entries: List[tuple] = []
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _entry(self, rowid: int, contact: Mapping[str, str]) -> tuple:
+        return tuple(column_key(field, contact[field]) for field in self.columns) + (rowid,)
+
+    def build(self, rows: Mapping[int, Mapping[str, str]]) -> None:
+        """
+        Строит индекс по всем записям хранилища.
+
+        Args:
+            rows (Mapping[int, Mapping[str, str]]): Записи по номерам строк.
+        """
+        key_columns = []
+        for field in self.columns:
+            values = list(map(itemgetter(field), rows.values()))
+            # Ключ вычисляется один раз для каждого различного значения: фамилии и организации повторяются
+            keys = {value: column_key(field, value) for value in set(values)}
+            key_columns.append(list(map(keys.__getitem__, values)))
+        self._entries = sorted(zip(*key_columns, rows))
+        self.dirty = True
+
+    def add(self, rowid: int, contact: Mapping[str, str]) -> None:
+        """Вставляет запись в индекс, сохраняя порядок."""
+        bisect.insort(self._entries, self._entry(rowid, contact))
+        self.dirty = True
+
+    def remove(self, rowid: int, contact: Mapping[str, str]) -> None:
+        """
+        Удаляет запись из индекса.
+
+        Args:
+            rowid (int): Номер строки записи.
+            contact (Mapping[str, str]): Запись в том виде, в котором она была добавлена в индекс.
+        """
+        entry = self._entry(rowid, contact)
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+            self.dirty = True
+
+    def span(self, equal: Sequence[Union[int, str]] = (), prefix: Optional[str] = None,
+             low: Optional[Union[int, str]] = None, high: Optional[Union[int, str]] = None) -> Tuple[int, int]:
+        """
+        Находит границы записей, соответствующих запросу.
+
+        Args:
+            equal (Sequence[Union[int, str]]): Значения первых полей индекса.
+            prefix (Optional[str]): Префикс значения поля, следующего за полями из equal.
+            low (Optional[Union[int, str]]): Нижняя граница следующего поля (включительно).
+            high (Optional[Union[int, str]]): Верхняя граница следующего поля (включительно).
+
+        Returns:
+            Tuple[int, int]: Позиции начала (включительно) и конца (не включительно) в индексе.
+
+        Raises:
+            ValueError: Если условий больше, чем полей индекса, префикс задан вместе с диапазоном или для
+                числового поля, либо граница числового поля не число.
+        """
+        field = check_conditions(self.columns, equal, prefix, low, high)
+        leading = tuple(query_key(column, value) for column, value in zip(self.columns, equal))
+        if field is None:
+            lower, upper = leading, leading + (_TOP,)
+        elif prefix is not None:
+            prefix = fold_case(prefix)
+            successor = prefix_successor(prefix)
+            lower = leading + (prefix,)
+            upper = leading + (successor,) if successor else leading + (_TOP,)
+        else:
+            lower = leading if low is None else leading + (query_key(field, low),)
+            upper = leading + (_TOP,) if high is None else leading + (query_key(field, high), _TOP)
+        start = bisect.bisect_left(self._entries, lower)
+        return start, max(start, bisect.bisect_left(self._entries, upper, start))
+
+    def rowids(self, start: int, stop: int) -> List[int]:
+        """Возвращает номера строк записей с позициями в индексе от start до stop в порядке индекса."""
+        return [entry[-1] for entry in self._entries[start:stop]]
+
+    def find(self, equal: Sequence[Union[int, str]] = (), prefix: Optional[str] = None,
+             low: Optional[Union[int, str]] = None, high: Optional[Union[int, str]] = None) -> List[int]:
+        """
+        Возвращает номера строк записей, соответствующих запросу (см. span), в порядке индекса.
+        """
+        return self.rowids(*self.span(equal, prefix, low, high))
+
+
+class SortedIndexes:
+    """
+    Набор упорядоченных индексов одного файла контактов.
+
+    Attributes:
+        indexes (List[SortedIndex]): Индексы в порядке настройки.
+    """
+
+    def __init__(self, columns: Sequence[Sequence[str]]) -> None:
+        self.indexes = [SortedIndex(index_columns) for index_columns in columns]
+
+    @property
+    def dirty(self) -> bool:
+        return any(index.dirty for index in self.indexes)
+
+    def leading(self, field: str) -> Optional[SortedIndex]:
+        """Возвращает первый индекс, упорядоченный в первую очередь по полю field, или None."""
+        for index in self.indexes:
+            if index.columns[0] == field:
+                return index
+        return None
+
+    def build(self, rows: Mapping[int, Mapping[str, str]]) -> None:
+        for index in self.indexes:
+            index.build(rows)
+
+    def add(self, rowid: int, contact: Mapping[str, str]) -> None:
+        for index in self.indexes:
+            index.add(rowid, contact)
+
+    def remove(self, rowid: int, contact: Mapping[str, str]) -> None:
+        for index in self.indexes:
+            index.remove(rowid, contact)
+
+    def save(self, path: str, signature: Tuple[int, ...], positions: Mapping[int, int]) -> None:
+        """
+        Сохраняет индексы рядом с файлом контактов, перенумеровывая строки по их позициям в файле.
+
+        Args:
+            path (str): Путь к файлу индексов.
+            signature (Tuple[int, ...]): Подпись файла контактов, для которого построены индексы.
+            positions (Mapping[int, int]): Соответствие номера строки ее позиции в файле (см. contacts_sidecar).
+        """
+        saved = []
+        for index in self.indexes:
+            columns = []
+            for column in range(len(index.columns)):
+                keys = list(map(itemgetter(column), index._entries))
+                distinct = list(set(keys))
+                codes = {key: code for code, key in enumerate(distinct)}
+                columns.append((distinct, array('I', map(codes.__getitem__, keys)).tobytes()))
+            # Позиции возрастают вместе с номерами строк, поэтому порядок записей в индексе не меняется
+            rowids = array('q', map(positions.__getitem__, map(itemgetter(-1), index._entries))).tobytes()
+            saved.append((index.columns, columns, rowids))
+        save_sidecar(path, INDEX_VERSION, signature, saved)
+        for index in self.indexes:
+            index.dirty = False
+
+    @classmethod
+    def load(cls, path: str, columns: Sequence[Sequence[str]], signature: Tuple[int, ...],
+             rowids: Sequence[int]) -> Optional['SortedIndexes']:
+        """
+        Загружает сохраненные индексы, если они построены по тем же полям для файла с той же подписью.
+
+        Args:
+            path (str): Путь к файлу индексов.
+            columns (Sequence[Sequence[str]]): Наборы полей индексов.
+            signature (Tuple[int, ...]): Текущая подпись файла контактов.
+            rowids (Sequence[int]): Номера строк записей хранилища в порядке следования в файле; позиции
+                из файла индексов переводятся в них.
+
+        Returns:
+            Optional[SortedIndexes]: Индексы или None, если файла нет или он устарел.
+        """
+        saved = load_sidecar(path, INDEX_VERSION, signature)
+        if saved is None or [tuple(item[0]) for item in saved] != [tuple(item) for item in columns]:
+            return None
+        indexes = cls(columns)
+        try:
+            for index, (_, key_columns, positions) in zip(indexes.indexes, saved):
+                keys = [list(map(distinct.__getitem__, _unpack('I', codes))) for distinct, codes in key_columns]
+                index._entries = list(zip(*keys, to_rowids(_unpack('q', positions), rowids)))
+        except IndexError:
+            return None
+        return indexes
+
+
+def _unpack(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    return values
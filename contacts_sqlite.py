@@ -0,0 +1,642 @@
+"""
+Хранилище контактов во встроенной базе SQLite.
+
+Контакты хранятся в таблице contacts в порядке добавления (столбец seq) и не загружаются в память целиком:
+каждая операция выполняет запрос к базе, поэтому запуск не зависит от размера справочника.
+
+Рядом со значениями полей хранятся ключи для индексов:
+
+- ID как число - диапазоны ID в упорядоченной выборке;
+- фамилия, имя, отчество и организация в нижнем регистре - индексы (Фамилия, Имя, Отчество) и
+  (Организация, Фамилия, Имя, Отчество) для префиксов, равенства и упорядоченной выборки, как в contacts_sorted;
+- нормализованные телефоны, записанные задом наперед, - поиск по номеру и по последним цифрам номера
+  одним диапазоном индекса;
+- хэш содержимого - проверка дубликатов при добавлении.
+
+Быстрый поиск по фрагменту использует полнотекстовый индекс FTS5 с токенизатором триграмм без позиций
+(таблица contacts_fts поддерживается триггерами). Если SQLite собран без FTS5 или фрагмент короче трех
+символов, таблица просматривается целиком. Найденные записи всегда проверяются так же, как при переборе.
+
+База работает в режиме WAL: читатели не блокируют писателя и друг друга. Записи выполняются в транзакциях
+BEGIN IMMEDIATE, поэтому записи разных процессов не затирают друг друга, а ждут освобождения базы.
+Индекс нечеткого поиска строится в памяти при первом нечетком поиске и перестраивается, если базу
+изменил другой процесс.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import contacts_metrics
+from contacts_fuzzy import FuzzyIndex, rank, words
+from contacts_phone import normalize_phone
+from contacts_query import compile_query, fold_case
+from contacts_record import Contact
+from contacts_sorted import DEFAULT_COLUMNS, NUMERIC_FIELDS, check_conditions, prefix_successor, query_key
+from contacts_storage import Storage
+from contacts_store import content_hash
+
+SCHEMA_VERSION = 2
+
+# Столбцы таблицы в порядке FIELDS
+COLUMNS = Contact.__slots__
+# Столбцы ключей упорядоченных индексов
+KEY_COLUMNS = {
+    'ID': 'id_number',
+    'Фамилия': 'last_name_key',
+    'Имя': 'first_name_key',
+    'Отчество': 'middle_name_key',
+    'Организация': 'organization_key',
+}
+BATCH_SIZE = 10000
+# Наибольшее количество параметров в одном запросе к базе
+_MAX_PARAMETERS = 500
+
+_SELECT = f"SELECT {', '.join(COLUMNS)} FROM contacts"
+_INSERT = (f"INSERT INTO contacts ({', '.join(COLUMNS)}, id_number, last_name_key, first_name_key, middle_name_key, "
+           f"organization_key, work_phone_key, personal_phone_key, content_hash) "
+           f"VALUES ({', '.join('?' * (len(COLUMNS) + 8))})")
+_UPDATE = (f"UPDATE contacts SET {', '.join(f'{column} = ?' for column in COLUMNS)}, id_number = ?, "
+           f"last_name_key = ?, first_name_key = ?, middle_name_key = ?, organization_key = ?, "
+           f"work_phone_key = ?, personal_phone_key = ?, content_hash = ? WHERE seq = ?")
+
+_TABLE = f"""
+CREATE TABLE IF NOT EXISTS contacts (
+    seq INTEGER PRIMARY KEY,
+    {', '.join(f'{column} TEXT NOT NULL' for column in COLUMNS)},
+    id_number INTEGER,
+    last_name_key TEXT NOT NULL,
+    first_name_key TEXT NOT NULL,
+    middle_name_key TEXT NOT NULL,
+    organization_key TEXT NOT NULL,
+    work_phone_key TEXT NOT NULL,
+    personal_phone_key TEXT NOT NULL,
+    content_hash BLOB NOT NULL
+)
+"""
+# Индекс по ID нужен и при массовой загрузке (замена записей с повторяющимся ID), остальные
+# при массовой загрузке удаляются и строятся заново
+_ID_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS contacts_id ON contacts (id)"
+_INDEXES = {
+    'contacts_id_number': "contacts (id_number)",
+    'contacts_name': "contacts (last_name_key, first_name_key, middle_name_key)",
+    'contacts_organization': "contacts (organization_key, last_name_key, first_name_key, middle_name_key)",
+    'contacts_work_phone': "contacts (work_phone_key)",
+    'contacts_personal_phone': "contacts (personal_phone_key)",
+    'contacts_content': "contacts (content_hash)",
+}
+_FTS_TABLE = (f"CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5 ({', '.join(COLUMNS)}, "
+              f"content='contacts', content_rowid='seq', tokenize='trigram', detail=none)")
+_FTS_NEW = f"new.seq, {', '.join(f'new.{column}' for column in COLUMNS)}"
+_FTS_OLD = f"'delete', old.seq, {', '.join(f'old.{column}' for column in COLUMNS)}"
+_FTS_TRIGGERS = {
+    'contacts_fts_insert': f"AFTER INSERT ON contacts BEGIN "
+                           f"INSERT INTO contacts_fts (rowid, {', '.join(COLUMNS)}) VALUES ({_FTS_NEW}); END",
+    'contacts_fts_delete': f"AFTER DELETE ON contacts BEGIN "
+                           f"INSERT INTO contacts_fts (contacts_fts, rowid, {', '.join(COLUMNS)}) "
+                           f"VALUES ({_FTS_OLD}); END",
+    'contacts_fts_update': f"AFTER UPDATE ON contacts BEGIN "
+                           f"INSERT INTO contacts_fts (contacts_fts, rowid, {', '.join(COLUMNS)}) VALUES ({_FTS_OLD}); "
+                           f"INSERT INTO contacts_fts (rowid, {', '.join(COLUMNS)}) VALUES ({_FTS_NEW}); END",
+}
+
+
+def phone_key(phone: str) -> str:
+    """
+    Вычисляет ключ телефона для индекса: цифры нормализованного номера в обратном порядке.
+
+    Args:
+        phone (str): Телефон в произвольной записи.
+
+    Returns:
+        str: Ключ или '', если значение пустое или не похоже на телефон.
+    """
+    normalized = normalize_phone(phone)
+    return normalized[:0:-1] if normalized else ''
+
+
+def _row(contact: Contact) -> tuple:
+    # Значения полей и ключи индексов в порядке столбцов запроса _INSERT
+    contact_id = contact.id
+    return contact.values() + (
+        int(contact_id) if contact_id.isdigit() and len(contact_id) < 19 else None,
+        fold_case(contact.last_name), fold_case(contact.first_name), fold_case(contact.middle_name),
+        fold_case(contact.organization), phone_key(contact.work_phone), phone_key(contact.personal_phone),
+        content_hash(contact),
+    )
+
+
+def _contact(row: Sequence[str]) -> Contact:
+    return Contact(*row)
+
+
+def fts_query(term: str) -> str:
+    """
+    Составляет запрос FTS5 для поиска фрагмента: все триграммы фрагмента через AND.
+
+    Индекс хранится без позиций (detail=none), поэтому порядок триграмм не проверяется и возможны лишние
+    совпадения; найденные записи проверяются отдельно. Каждая триграмма берется в кавычки, чтобы ее символы
+    не разбирались как синтаксис запроса.
+
+    Args:
+        term (str): Фрагмент длиной не меньше трех символов.
+
+    Returns:
+        str: Запрос для оператора MATCH.
+    """
+    trigrams = dict.fromkeys(term[start:start + 3] for start in range(len(term) - 2))
+    return ' AND '.join('"' + trigram.replace('"', '""') + '"' for trigram in trigrams)
+
+
+class SqliteStore(Storage):
+    """
+    Контакты одной базы SQLite.
+
+    Соединение с базой открывается при первом обращении. База создается только при полной замене
+    содержимого (replace_all), например при переносе справочника из файла CSV (см. contacts_storage.migrate).
+    """
+
+    def __init__(self, filename: str, timeout: float = 30.0) -> None:
+        super().__init__(filename)
+        self.timeout = timeout
+        self._db: Optional[sqlite3.Connection] = None
+        self._fts = False
+        self._fuzzy: Optional[FuzzyIndex] = None
+        self._fuzzy_version: Optional[int] = None
+
+    def _connection(self, create: bool = False) -> sqlite3.Connection:
+        if self._db is None:
+            if not create and not os.path.exists(self.filename):
+                raise FileNotFoundError(2, "Файл не найден", self.filename)
+            # Транзакции открываются явно (см. _transaction), поэтому модуль sqlite3 не начинает их сам
+            db = sqlite3.connect(self.filename, timeout=self.timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = NORMAL")
+            self._create_schema(db)
+            self._db = db
+        return self._db
+
+    def _create_schema(self, db: sqlite3.Connection) -> None:
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"База {self.filename} создана более новой версией программы")
+        if version == SCHEMA_VERSION:
+            self._fts = db.execute("SELECT 1 FROM sqlite_master WHERE name = 'contacts_fts'").fetchone() is not None
+            return
+        with _transaction(db):
+            db.execute(_TABLE)
+            db.execute(_ID_INDEX)
+            for name, definition in _INDEXES.items():
+                db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+            try:
+                db.execute(_FTS_TABLE)
+            except sqlite3.OperationalError:  # SQLite без FTS5 или без токенизатора триграмм
+                self._fts = False
+            else:
+                self._fts = True
+                for name, definition in _FTS_TRIGGERS.items():
+                    db.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {definition}")
+            if version == 1:
+                # Версия 1 приводила ключи к нижнему регистру через str.lower(), который различает
+                # некоторые буквы, равные для re.IGNORECASE (см. fold_case)
+                db.create_function('fold_case', 1, fold_case, deterministic=True)
+                keys = [(f'{column}_key', column)
+                        for column in ('last_name', 'first_name', 'middle_name', 'organization')]
+                db.execute(f"UPDATE contacts SET {', '.join(f'{key} = fold_case({column})' for key, column in keys)} "
+                           f"WHERE {' OR '.join(f'{key} != fold_case({column})' for key, column in keys)}")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM contacts").fetchone()[0]
+
+    def _query(self, where: str = '', parameters: Sequence = (), order: str = 'seq') -> Iterator[Contact]:
+        sql = f"{_SELECT} {f'WHERE {where}' if where else ''} ORDER BY {order}"
+        return map(_contact, self._connection().execute(sql, parameters))
+
+    def _rows(self, seqs: Sequence[int]) -> Iterator[Tuple[int, Contact]]:
+        # Записи с указанными номерами порциями по _MAX_PARAMETERS номеров; удаленные пропускаются
+        db = self._connection()
+        for start in range(0, len(seqs), _MAX_PARAMETERS):
+            chunk = seqs[start:start + _MAX_PARAMETERS]
+            sql = f"SELECT seq, {', '.join(COLUMNS)} FROM contacts WHERE seq IN ({', '.join('?' * len(chunk))})"
+            for row in db.execute(sql, chunk):
+                yield row[0], _contact(row[1:])
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        """
+        Лениво выдает все контакты в порядке добавления.
+
+        Yields:
+            Contact: Контакт.
+        """
+        rows = 0
+        try:
+            for rows, contact in enumerate(self._query(), start=1):
+                yield contact
+        finally:
+            contacts_metrics.count('rows_scanned', rows)
+
+    def slice(self, start: int, stop: int) -> List[Contact]:
+        """
+        Возвращает контакты с позициями от start (включительно) до stop (не включительно).
+
+        Args:
+            start (int): Начальная позиция.
+            stop (int): Конечная позиция.
+
+        Returns:
+            List[Contact]: Список контактов.
+        """
+        if stop <= start:
+            return []
+        sql = f"{_SELECT} ORDER BY seq LIMIT ? OFFSET ?"
+        return list(map(_contact, self._connection().execute(sql, (stop - start, start))))
+
+    def get(self, contact_id: str) -> Optional[Contact]:
+        """
+        Находит контакт по ID через индекс.
+
+        Args:
+            contact_id (str): Идентификатор контакта.
+
+        Returns:
+            Optional[Contact]: Контакт или None, если контакт не найден.
+        """
+        return next(self._query("id = ?", (contact_id,)), None)
+
+    def iter_quick_search(self, search_term: str) -> Iterator[Contact]:
+        """
+        Лениво выдает контакты, у которых любое поле содержит фрагмент без учета регистра.
+
+        Args:
+            search_term (str): Поисковый запрос.
+
+        Yields:
+            Contact: Найденный контакт.
+        """
+        term = search_term.lower()
+        db = self._connection()
+        if self._fts and len(term) >= 3:
+            rows = self._query("seq IN (SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)",
+                               (fts_query(term),))
+        else:
+            rows = self._query()
+        scanned = 0
+        try:
+            for scanned, contact in enumerate(rows, start=1):
+                if any(term in value.lower() for value in contact.values()):
+                    yield contact
+        finally:
+            contacts_metrics.count('rows_scanned', scanned)
+
+    def iter_precise_search(self, **search_criteria) -> Iterator[Contact]:
+        """
+        Лениво выдает контакты, у которых все указанные поля соответствуют регулярным выражениям.
+
+        Критерий ID без метасимволов выполняется как поиск по индексу ID, литеральные начала выражений для
+        фамилии, имени, отчества и организации - как условия на ключи полей, для которых SQLite выбирает
+        подходящий индекс. Остальные условия проверяются так же, как при переборе.
+
+        Args:
+            **search_criteria: Критерии поиска, где ключ - имя поля, а значение - регулярное выражение.
+                Для поля ID выражение должно совпадать со значением целиком.
+
+        Yields:
+            Contact: Найденный контакт.
+
+        Raises:
+            re.error: Если одно из выражений некорректно.
+        """
+        plan = compile_query(search_criteria)
+        conditions, parameters = [], []
+        if plan.id_literal is not None:
+            conditions.append("id = ?")
+            parameters.append(plan.id_literal)
+        for field, (literal, exact) in plan.prefixes.items():
+            column = KEY_COLUMNS.get(field)
+            if column is None or field in NUMERIC_FIELDS:
+                continue
+            if exact:
+                conditions.append(f"{column} = ?")
+                parameters.append(literal)
+            else:
+                conditions.append(f"{column} >= ?")
+                parameters.append(literal)
+                successor = prefix_successor(literal)
+                if successor:
+                    conditions.append(f"{column} < ?")
+                    parameters.append(successor)
+        scanned = 0
+        try:
+            for scanned, contact in enumerate(self._query(' AND '.join(conditions), parameters), start=1):
+                if plan.matches(contact):
+                    yield contact
+        finally:
+            contacts_metrics.count('rows_scanned', scanned)
+
+    def ordered(self, field: str, equal: Sequence[Union[int, str]] = (), prefix: Optional[str] = None,
+                low: Optional[Union[int, str]] = None, high: Optional[Union[int, str]] = None) -> List[Contact]:
+        """
+        Выбирает контакты по индексу, первое поле которого - field, и возвращает их в порядке индекса.
+
+        Наборы полей те же, что у упорядоченных индексов файла CSV (contacts_sorted.DEFAULT_COLUMNS).
+
+        Args:
+            field (str): Первое поле индекса.
+            equal (Sequence[Union[int, str]]): Значения первых полей индекса, начиная с field (без учета регистра).
+            prefix (Optional[str]): Префикс значения поля, следующего за полями из equal.
+            low (Optional[Union[int, str]]): Нижняя граница значения следующего поля (включительно).
+            high (Optional[Union[int, str]]): Верхняя граница значения следующего поля (включительно).
+
+        Returns:
+            List[Contact]: Найденные контакты в порядке индекса.
+
+        Raises:
+            ValueError: Если нет индекса, упорядоченного по полю field, или условия запроса некорректны.
+        """
+        columns = next((columns for columns in DEFAULT_COLUMNS if columns[0] == field), None)
+        if columns is None:
+            raise ValueError(f"Нет упорядоченного индекса по полю {field}")
+        ranged_field = check_conditions(columns, equal, prefix, low, high)
+        conditions = [f"{KEY_COLUMNS[column]} = ?" for column in columns[:len(equal)]]
+        parameters = [query_key(column, value) for column, value in zip(columns, equal)]
+        if ranged_field is not None:
+            column = KEY_COLUMNS[ranged_field]
+            if prefix is not None:
+                prefix = fold_case(prefix)
+                conditions.append(f"{column} >= ?")
+                parameters.append(prefix)
+                successor = prefix_successor(prefix)
+                if successor:
+                    conditions.append(f"{column} < ?")
+                    parameters.append(successor)
+            if low is not None:
+                conditions.append(f"{column} >= ?")
+                parameters.append(query_key(ranged_field, low))
+            if high is not None:
+                conditions.append(f"{column} <= ?")
+                parameters.append(query_key(ranged_field, high))
+        # Нечисловые ID (NULL в id_number) идут после всех числовых, как в contacts_sorted
+        order = ', '.join(f"{KEY_COLUMNS[column]} IS NULL, {KEY_COLUMNS[column]}" if column in NUMERIC_FIELDS
+                          else KEY_COLUMNS[column] for column in columns)
+        contacts = list(self._query(' AND '.join(conditions), parameters, f"{order}, seq"))
+        contacts_metrics.count('rows_scanned', len(contacts))
+        return contacts
+
+    def find_by_phone(self, phone: str) -> List[Contact]:
+        """
+        Находит контакты, у которых рабочий или личный телефон совпадает с номером после нормализации.
+
+        Args:
+            phone (str): Номер в произвольной записи, например '8 (495) 123-45-67'.
+
+        Returns:
+            List[Contact]: Найденные контакты в порядке добавления.
+        """
+        key = phone_key(phone)
+        if not key:
+            return []
+        return list(self._query("work_phone_key = ? OR personal_phone_key = ?", (key, key)))
+
+    def find_by_phone_suffix(self, digits: str) -> List[Contact]:
+        """
+        Находит контакты, у которых рабочий или личный телефон оканчивается на указанные цифры.
+
+        Ключ телефона записан задом наперед, поэтому последние цифры номера - префикс ключа.
+
+        Args:
+            digits (str): Последние цифры номера.
+
+        Returns:
+            List[Contact]: Найденные контакты в порядке добавления.
+        """
+        if not digits.isdigit() or not digits.isascii():
+            return []
+        low, high = digits[::-1], prefix_successor(digits[::-1])
+        return list(self._query("(work_phone_key >= ? AND work_phone_key < ?) "
+                                "OR (personal_phone_key >= ? AND personal_phone_key < ?)", (low, high, low, high)))
+
+    def fuzzy_search(self, search_term: str, max_distance: Optional[int] = None) -> List[Contact]:
+        """
+        Ищет контакты по фамилии, имени или отчеству с опечатками или в латинской транслитерации.
+
+        Кандидаты берутся из индекса фонетических ключей и транслитераций в памяти (см. contacts_fuzzy),
+        записи кандидатов читаются из базы по номерам.
+
+        Args:
+            search_term (str): Запрос, например 'Васильэв', 'Vasiliev Ivan'.
+            max_distance (Optional[int]): Наибольшее расстояние для одного слова; по умолчанию одна
+                опечатка на каждые три буквы слова.
+
+        Returns:
+            List[Contact]: Найденные контакты по возрастанию суммарного расстояния, при равенстве - в порядке
+                добавления.
+        """
+        query = words(search_term)
+        if not query:
+            return []
+        index = self._fuzzy_index()
+        seqs = None
+        for word in query:
+            candidates = index.candidates(word)
+            seqs = candidates if seqs is None else seqs & candidates
+        contacts_metrics.count('rows_scanned', len(seqs))
+        # Кандидаты из индекса могут быть устаревшими, поэтому ранжируются только существующие записи
+        return rank(query, sorted(self._rows(sorted(seqs)), key=lambda row: row[0]), max_distance)
+
+    def _fuzzy_index(self) -> FuzzyIndex:
+        # PRAGMA data_version меняется, когда базу изменяет другое соединение
+        version = self._connection().execute("PRAGMA data_version").fetchone()[0]
+        contacts_metrics.cache('fuzzy_index', self._fuzzy is not None and version == self._fuzzy_version)
+        if self._fuzzy is None or version != self._fuzzy_version:
+            self._fuzzy = FuzzyIndex()
+            for row in self._connection().execute("SELECT seq, last_name, first_name, middle_name FROM contacts"):
+                self._fuzzy.add(row[0], row[1:])
+            self._fuzzy_version = version
+        return self._fuzzy
+
+    def _index_names(self, seq: int, contact: Contact) -> None:
+        if self._fuzzy is not None:
+            self._fuzzy.add(seq, (contact.last_name, contact.first_name, contact.middle_name))
+
+    def _find_id(self, db: sqlite3.Connection, contact_id: str) -> Optional[Tuple[int, Contact]]:
+        row = db.execute(f"SELECT seq, {', '.join(COLUMNS)} FROM contacts WHERE id = ?", (contact_id,)).fetchone()
+        return None if row is None else (row[0], _contact(row[1:]))
+
+    def add(self, contacts: List[Dict[str, str]]) -> Tuple[int, int]:
+        """
+        Добавляет контакты, пропуская дубликаты без учета ID.
+
+        Дубликаты ищутся по индексу хэшей содержимого и внутри добавляемого списка. Контактам без ID
+        присваиваются последовательные идентификаторы после наибольшего числового ID в базе.
+
+        Args:
+            contacts (List[Dict[str, str]]): Новые контакты.
+
+        Returns:
+            Tuple[int, int]: Количество добавленных контактов и количество найденных дубликатов.
+
+        Raises:
+            ValueError: Если заданный ID уже есть в справочнике или повторяется в списке; в этом случае
+                не добавляется ни один контакт.
+        """
+        db = self._connection()
+        added = []
+        with _transaction(db):
+            next_id = (db.execute("SELECT max(id_number) FROM contacts").fetchone()[0] or 0) + 1
+            batch_hashes = set()
+            duplicates = 0
+            for contact in contacts:
+                # Добавляем ID только новым контактам, если ID не задан
+                contact['ID'] = contact.get('ID', str(next_id))
+                record = Contact.from_mapping(contact)
+                row = _row(record)
+                key = row[-1]
+                if key in batch_hashes or db.execute("SELECT 1 FROM contacts WHERE content_hash = ? LIMIT 1",
+                                                     (key,)).fetchone():
+                    duplicates += 1
+                    continue
+                batch_hashes.add(key)
+                try:
+                    seq = db.execute(_INSERT, row).lastrowid
+                except sqlite3.IntegrityError:
+                    raise ValueError(f"Контакт с ID {record.id} уже есть в справочнике") from None
+                added.append((seq, record))
+                if record.id.isdigit():
+                    next_id = max(next_id, int(record.id) + 1)  # Подготовка ID для следующего контакта
+        # Индекс в памяти пополняется только после фиксации транзакции, отмененные строки в него не попадают
+        for seq, record in added:
+            self._index_names(seq, record)
+        return len(added), duplicates
+
+    def _apply_update(self, db: sqlite3.Connection, contact_ids: Iterable[str], updates: Mapping[str, str]) -> int:
+        updated = 0
+        for contact_id in dict.fromkeys(contact_ids):
+            found = self._find_id(db, contact_id)
+            if found is not None:
+                seq, contact = found
+                contact = contact.replace(updates)
+                db.execute(_UPDATE, _row(contact) + (seq,))
+                self._index_names(seq, contact)
+                updated += 1
+        return updated
+
+    def update(self, contact_ids: Iterable[str], updates: Dict[str, str]) -> int:
+        """
+        Изменяет поля контактов с указанными ID.
+
+        Args:
+            contact_ids (Iterable[str]): Идентификаторы изменяемых контактов.
+            updates (Dict[str, str]): Новые значения полей.
+
+        Returns:
+            int: Количество обновленных контактов; 0, если изменяемых полей нет.
+        """
+        if not updates:
+            return 0
+        db = self._connection()
+        with _transaction(db):
+            return self._apply_update(db, contact_ids, updates)
+
+    def update_checked(self, expected: Iterable[Contact], updates: Dict[str, str]) -> Tuple[int, List[str]]:
+        """
+        Изменяет поля контактов, проверяя, что их не изменили с момента, когда они были прочитаны.
+
+        Проверка и изменение выполняются в одной транзакции. Если с момента чтения контакт изменил другой
+        процесс, но другие поля, изменения объединяются; если другой процесс изменил одно из обновляемых
+        полей иначе или удалил контакт, изменение этого контакта отклоняется.
+
+        Args:
+            expected (Iterable[Contact]): Контакты в том виде, в котором их видел пользователь.
+            updates (Dict[str, str]): Новые значения полей.
+
+        Returns:
+            Tuple[int, List[str]]: Количество обновленных контактов и ID отклоненных из-за конфликта;
+                (0, []), если изменяемых полей нет.
+        """
+        if not updates:
+            return 0, []
+        db = self._connection()
+        with _transaction(db):
+            accepted, conflicts = [], []
+            for contact in expected:
+                found = self._find_id(db, contact['ID'])
+                current = None if found is None else found[1]
+                if current is None or any(current[field] != contact[field] and current[field] != str(value)
+                                          for field, value in updates.items()):
+                    conflicts.append(contact['ID'])
+                else:
+                    accepted.append(contact['ID'])
+            return self._apply_update(db, accepted, updates), conflicts
+
+    def delete(self, contact_ids: Iterable[str]) -> int:
+        """
+        Удаляет контакты с указанными ID.
+
+        Args:
+            contact_ids (Iterable[str]): Идентификаторы удаляемых контактов.
+
+        Returns:
+            int: Количество удаленных контактов.
+        """
+        db = self._connection()
+        with _transaction(db):
+            cursor = db.executemany("DELETE FROM contacts WHERE id = ?",
+                                    ((contact_id,) for contact_id in dict.fromkeys(contact_ids)))
+            return max(cursor.rowcount, 0)
+
+    def replace_all(self, contacts: Iterable[Mapping[str, str]]) -> None:
+        """
+        Заменяет содержимое базы указанными контактами, создавая базу, если ее нет.
+
+        Контакты вставляются порциями по BATCH_SIZE в одной транзакции, а вторичные индексы и полнотекстовый
+        индекс на время вставки удаляются и строятся заново после нее: так загрузка миллиона записей
+        занимает секунды, а не минуты. Из контактов с одинаковым ID остается последний.
+
+        Args:
+            contacts (Iterable[Mapping[str, str]]): Новый полный список контактов (может быть генератором).
+        """
+        db = self._connection(create=True)
+        with _transaction(db):
+            for name in _INDEXES:
+                db.execute(f"DROP INDEX IF EXISTS {name}")
+            if self._fts:
+                for name in _FTS_TRIGGERS:
+                    db.execute(f"DROP TRIGGER IF EXISTS {name}")
+            db.execute("DELETE FROM contacts")
+            insert = _INSERT.replace("INSERT", "INSERT OR REPLACE", 1)
+            batch = []
+            for contact in contacts:
+                batch.append(_row(Contact.from_mapping(contact)))
+                if len(batch) >= BATCH_SIZE:
+                    db.executemany(insert, batch)
+                    batch.clear()
+            db.executemany(insert, batch)
+            for name, definition in _INDEXES.items():
+                db.execute(f"CREATE INDEX {name} ON {definition}")
+            if self._fts:
+                db.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')")
+                for name, definition in _FTS_TRIGGERS.items():
+                    db.execute(f"CREATE TRIGGER {name} {definition}")
+        self._fuzzy = None
+        db.execute("PRAGMA optimize")
+
+    def close(self) -> None:
+        """Обновляет статистику планировщика запросов и закрывает соединение с базой."""
+        if self._db is not None:
+            self._db.execute("PRAGMA optimize")
+            self._db.close()
+            self._db = None
+            self._fuzzy = None
+
+
+@contextmanager
+def _transaction(db: sqlite3.Connection) -> Iterator[None]:
+    # BEGIN IMMEDIATE сразу захватывает блокировку записи: другие писатели ждут до timeout соединения
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
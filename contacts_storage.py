@@ -0,0 +1,275 @@
+"""
+Хранилища контактов и выбор хранилища по имени файла.
+
+Все модули работают со справочником через хранилище (get_store) и не зависят от способа хранения.
+Хранилище реализует интерфейс Storage; способ хранения выбирается по расширению файла:
+
+- ``*.db``, ``*.sqlite``, ``*.sqlite3`` - база SQLite (см. contacts_sqlite);
+- любое другое имя - текстовый файл CSV, загружаемый в память (см. contacts_store).
+
+Для файла CSV часть операций (потоковое чтение, постраничный вывод по смещениям строк, параллельный
+поиск, удаление перезаписью файла, внешняя сортировка) выполняется напрямую с файлом, минуя хранилище;
+такие модули проверяют признак Storage.flat_file.
+
+Модуль хранилища SQLite импортируется только при открытии базы, чтобы не замедлять запуск для CSV.
+"""
+import atexit
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from contacts_record import Contact
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+BACKENDS = ('csv', 'sqlite')
+
+
+class Storage(ABC):
+    """
+    Интерфейс хранилища контактов.
+
+    Контакты хранятся в порядке добавления; ID уникален. Методы поиска проверяют условия так же,
+    как contacts_query, поэтому результаты не зависят от способа хранения.
+
+    Attributes:
+        filename (str): Путь к файлу справочника.
+        flat_file (bool): Является ли файл текстовым CSV, который другие модули могут читать
+            и переписывать напрямую.
+    """
+
+    flat_file = False
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Возвращает количество контактов."""
+
+    def count(self) -> int:
+        """Возвращает количество контактов; хранилище может ответить без загрузки записей."""
+        return len(self)
+
+    @abstractmethod
+    def iter_contacts(self) -> Iterator[Contact]:
+        """Лениво выдает все контакты в порядке добавления."""
+
+    def contacts(self) -> List[Contact]:
+        """
+        Возвращает все контакты в порядке следования в файле.
+
+        Returns:
+            List[Contact]: Список контактов.
+        """
+        return list(self.iter_contacts())
+
+    @abstractmethod
+    def slice(self, start: int, stop: int) -> List[Contact]:
+        """Возвращает контакты с позициями от start (включительно) до stop (не включительно)."""
+
+    @abstractmethod
+    def get(self, contact_id: str) -> Optional[Contact]:
+        """Находит контакт по ID или возвращает None."""
+
+    def quick_search(self, search_term: str) -> List[Contact]:
+        """
+        Ищет контакты, у которых любое поле содержит фрагмент без учета регистра.
+
+        Args:
+            search_term (str): Поисковый запрос.
+
+        Returns:
+            List[Contact]: Список найденных контактов.
+        """
+        return list(self.iter_quick_search(search_term))
+
+    @abstractmethod
+    def iter_quick_search(self, search_term: str) -> Iterator[Contact]:
+        """Лениво выдает контакты, у которых любое поле содержит фрагмент без учета регистра."""
+
+    def precise_search(self, **search_criteria) -> List[Contact]:
+        """
+        Ищет контакты, у которых все указанные поля соответствуют регулярным выражениям.
+
+        Args:
+            **search_criteria: Критерии поиска, где ключ - имя поля, а значение - регулярное выражение.
+                Для поля ID выражение должно совпадать со значением целиком.
+
+        Returns:
+            List[Contact]: Список найденных контактов.
+        """
+        return list(self.iter_precise_search(**search_criteria))
+
+    @abstractmethod
+    def iter_precise_search(self, **search_criteria) -> Iterator[Contact]:
+        """Лениво выдает контакты, у которых все указанные поля соответствуют регулярным выражениям."""
+
+    @abstractmethod
+    def find_by_phone(self, phone: str) -> List[Contact]:
+        """Находит контакты, у которых рабочий или личный телефон совпадает с номером после нормализации."""
+
+    @abstractmethod
+    def find_by_phone_suffix(self, digits: str) -> List[Contact]:
+        """Находит контакты, у которых рабочий или личный телефон оканчивается на указанные цифры."""
+
+    @abstractmethod
+    def fuzzy_search(self, search_term: str, max_distance: Optional[int] = None) -> List[Contact]:
+        """Ищет контакты по фамилии, имени или отчеству с опечатками или в латинской транслитерации."""
+
+    @abstractmethod
+    def ordered(self, field: str, equal: Sequence[Union[int, str]] = (), prefix: Optional[str] = None,
+                low: Optional[Union[int, str]] = None, high: Optional[Union[int, str]] = None) -> List[Contact]:
+        """Выбирает контакты по упорядоченному индексу с первым полем field в порядке индекса."""
+
+    @abstractmethod
+    def add(self, contacts: List[Dict[str, str]]) -> Tuple[int, int]:
+        """
+        Добавляет контакты, пропуская дубликаты без учета ID.
+
+        Контактам без ID выдаются последовательные идентификаторы после наибольшего. Заданный ID должен
+        быть новым: если он уже есть в справочнике или повторяется в списке, не добавляется ни один контакт.
+
+        Args:
+            contacts (List[Dict[str, str]]): Новые контакты.
+
+        Returns:
+            Tuple[int, int]: Количество добавленных контактов и количество найденных дубликатов.
+
+        Raises:
+            ValueError: Если заданный ID уже занят.
+        """
+
+    @abstractmethod
+    def update(self, contact_ids: Iterable[str], updates: Dict[str, str]) -> int:
+        """Изменяет поля контактов с указанными ID; возвращает количество обновленных."""
+
+    @abstractmethod
+    def update_checked(self, expected: Iterable[Contact], updates: Dict[str, str]) -> Tuple[int, List[str]]:
+        """Изменяет поля контактов, отклоняя изменения контактов, измененных с момента чтения."""
+
+    @abstractmethod
+    def delete(self, contact_ids: Iterable[str]) -> int:
+        """Удаляет контакты с указанными ID; возвращает количество удаленных."""
+
+    @abstractmethod
+    def replace_all(self, contacts: Iterable[Mapping[str, str]]) -> None:
+        """Заменяет содержимое справочника указанными контактами."""
+
+    def close(self) -> None:
+        """Сохраняет несохраненное состояние и освобождает ресурсы хранилища."""
+
+
+def backend_for(filename: str) -> str:
+    """
+    Определяет способ хранения по имени файла.
+
+    Args:
+        filename (str): Путь к файлу справочника.
+
+    Returns:
+        str: 'sqlite' для файлов с расширением из SQLITE_SUFFIXES, иначе 'csv'.
+    """
+    return 'sqlite' if filename.lower().endswith(SQLITE_SUFFIXES) else 'csv'
+
+
+def open_storage(filename: str, backend: Optional[str] = None) -> Storage:
+    """
+    Создает новое хранилище файла, не регистрируя его как общее.
+
+    Args:
+        filename (str): Путь к файлу справочника.
+        backend (Optional[str]): 'csv' или 'sqlite'; по умолчанию по расширению файла.
+
+    Returns:
+        Storage: Хранилище.
+
+    Raises:
+        ValueError: Если способ хранения неизвестен.
+    """
+    backend = backend or backend_for(filename)
+    if backend == 'csv':
+        from contacts_store import ContactStore
+        return ContactStore(filename)
+    if backend == 'sqlite':
+        from contacts_sqlite import SqliteStore
+        return SqliteStore(filename)
+    raise ValueError(f"Неизвестный способ хранения: {backend}")
+
+
+_stores: Dict[str, Storage] = {}
+
+
+def get_store(filename: str) -> Storage:
+    """
+    Возвращает общее для всех модулей хранилище контактов указанного файла.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+
+    Returns:
+        Storage: Хранилище контактов. Данные загружаются при первом обращении к ним.
+    """
+    key = os.path.abspath(filename)
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = open_storage(filename)
+    return store
+
+
+@atexit.register
+def close_stores() -> None:
+    """Закрывает все открытые хранилища; следующее обращение к файлу откроет его заново."""
+    while _stores:
+        _, store = _stores.popitem()
+        store.close()
+
+
+def count_contacts(filename: str) -> int:
+    """
+    Возвращает количество контактов в справочнике.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+
+    Returns:
+        int: Количество контактов.
+
+    Raises:
+        FileNotFoundError: Если файла с контактами нет.
+    """
+    return get_store(filename).count()
+
+
+def migrate(source: str, target: str) -> int:
+    """
+    Переносит все контакты из одного справочника в другой, например из CSV в SQLite и обратно.
+
+    Контакты переносятся с прежними ID и в прежнем порядке. Файл CSV без неперенесенных изменений читается
+    потоково, не загружаясь в память. Целевой справочник создается заново: существующий файл с таким именем
+    заменяется.
+
+    Args:
+        source (str): Путь к исходному справочнику.
+        target (str): Путь к новому справочнику; способ хранения определяется по расширению.
+
+    Returns:
+        int: Количество перенесенных контактов.
+
+    Raises:
+        FileNotFoundError: Если исходного справочника нет.
+        ValueError: Если исходный и целевой файлы совпадают.
+    """
+    if os.path.abspath(source) == os.path.abspath(target):
+        raise ValueError("Исходный и целевой справочники совпадают")
+    if not os.path.exists(source):
+        raise FileNotFoundError(2, "Файл не найден", source)
+    from contacts_display import iter_contacts  # contacts_display сам импортирует этот модуль
+    migrated = 0
+
+    def contacts() -> Iterator[Contact]:
+        nonlocal migrated
+        for migrated, contact in enumerate(iter_contacts(source), start=1):
+            yield contact
+
+    get_store(target).replace_all(contacts())
+    return migrated
@@ -0,0 +1,802 @@
+"""
+Хранилище контактов в текстовом файле CSV, загружаемом в память.
+
+Файл с контактами разбирается один раз, после чего записи хранятся в памяти вместе с индексом
+ID -> запись. Повторная загрузка выполняется только при изменении времени модификации или размера файла
+либо его журнала, поэтому все действия меню работают с уже разобранными данными.
+
+Разобранное содержимое файла сохраняется в двоичный колоночный снимок (см. contacts_snapshot), из которого
+следующий запуск загружает записи без разбора текста, пока файл не изменится.
+
+Изменения и удаления не перезаписывают файл, а дописываются в журнал (см. contacts_journal). Когда в журнале
+накапливается compact_threshold операций, он переносится в файл атомарной заменой.
+
+Все операции записи выполняются под блокировкой файла (см. contacts_lock) и начинаются с перечитывания
+изменений, сделанных другими процессами, поэтому записи разных процессов не затирают друг друга.
+
+Хранилище реализует интерфейс contacts_storage.Storage и выбирается для всех файлов, кроме баз SQLite.
+"""
+import functools
+import hashlib
+import os
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+import contacts_metrics
+from contacts_fuzzy import FuzzyIndex, rank, words
+from contacts_journal import Journal
+from contacts_lock import write_lock
+from contacts_offsets import OffsetIndex
+from contacts_phone import PhoneIndex, normalize_phone
+from contacts_query import compile_query
+from contacts_record import FIELDS, Contact
+from contacts_sidecar import row_positions
+from contacts_snapshot import Snapshot, fresh_header, write_snapshot
+from contacts_sorted import DEFAULT_COLUMNS, NUMERIC_FIELDS, SortedIndex, SortedIndexes
+from contacts_storage import Storage
+from contacts_trigram import TrigramIndex
+
+HEADER = ','.join(FIELDS)
+
+
+def parse_line(line: str) -> Optional[Contact]:
+    """
+    Разбирает строку файла в запись контакта.
+
+    Args:
+        line (str): Строка файла с контактами.
+
+    Returns:
+        Optional[Contact]: Запись контакта или None для пустой строки.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    parts = line.split(',')
+    if len(parts) != len(FIELDS):
+        parts = (parts + [''] * len(FIELDS))[:len(FIELDS)]  # Недостающие поля считаем пустыми
+    return Contact(*parts)
+
+
+def format_line(contact: Mapping[str, str]) -> str:
+    """
+    Формирует строку файла из записи контакта.
+
+    Args:
+        contact (Mapping[str, str]): Контакт.
+
+    Returns:
+        str: Строка для записи в файл, включая перевод строки.
+    """
+    return ','.join(str(contact[field]) for field in FIELDS) + '\n'
+
+
+def content_hash(contact: Mapping[str, str]) -> bytes:
+    """
+    Вычисляет хэш содержимого контакта без учета ID.
+
+    Args:
+        contact (Mapping[str, str]): Контакт.
+
+    Returns:
+        bytes: 16-байтовый хэш значений всех полей, кроме ID.
+    """
+    if isinstance(contact, Contact):
+        values = contact.values()[1:]
+    else:
+        values = (str(contact.get(field, '')) for field in FIELDS[1:])
+    content = '\x1f'.join(values)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+def _locked(method: Callable) -> Callable:
+    """Выполняет метод записи хранилища под блокировкой файла контактов."""
+
+    @functools.wraps(method)
+    def wrapper(self: 'ContactStore', *args, **kwargs):
+        with write_lock(self.filename):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class ContactStore(Storage):
+    """
+    Контакты одного файла CSV, загруженные в память.
+
+    Записи хранятся в порядке следования в файле под внутренними номерами строк, которые не меняются
+    при удалении соседних записей. Индекс ID -> номер строки позволяет находить контакт за O(1),
+    а счетчик хэшей содержимого - проверять дубликаты при добавлении за O(1).
+
+    Если включен индекс триграмм, он сохраняется рядом с файлом (``<файл>.trigram``) и при следующем
+    запуске загружается вместо повторного построения. Так же сохраняется индекс телефонов (``<файл>.phones``)
+    для обратного поиска по номеру. Индекс нечеткого поиска (``<файл>.fuzzy``) строится или загружается
+    при первом нечетком поиске, упорядоченные индексы по наборам полей sorted_indexes (``<файл>.sorted``) -
+    при первом запросе, который может их использовать.
+    """
+
+    flat_file = True
+
+    def __init__(self, filename: str, trigram_index: bool = True, compact_threshold: int = 1000,
+                 phone_index: bool = True, sorted_indexes: Sequence[Sequence[str]] = DEFAULT_COLUMNS) -> None:
+        super().__init__(filename)
+        self.compact_threshold = compact_threshold
+        self._journal = Journal(filename)
+        self._journal_ops = 0
+        self._rows: Dict[int, Contact] = {}
+        self._ids: Dict[str, int] = {}
+        self._hashes: Dict[bytes, int] = {}
+        self._max_id = 0
+        self._next_rowid = 0
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._use_trigrams = trigram_index
+        self._trigrams: Optional[TrigramIndex] = None
+        self._use_phones = phone_index
+        self._phones: Optional[PhoneIndex] = None
+        self._fuzzy: Optional[FuzzyIndex] = None
+        self._sorted_columns = [tuple(columns) for columns in sorted_indexes]
+        self._sorted: Optional[SortedIndexes] = None
+
+    @property
+    def trigram_path(self) -> str:
+        return self.filename + '.trigram'
+
+    @property
+    def phone_path(self) -> str:
+        return self.filename + '.phones'
+
+    @property
+    def fuzzy_path(self) -> str:
+        return self.filename + '.fuzzy'
+
+    @property
+    def sorted_path(self) -> str:
+        return self.filename + '.sorted'
+
+    @property
+    def snapshot_path(self) -> str:
+        return self.filename + '.snapshot'
+
+    @property
+    def loaded(self) -> bool:
+        """Загружен ли файл в память."""
+        return self._signature is not None
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._rows)
+
+    def count(self) -> int:
+        """
+        Возвращает количество контактов.
+
+        Если снимок файла актуален и журнал пуст, количество берется из заголовка снимка без чтения файла.
+        Иначе файл загружается в память, а снимок при этом строится заново.
+
+        Returns:
+            int: Количество контактов.
+
+        Raises:
+            FileNotFoundError: Если файла с контактами нет.
+        """
+        if not self.loaded and not self._journal.size():
+            stat = os.stat(self.filename)
+            header = fresh_header(self.snapshot_path, self.filename, (stat.st_mtime_ns, stat.st_size))
+            if header is not None:
+                return header[0]
+        return len(self)
+
+    def _stat(self) -> Tuple[int, int, int]:
+        stat = os.stat(self.filename)
+        return stat.st_mtime_ns, stat.st_size, self._journal.size()
+
+    def refresh(self) -> None:
+        """Перечитывает файл, если с момента последней загрузки изменились его подпись или размер журнала."""
+        signature = self._stat()
+        contacts_metrics.cache('store', signature == self._signature)
+        if signature != self._signature:
+            self._load(signature)
+
+    def _clear(self) -> None:
+        self._rows.clear()
+        self._ids.clear()
+        self._hashes.clear()
+        self._max_id = 0
+        self._next_rowid = 0
+        self._trigrams = None
+        self._phones = None
+        self._fuzzy = None
+        self._sorted = None
+
+    def _load(self, signature: Tuple[int, int, int]) -> None:
+        self._clear()
+        snapshot_hit = fresh_header(self.snapshot_path, self.filename, signature[:2]) is not None
+        contacts_metrics.cache('snapshot', snapshot_hit)
+        if snapshot_hit:
+            with Snapshot(self.snapshot_path) as snapshot:
+                columns = [snapshot.column(column) for column in range(len(FIELDS))]
+            contacts_metrics.count('bytes_read', os.path.getsize(self.snapshot_path))
+            for values in zip(*columns):
+                self._insert(Contact(*values))
+        else:
+            contacts_metrics.count('bytes_read', signature[1])
+            with open(self.filename, 'r', encoding='utf-8') as file:
+                next(file, None)  # Пропускаем заголовок файла
+                for line in file:
+                    contact = parse_line(line)
+                    if contact is not None:
+                        self._insert(contact)
+            self._save_snapshot(signature[:2])
+        contacts_metrics.count('rows_loaded', len(self._rows))
+        operations = self._journal.read(signature[:2])
+        for operation in operations:
+            self._apply(operation)
+        self._journal_ops = len(operations)
+        if operations:
+            # Номера строк уплотняются, чтобы позиции из файлов индексов совпадали с ними без пересчета
+            self._rows = dict(enumerate(self._rows.values()))
+            self._ids = {contact.id: rowid for rowid, contact in self._rows.items()}
+            self._next_rowid = len(self._rows)
+        # Подпись снята до чтения: если файл менялся во время загрузки, следующий refresh перечитает его
+        self._signature = signature
+        if self._use_trigrams:
+            self._trigrams = TrigramIndex.load(self.trigram_path, signature, list(self._rows))
+            contacts_metrics.cache('trigram_index', self._trigrams is not None)
+            if self._trigrams is None:
+                self._rebuild_trigrams()
+                self._save_index(self._trigrams, self.trigram_path)
+        if self._use_phones:
+            self._phones = PhoneIndex.load(self.phone_path, signature, list(self._rows))
+            contacts_metrics.cache('phone_index', self._phones is not None)
+            if self._phones is None:
+                self._rebuild_phones()
+                self._save_index(self._phones, self.phone_path)
+
+    def _save_snapshot(self, source_signature: Tuple[int, int]) -> None:
+        try:
+            write_snapshot(self.snapshot_path, [contact.values() for contact in self._rows.values()], len(FIELDS),
+                           self.filename, source_signature)
+        except OSError:
+            pass  # Снимок будет построен заново при следующей загрузке
+
+    def _rebuild_trigrams(self) -> None:
+        self._trigrams = TrigramIndex()
+        for rowid, contact in self._rows.items():
+            self._trigrams.add(rowid, contact.values())
+
+    def _rebuild_phones(self) -> None:
+        self._phones = PhoneIndex()
+        for rowid, contact in self._rows.items():
+            self._phones.add(rowid, (contact.work_phone, contact.personal_phone))
+
+    def _save_index(self, index: Union[TrigramIndex, PhoneIndex, FuzzyIndex, SortedIndexes], path: str) -> None:
+        # Индексы сохраняются с позициями записей вместо номеров строк (см. contacts_sidecar)
+        try:
+            index.save(path, self._signature, row_positions(self._rows))
+        except OSError:
+            pass  # Индекс будет построен заново при следующем обращении к нему
+
+    def _fuzzy_index(self) -> FuzzyIndex:
+        # Индекс нужен только нечеткому поиску, поэтому загружается или строится при первом обращении
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex.load(self.fuzzy_path, self._signature, list(self._rows))
+            contacts_metrics.cache('fuzzy_index', self._fuzzy is not None)
+            if self._fuzzy is None:
+                self._fuzzy = FuzzyIndex()
+                for rowid, contact in self._rows.items():
+                    self._fuzzy.add(rowid, (contact.last_name, contact.first_name, contact.middle_name))
+                self._save_index(self._fuzzy, self.fuzzy_path)
+        return self._fuzzy
+
+    def _sorted_index(self, field: str) -> Optional[SortedIndex]:
+        # Индексы загружаются или строятся при первом запросе к полю, по которому упорядочен один из них
+        if not any(columns[0] == field for columns in self._sorted_columns):
+            return None
+        if self._sorted is None:
+            self._sorted = SortedIndexes.load(self.sorted_path, self._sorted_columns, self._signature,
+                                              list(self._rows))
+            contacts_metrics.cache('sorted_index', self._sorted is not None)
+            if self._sorted is None:
+                self._sorted = SortedIndexes(self._sorted_columns)
+                self._sorted.build(self._rows)
+                self._save_index(self._sorted, self.sorted_path)
+        return self._sorted.leading(field)
+
+    def _insert(self, contact: Contact) -> int:
+        rowid = self._next_rowid
+        self._next_rowid += 1
+        self._rows[rowid] = contact
+        self._ids[contact.id] = rowid
+        self._count_content(contact, 1)
+        if contact.id.isdigit():
+            self._max_id = max(self._max_id, int(contact.id))
+        if self._trigrams is not None:
+            self._trigrams.add(rowid, contact.values())
+        if self._phones is not None:
+            self._phones.add(rowid, (contact.work_phone, contact.personal_phone))
+        if self._fuzzy is not None:
+            self._fuzzy.add(rowid, (contact.last_name, contact.first_name, contact.middle_name))
+        if self._sorted is not None:
+            self._sorted.add(rowid, contact)
+        return rowid
+
+    def _remove(self, rowid: int) -> Contact:
+        contact = self._rows.pop(rowid)
+        if self._ids.get(contact.id) == rowid:
+            del self._ids[contact.id]
+        self._count_content(contact, -1)
+        if self._sorted is not None:
+            self._sorted.remove(rowid, contact)
+        return contact
+
+    def _apply(self, operation: Dict) -> int:
+        if operation['op'] == 'add':
+            for contact in operation['contacts']:
+                self._insert(Contact.from_mapping(contact))
+            return len(operation['contacts'])
+        if operation['op'] == 'update':
+            return self._apply_update(operation['ids'], operation['fields'])
+        if operation['op'] == 'delete':
+            return self._apply_delete(operation['ids'])
+        raise ValueError(f"Неизвестная операция журнала: {operation['op']}")
+
+    def _apply_update(self, contact_ids: Iterable[str], updates: Mapping[str, str]) -> int:
+        updated = 0
+        for contact_id in contact_ids:
+            rowid = self._ids.get(contact_id)
+            if rowid is not None:
+                self._count_content(self._rows[rowid], -1)
+                if self._sorted is not None:
+                    self._sorted.remove(rowid, self._rows[rowid])
+                self._rows[rowid] = self._rows[rowid].replace(updates)
+                self._count_content(self._rows[rowid], 1)
+                if self._sorted is not None:
+                    self._sorted.add(rowid, self._rows[rowid])
+                if self._trigrams is not None:
+                    self._trigrams.add(rowid, updates.values())
+                if self._phones is not None:
+                    self._phones.add(rowid, (self._rows[rowid].work_phone, self._rows[rowid].personal_phone))
+                if self._fuzzy is not None:
+                    contact = self._rows[rowid]
+                    self._fuzzy.add(rowid, (contact.last_name, contact.first_name, contact.middle_name))
+                updated += 1
+        return updated
+
+    def _apply_delete(self, contact_ids: Iterable[str]) -> int:
+        deleted = 0
+        for contact_id in contact_ids:
+            rowid = self._ids.get(contact_id)
+            if rowid is not None:
+                self._remove(rowid)
+                deleted += 1
+        return deleted
+
+    def _log(self, operation: Dict) -> None:
+        self._journal.append(operation, self._signature[:2])
+        self._journal_ops += 1
+        self._signature = self._stat()
+        if self._journal_ops >= self.compact_threshold:
+            self._write_all()
+
+    def _count_content(self, contact: Contact, delta: int) -> None:
+        key = content_hash(contact)
+        count = self._hashes.get(key, 0) + delta
+        if count > 0:
+            self._hashes[key] = count
+        else:
+            self._hashes.pop(key, None)
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        """
+        Лениво выдает все контакты в порядке следования в файле.
+
+        Yields:
+            Contact: Контакт.
+        """
+        self.refresh()
+        yield from self._rows.values()
+
+    def slice(self, start: int, stop: int) -> List[Contact]:
+        """
+        Возвращает контакты с позициями от start (включительно) до stop (не включительно).
+
+        Args:
+            start (int): Начальная позиция.
+            stop (int): Конечная позиция.
+
+        Returns:
+            List[Contact]: Список контактов.
+        """
+        self.refresh()
+        return list(islice(self._rows.values(), start, stop))
+
+    def get(self, contact_id: str) -> Optional[Contact]:
+        """
+        Находит контакт по ID через индекс.
+
+        Args:
+            contact_id (str): Идентификатор контакта.
+
+        Returns:
+            Optional[Contact]: Контакт или None, если контакт не найден.
+        """
+        self.refresh()
+        rowid = self._ids.get(contact_id)
+        return None if rowid is None else self._rows[rowid]
+
+    def iter_quick_search(self, search_term: str) -> Iterator[Contact]:
+        """
+        Лениво выдает контакты, у которых любое поле содержит фрагмент без учета регистра.
+
+        Args:
+            search_term (str): Поисковый запрос.
+
+        Yields:
+            Contact: Найденный контакт.
+        """
+        self.refresh()
+        term = search_term.lower()
+        candidates = self._trigrams.candidates(term) if self._trigrams is not None else None
+        if candidates is None:
+            rows = self._rows.values()
+        else:
+            # Кандидаты из индекса могут быть устаревшими, поэтому они проверяются так же, как при переборе
+            rows = (self._rows[rowid] for rowid in sorted(candidates) if rowid in self._rows)
+        contacts_metrics.count('rows_scanned', len(self._rows) if candidates is None else len(candidates))
+        for contact in rows:
+            if any(term in value.lower() for value in contact.values()):
+                yield contact
+
+    def iter_precise_search(self, **search_criteria) -> Iterator[Contact]:
+        """
+        Лениво выдает контакты, у которых все указанные поля соответствуют регулярным выражениям.
+
+        Args:
+            **search_criteria: Критерии поиска, где ключ - имя поля, а значение - регулярное выражение.
+                Для поля ID выражение должно совпадать со значением целиком.
+
+        Yields:
+            Contact: Найденный контакт.
+
+        Raises:
+            re.error: Если одно из выражений некорректно.
+        """
+        plan = compile_query(search_criteria)
+        self.refresh()
+        if plan.id_literal is not None:
+            rowid = self._ids.get(plan.id_literal)
+            rows = [] if rowid is None else [self._rows[rowid]]
+        else:
+            rows = self._prefix_candidates(plan.prefixes)
+            if rows is None:
+                rows = self._rows.values()
+        contacts_metrics.count('rows_scanned', len(rows))
+        yield from plan.filter(rows)
+
+    def _prefix_candidates(self, prefixes: Mapping[str, Tuple[str, bool]]) -> Optional[List[Contact]]:
+        # Из критериев с литеральным началом выбирается тот, которому в упорядоченном индексе соответствует
+        # меньше всего записей; кандидаты возвращаются в порядке следования в файле
+        best = None
+        for field, (literal, exact) in prefixes.items():
+            index = None if field in NUMERIC_FIELDS else self._sorted_index(field)
+            if index is not None:
+                start, stop = index.span(equal=(literal,)) if exact else index.span(prefix=literal)
+                if best is None or stop - start < best[2] - best[1]:
+                    best = (index, start, stop)
+        if best is None:
+            return None
+        index, start, stop = best
+        return [self._rows[rowid] for rowid in sorted(index.rowids(start, stop))]
+
+    def ordered(self, field: str, equal: Sequence[Union[int, str]] = (), prefix: Optional[str] = None,
+                low: Optional[Union[int, str]] = None, high: Optional[Union[int, str]] = None) -> List[Contact]:
+        """
+        Выбирает контакты по упорядоченному индексу, первое поле которого - field, и возвращает их в порядке
+        индекса.
+
+        Примеры: ordered('Фамилия', prefix='Ва') - фамилии на «Ва» по ФИО; ordered('Организация',
+        equal=['ООО Ромашка']) - сотрудники организации по ФИО; ordered('ID', low=100, high=200) - диапазон ID.
+
+        Args:
+            field (str): Первое поле индекса.
+            equal (Sequence[Union[int, str]]): Значения первых полей индекса, начиная с field (без учета регистра).
+            prefix (Optional[str]): Префикс значения поля, следующего за полями из equal.
+            low (Optional[Union[int, str]]): Нижняя граница значения следующего поля (включительно).
+            high (Optional[Union[int, str]]): Верхняя граница значения следующего поля (включительно).
+
+        Returns:
+            List[Contact]: Найденные контакты в порядке индекса.
+
+        Raises:
+            ValueError: Если нет индекса, упорядоченного по полю field, или условия запроса некорректны.
+        """
+        self.refresh()
+        index = self._sorted_index(field)
+        if index is None:
+            raise ValueError(f"Нет упорядоченного индекса по полю {field}")
+        rowids = index.find(equal, prefix, low, high)
+        contacts_metrics.count('rows_scanned', len(rowids))
+        return [self._rows[rowid] for rowid in rowids]
+
+    def find_by_phone(self, phone: str) -> List[Contact]:
+        """
+        Находит контакты, у которых рабочий или личный телефон совпадает с номером после нормализации.
+
+        Args:
+            phone (str): Номер в произвольной записи, например '8 (495) 123-45-67'.
+
+        Returns:
+            List[Contact]: Найденные контакты в порядке следования в файле.
+        """
+        self.refresh()
+        key = normalize_phone(phone)
+        if not key:
+            return []
+        if self._phones is None:
+            return [contact for contact in self._rows.values()
+                    if key in (normalize_phone(contact.work_phone), normalize_phone(contact.personal_phone))]
+        return self._verify_phones(sorted(set(self._phones.candidates(key))),
+                                   lambda normalized: normalized == key)
+
+    def find_by_phone_suffix(self, digits: str) -> List[Contact]:
+        """
+        Находит контакты, у которых рабочий или личный телефон оканчивается на указанные цифры.
+
+        Args:
+            digits (str): Последние цифры номера.
+
+        Returns:
+            List[Contact]: Найденные контакты в порядке следования в файле.
+        """
+        self.refresh()
+        if not digits.isdigit():
+            return []
+        if self._phones is None:
+            rows = list(self._rows)
+        else:
+            rows = self._phones.suffix_candidates(digits)
+        return self._verify_phones(rows, lambda normalized: normalized.endswith(digits))
+
+    def fuzzy_search(self, search_term: str, max_distance: Optional[int] = None) -> List[Contact]:
+        """
+        Ищет контакты по фамилии, имени или отчеству с опечатками или в латинской транслитерации.
+
+        Каждое слово запроса должно быть похоже на одно из слов ФИО контакта: кандидаты берутся из индекса
+        фонетических ключей и транслитераций, после чего для них считается расстояние Левенштейна до
+        ближайшего слова ФИО (для латинского слова запроса - до транслитерации).
+
+        Args:
+            search_term (str): Запрос, например 'Васильэв', 'Vasiliev Ivan'.
+            max_distance (Optional[int]): Наибольшее расстояние для одного слова; по умолчанию одна
+                опечатка на каждые три буквы слова.
+
+        Returns:
+            List[Contact]: Найденные контакты по возрастанию суммарного расстояния, при равенстве - в порядке
+                следования в файле.
+        """
+        self.refresh()
+        query = words(search_term)
+        if not query:
+            return []
+        index = self._fuzzy_index()
+        rowids: Optional[Set[int]] = None
+        for word in query:
+            candidates = index.candidates(word)
+            rowids = candidates if rowids is None else rowids & candidates
+        contacts_metrics.count('rows_scanned', len(rowids))
+        # Кандидаты из индекса могут быть устаревшими, поэтому ранжируются только существующие записи
+        return rank(query, ((rowid, self._rows[rowid]) for rowid in sorted(rowids) if rowid in self._rows),
+                    max_distance)
+
+    def _verify_phones(self, rowids: Iterable[int], matches: Callable[[str], bool]) -> List[Contact]:
+        # Кандидаты из индекса могут быть устаревшими, поэтому телефоны записи проверяются заново
+        found = []
+        scanned = 0
+        for scanned, rowid in enumerate(rowids, start=1):
+            contact = self._rows.get(rowid)
+            if contact is not None and any(matches(normalize_phone(phone) or '')
+                                           for phone in (contact.work_phone, contact.personal_phone)):
+                found.append(contact)
+        contacts_metrics.count('rows_scanned', scanned)
+        return found
+
+    @_locked
+    def add(self, contacts: List[Dict[str, str]]) -> Tuple[int, int]:
+        """
+        Добавляет контакты, пропуская дубликаты без учета ID.
+
+        Пока журнал пуст, контакты дописываются прямо в конец файла, иначе - в журнал, чтобы сохранить
+        порядок операций. Дубликаты ищутся как среди существующих контактов, так и внутри добавляемого списка.
+        Контактам без ID присваиваются последовательные идентификаторы после наибольшего выданного.
+
+        Args:
+            contacts (List[Dict[str, str]]): Новые контакты.
+
+        Returns:
+            Tuple[int, int]: Количество добавленных контактов и количество найденных дубликатов.
+
+        Raises:
+            ValueError: Если заданный ID уже есть в справочнике или повторяется в списке; в этом случае
+                не добавляется ни один контакт.
+        """
+        self.refresh()
+        next_id = self._max_id + 1
+        batch_hashes = set()
+        batch_ids = set()
+        new_contacts = []
+        duplicates = 0
+
+        for contact in contacts:
+            # Добавляем ID только новым контактам, если ID не задан
+            contact['ID'] = contact.get('ID', str(next_id))
+            record = Contact.from_mapping(contact)
+
+            # Проверка на дубликаты без учета ID
+            key = content_hash(record)
+            if key in self._hashes or key in batch_hashes:
+                duplicates += 1
+            elif record.id in self._ids or record.id in batch_ids:
+                raise ValueError(f"Контакт с ID {record.id} уже есть в справочнике")
+            else:
+                batch_hashes.add(key)
+                batch_ids.add(record.id)
+                new_contacts.append(record)
+                if record.id.isdigit():
+                    next_id = max(next_id, int(record.id) + 1)  # Подготовка ID для следующего контакта
+
+        if not new_contacts:
+            return 0, duplicates
+        for contact in new_contacts:
+            self._insert(contact)
+        if self._journal_ops:
+            self._log({'op': 'add', 'contacts': [dict(contact) for contact in new_contacts]})
+        else:
+            with open(self.filename, 'a', encoding='utf-8') as file:
+                start = file.tell()
+                file.writelines(format_line(contact) for contact in new_contacts)
+                contacts_metrics.count('bytes_written', file.tell() - start)
+            self._signature = self._stat()
+        return len(new_contacts), duplicates
+
+    @_locked
+    def update(self, contact_ids: Iterable[str], updates: Dict[str, str]) -> int:
+        """
+        Изменяет поля контактов с указанными ID и записывает изменение в журнал.
+
+        Args:
+            contact_ids (Iterable[str]): Идентификаторы изменяемых контактов.
+            updates (Dict[str, str]): Новые значения полей.
+
+        Returns:
+            int: Количество обновленных контактов; 0, если изменяемых полей нет.
+        """
+        if not updates:
+            return 0  # Пустое изменение не записывается в журнал
+        self.refresh()
+        contact_ids = [contact_id for contact_id in dict.fromkeys(contact_ids) if contact_id in self._ids]
+        updated = self._apply_update(contact_ids, updates)
+        if updated:
+            self._log({'op': 'update', 'ids': contact_ids, 'fields': dict(updates)})
+        return updated
+
+    @_locked
+    def update_checked(self, expected: Iterable[Contact], updates: Dict[str, str]) -> Tuple[int, List[str]]:
+        """
+        Изменяет поля контактов, проверяя, что их не изменили с момента, когда они были прочитаны.
+
+        Версией записи служит ее содержимое. Если с момента чтения контакт изменил другой процесс, но другие
+        поля, изменения объединяются: обновляемые поля записываются поверх новой версии. Если другой процесс
+        изменил одно из обновляемых полей иначе или удалил контакт, изменение этого контакта отклоняется.
+
+        Args:
+            expected (Iterable[Contact]): Контакты в том виде, в котором их видел пользователь.
+            updates (Dict[str, str]): Новые значения полей.
+
+        Returns:
+            Tuple[int, List[str]]: Количество обновленных контактов и ID отклоненных из-за конфликта;
+                (0, []), если изменяемых полей нет.
+        """
+        if not updates:
+            return 0, []  # Пустое изменение не записывается в журнал
+        self.refresh()
+        accepted, conflicts = [], []
+        for contact in expected:
+            rowid = self._ids.get(contact['ID'])
+            current = None if rowid is None else self._rows[rowid]
+            if current is None or any(current[field] != contact[field] and current[field] != str(value)
+                                      for field, value in updates.items()):
+                conflicts.append(contact['ID'])
+            else:
+                accepted.append(contact['ID'])
+        accepted = list(dict.fromkeys(accepted))
+        updated = self._apply_update(accepted, updates)
+        if updated:
+            self._log({'op': 'update', 'ids': accepted, 'fields': dict(updates)})
+        return updated, conflicts
+
+    @_locked
+    def delete(self, contact_ids: Iterable[str]) -> int:
+        """
+        Удаляет контакты с указанными ID и записывает удаление в журнал.
+
+        Args:
+            contact_ids (Iterable[str]): Идентификаторы удаляемых контактов.
+
+        Returns:
+            int: Количество удаленных контактов.
+        """
+        self.refresh()
+        contact_ids = [contact_id for contact_id in dict.fromkeys(contact_ids) if contact_id in self._ids]
+        deleted = self._apply_delete(contact_ids)
+        if deleted:
+            self._log({'op': 'delete', 'ids': contact_ids})
+        return deleted
+
+    @_locked
+    def replace_all(self, contacts: Iterable[Mapping[str, str]]) -> None:
+        """
+        Заменяет содержимое файла указанным списком контактов.
+
+        Args:
+            contacts (Iterable[Mapping[str, str]]): Новый полный список контактов.
+        """
+        self._clear()
+        self._trigrams = TrigramIndex() if self._use_trigrams else None
+        self._phones = PhoneIndex() if self._use_phones else None
+        for contact in contacts:
+            self._insert(Contact.from_mapping(contact))
+        self._write_all()
+
+    @_locked
+    def replace_file(self, path: str) -> None:
+        """
+        Атомарно подменяет файл контактов готовым файлом (например, результатом внешней сортировки).
+
+        Журнал удаляется: считается, что его изменения уже учтены в новом файле. Записи в памяти
+        сбрасываются и при следующем обращении загружаются из нового файла.
+
+        Args:
+            path (str): Путь к новому файлу контактов в том же каталоге.
+        """
+        os.replace(path, self.filename)
+        OffsetIndex.invalidate(self.filename)
+        self._journal.reset()
+        self._journal_ops = 0
+        self._clear()
+        self._signature = None
+
+    @_locked
+    def compact(self) -> None:
+        """Переносит накопленный журнал в файл контактов."""
+        self.refresh()
+        if self._journal_ops:
+            self._write_all()
+
+    def _write_all(self) -> None:
+        # Файл записывается во временный и атомарно подменяется, после чего журнал становится ненужным.
+        # Если процесс прервется до удаления журнала, журнал не совпадет по подписи с новым файлом и не применится.
+        temp_path = self.filename + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.writelines(format_line(contact) for contact in self._rows.values())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.filename)
+        OffsetIndex.invalidate(self.filename)
+        self._journal.reset()
+        self._journal_ops = 0
+        self._signature = self._stat()
+        contacts_metrics.count('bytes_written', self._signature[1])
+        self._save_snapshot(self._signature[:2])
+
+    def close(self) -> None:
+        """Сохраняет измененные за сеанс индексы триграмм, телефонов, нечеткого поиска и упорядоченные индексы."""
+        if self._trigrams is not None and self._trigrams.dirty:
+            self._save_index(self._trigrams, self.trigram_path)
+        if self._phones is not None and self._phones.dirty:
+            self._save_index(self._phones, self.phone_path)
+        if self._fuzzy is not None and self._fuzzy.dirty:
+            self._save_index(self._fuzzy, self.fuzzy_path)
+        if self._sorted is not None and self._sorted.dirty:
+            self._save_index(self._sorted, self.sorted_path)
+
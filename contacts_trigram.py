@@ -0,0 +1,122 @@
+"""
+Инвертированный индекс триграмм для быстрого поиска по фрагменту.
+
+Для каждой триграммы (три подряд идущих символа значения поля в нижнем регистре) хранится
+отсортированный массив номеров строк, в полях которых она встречается. Поиск пересекает массивы
+триграмм запроса, а найденные кандидаты затем проверяются обычным сравнением подстрок,
+поэтому результат совпадает с полным перебором.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Set, Tuple
+
+from contacts_sidecar import load_sidecar, postings_to_positions, postings_to_rowids, save_sidecar
+
+INDEX_VERSION = 1
+
+
+def trigrams(values: Iterable[str]) -> Set[str]:
+    """
+    Возвращает множество триграмм значений полей в нижнем регистре.
+
+    Args:
+        values (Iterable[str]): Значения полей.
+
+    Returns:
+        Set[str]: Множество триграмм.
+    """
+    grams = set()
+    for value in values:
+        value = value.lower()
+        grams.update(value[i:i + 3] for i in range(len(value) - 2))
+    return grams
+
+
+def _contains(postings: array, rowid: int) -> bool:
+    position = bisect_left(postings, rowid)
+    return position < len(postings) and postings[position] == rowid
+
+
+class TrigramIndex:
+    """
+    Индекс триграмм над номерами строк хранилища контактов.
+
+    Массивы номеров строк только пополняются: при изменении или удалении записи устаревшие вхождения
+    остаются в индексе и отсеиваются проверкой кандидатов. При сохранении номера строк уплотняются,
+    а устаревшие вхождения удаляются.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, array] = {}
+        self.dirty = False
+
+    def add(self, rowid: int, values: Iterable[str]) -> None:
+        """
+        Добавляет в индекс триграммы значений записи.
+
+        Args:
+            rowid (int): Номер строки в хранилище.
+            values (Iterable[str]): Значения полей записи.
+        """
+        for gram in trigrams(values):
+            postings = self._postings.get(gram)
+            if postings is None:
+                self._postings[gram] = array('L', [rowid])
+            elif not postings or postings[-1] < rowid:
+                postings.append(rowid)  # Новые записи получают наибольший номер строки
+            elif not _contains(postings, rowid):
+                postings.insert(bisect_left(postings, rowid), rowid)
+        self.dirty = True
+
+    def candidates(self, search_term: str) -> Optional[Set[int]]:
+        """
+        Возвращает номера строк, содержащих все триграммы запроса.
+
+        Args:
+            search_term (str): Поисковый запрос.
+
+        Returns:
+            Optional[Set[int]]: Номера строк-кандидатов или None, если запрос короче трех символов
+                и индекс для него неприменим.
+        """
+        grams = trigrams([search_term])
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(gram, array('L')) for gram in grams), key=len)
+        smallest, rest = postings[0], postings[1:]
+        return {rowid for rowid in smallest if all(_contains(other, rowid) for other in rest)}
+
+    def save(self, path: str, signature: Tuple[int, ...], positions: Mapping[int, int]) -> None:
+        """
+        Сохраняет индекс рядом с файлом контактов, перенумеровывая строки по их позициям в файле.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            signature (Tuple[int, ...]): Подпись файла контактов, для которого построен индекс.
+            positions (Mapping[int, int]): Соответствие номера строки ее позиции в файле (см. contacts_sidecar).
+        """
+        save_sidecar(path, INDEX_VERSION, signature, postings_to_positions(self._postings, positions))
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, signature: Tuple[int, ...], rowids: Sequence[int]) -> Optional['TrigramIndex']:
+        """
+        Загружает сохраненный индекс, если он построен для файла с той же подписью.
+
+        Args:
+            path (str): Путь к файлу индекса.
+            signature (Tuple[int, ...]): Текущая подпись файла контактов.
+            rowids (Sequence[int]): Номера строк записей хранилища в порядке следования в файле; позиции
+                из файла индекса переводятся в них.
+
+        Returns:
+            Optional[TrigramIndex]: Индекс или None, если файла нет или он устарел.
+        """
+        postings = load_sidecar(path, INDEX_VERSION, signature)
+        if postings is not None:
+            postings = postings_to_rowids(postings, rowids)
+        if postings is None:
+            return None
+        index = cls()
+        index._postings = postings
+        return index
@@ -1,3 +1,10 @@
+import functools
+import time
+
+import contacts_metrics
+from contacts_storage import count_contacts
+
+
 def welcome_info_decorator(filename):
     def decorator(func):
         def wrapper(*args, **kwargs):
@@ -23,11 +30,9 @@ def welcome_info_decorator(filename):
                 "  .------------::::::::+===::::::::-----------=:  "
             ]
 
-            # Получаем количество записей в файле
-            num_records = 0
+            # Получаем количество записей из заголовка снимка справочника
             try:
-                with open(filename, 'r', encoding='utf-8') as file:
-                    num_records = sum(1 for _ in file)
+                num_records = count_contacts(filename)
             except FileNotFoundError:
                 num_records = "Файл не найден"
 
@@ -51,3 +56,29 @@ def welcome_info_decorator(filename):
 
     return decorator
 
+
+def instrumented(name=None):
+    """
+    Учитывает вызовы функции и их длительность в показателях работы (см. contacts_metrics).
+
+    Пока сбор показателей выключен, обертка только проверяет флаг и вызывает функцию.
+
+    Args:
+        name (Optional[str]): Имя операции в сводке; по умолчанию имя функции.
+    """
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not contacts_metrics.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                contacts_metrics.record_call(label, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
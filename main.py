@@ -1,14 +1,43 @@
-from contacts_delete import prompt_delete_or_refine_search
-from contacts_display import read_contacts, display_contacts
-from contacts_manage import add_contact, update_selected_contacts, organize_contacts
-from contacts_search import quick_search, precise_search
-from decorators import welcome_info_decorator
+"""
+Телефонный справочник: интерактивное меню и команды для сценариев.
 
+Без команды запускается меню. С командой (search, filter, page, add, delete, organize, count, import,
+serve) программа выполняет одно действие без вопросов и выводит результат в CSV или JSON. Модули
+справочника импортируются внутри команд, поэтому каждая команда загружает только то, что ей нужно,
+и запуск из сценариев остается дешевым.
 
-@welcome_info_decorator('contacts.csv')
-def main_menu() -> None:
-    """Основное меню программы управления контактами."""
-    filename = 'contacts.csv'
+Примеры:
+    python main.py --format json search Иванов
+    python main.py filter 'Фамилия=^Ва' 'Организация=Рога'
+    python main.py --no-banner
+"""
+import argparse
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import contacts_metrics
+
+DEFAULT_FILE = 'contacts.csv'
+FORMATS = ('csv', 'json', 'jsonl')
+# Коды завершения команд: как у grep, 1 - ничего не найдено, 2 - ошибка в запросе или данных
+EXIT_NOT_FOUND = 1
+EXIT_ERROR = 2
+
+
+def main_menu(filename: str = DEFAULT_FILE) -> None:
+    """
+    Основное меню программы управления контактами.
+
+    Args:
+        filename (str): Путь к файлу с контактами.
+    """
+    from contacts_delete import prompt_delete_or_refine_search
+    from contacts_display import iter_contacts, display_contacts
+    from contacts_import import import_file
+    from contacts_manage import add_contact, update_selected_contacts, organize_contacts
+    from contacts_search import quick_search, precise_search, fuzzy_search, reverse_lookup
 
     while True:
         print("\nФункционал:")
@@ -19,6 +48,9 @@ def main_menu() -> None:
         print("4 - Быстрый поиск")
         print("5 - Фильтрация данных")
         print("6 - Удаление")
+        print("8 - Нечеткий поиск по ФИО (опечатки, латиница)")
+        print("9 - Поиск по номеру телефона")
+        print("10 - Импорт контактов из файла CSV или JSONL")
         print("7 - Выйти")
         print()
         choice = input("Выберите действие: ")
@@ -26,8 +58,8 @@ def main_menu() -> None:
 
         # Вывод всех контактов
         if choice == '0':
-            for contact in read_contacts(filename):
-                print(', '.join(i for i in contact.values()))
+            # Контакты выводятся по мере чтения, без загрузки всего справочника в память
+            sys.stdout.writelines(', '.join(contact.values()) + '\n' for contact in iter_contacts(filename))
 
         # Пагинация контактов
         elif choice == '1':
@@ -126,13 +158,331 @@ def main_menu() -> None:
             print("Выход из программы.")
             break
 
+        # Нечеткий поиск по фамилии, имени и отчеству
+        elif choice == '8':
+            while True:
+                search_term = input("\nВведите ФИО или его часть (можно латиницей) или 'exit' для возврата в меню: ")
+                if search_term.lower() == 'exit':
+                    break
+                found_contacts = fuzzy_search(filename, search_term)
+                if found_contacts:
+                    for contact in found_contacts:
+                        print(', '.join(contact.values()))
+                else:
+                    print("По вашему запросу контакты не найдены.")
+
         # Организация контактов
         elif choice.lower() == 'organize':
             organize_contacts(filename)
 
+        # Поиск по номеру телефона
+        elif choice == '9' or choice.lower() == 'phone':
+            phone = input("Введите номер телефона или его последние цифры: ")
+            found_contacts = reverse_lookup(filename, phone)
+            if found_contacts:
+                for contact in found_contacts:
+                    print(', '.join(contact.values()))
+            else:
+                print("Контакты с таким номером не найдены.")
+
+        # Импорт контактов из файла
+        elif choice == '10' or choice.lower() == 'import':
+            path = input("Введите путь к файлу CSV или JSONL для импорта или 'exit' для возврата в меню: ").strip()
+            if path.lower() != 'exit':
+                import_file(filename, path)
+
         else:
             print("Неверный выбор. Попробуйте снова.")
 
 
+def print_contacts(contacts: Iterable, output_format: str) -> int:
+    """
+    Выводит контакты в stdout по мере получения.
+
+    Args:
+        contacts (Iterable[Contact]): Контакты.
+        output_format (str): csv (с заголовком), json (массив объектов) или jsonl (объект на строку).
+
+    Returns:
+        int: Количество выведенных контактов.
+    """
+    count = 0
+    if output_format == 'csv':
+        import csv
+        from contacts_record import FIELDS
+
+        writer = csv.writer(sys.stdout, lineterminator='\n')
+        writer.writerow(FIELDS)
+        for count, contact in enumerate(contacts, start=1):
+            writer.writerow(contact.values())
+        return count
+
+    import json
+    if output_format == 'json':
+        sys.stdout.write('[')
+    for count, contact in enumerate(contacts, start=1):
+        if output_format == 'json':
+            sys.stdout.write(',\n' if count > 1 else '\n')
+        sys.stdout.write(json.dumps(dict(contact), ensure_ascii=False))
+        if output_format == 'jsonl':
+            sys.stdout.write('\n')
+    if output_format == 'json':
+        sys.stdout.write('\n]\n' if count else ']\n')
+    return count
+
+
+def print_result(result: Dict, output_format: str) -> None:
+    """
+    Выводит итог команды: строку заголовка и строку значений в CSV или один JSON-объект.
+
+    Args:
+        result (Dict): Итог команды, например {'added': 2, 'duplicates': 0}.
+        output_format (str): csv, json или jsonl.
+    """
+    if output_format == 'csv':
+        import csv
+
+        writer = csv.writer(sys.stdout, lineterminator='\n')
+        writer.writerow(result.keys())
+        writer.writerow(result.values())
+    else:
+        import json
+        print(json.dumps(result, ensure_ascii=False))
+
+
+def non_negative_int(value: str) -> int:
+    """Разбирает неотрицательное целое число для аргумента командной строки."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается целое число, получено '{value}'") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"число не может быть отрицательным: {value}")
+    return number
+
+
+def parse_criteria(parser: argparse.ArgumentParser, items: List[str]) -> Dict[str, str]:
+    """Разбирает критерии вида 'Поле=регулярное_выражение', проверяя имена полей."""
+    from contacts_record import FIELDS
+
+    criteria = {}
+    for item in items:
+        field, separator, pattern = item.partition('=')
+        if not separator or field not in FIELDS:
+            parser.error(f"Некорректный критерий '{item}': ожидается 'Поле=выражение', поле - одно из "
+                         f"{', '.join(FIELDS)}")
+        criteria[field] = pattern
+    return criteria
+
+
+def run_command(parser: argparse.ArgumentParser, args: argparse.Namespace) -> Optional[int]:
+    """
+    Выполняет команду командной строки.
+
+    Args:
+        parser (argparse.ArgumentParser): Разборщик аргументов (для сообщений об ошибках).
+        args (argparse.Namespace): Разобранные аргументы.
+
+    Returns:
+        Optional[int]: Код завершения.
+    """
+    filename, output_format = args.file, args.format
+
+    if args.command == 'search':
+        from itertools import islice
+        if args.fuzzy:
+            from contacts_search import fuzzy_search
+            found = iter(fuzzy_search(filename, args.term))
+        else:
+            from contacts_search import iter_quick_search
+            found = iter_quick_search(filename, args.term)
+        return 0 if print_contacts(islice(found, args.limit), output_format) else EXIT_NOT_FOUND
+
+    if args.command == 'filter':
+        from itertools import islice
+        from contacts_query import compile_query
+        from contacts_search import iter_precise_search
+        criteria = parse_criteria(parser, args.criteria)
+        compile_query(criteria)  # Ошибка в выражении сообщается до начала вывода
+        found = iter_precise_search(filename, **criteria)
+        return 0 if print_contacts(islice(found, args.limit), output_format) else EXIT_NOT_FOUND
+
+    if args.command == 'ordered':
+        from itertools import islice
+        from contacts_search import ordered_search
+        try:
+            found = ordered_search(filename, args.field, args.equal, args.prefix, args.low, args.high)
+        except ValueError as error:
+            parser.error(str(error))
+        return 0 if print_contacts(islice(found, args.limit), output_format) else EXIT_NOT_FOUND
+
+    if args.command == 'page':
+        from contacts_display import read_page
+        if args.page <= 0 or args.per_page <= 0:
+            parser.error("Номер страницы и количество записей на странице должны быть положительными")
+        contacts, total_pages = read_page(filename, args.page, args.per_page)
+        print(f"Страница {args.page} из {total_pages}", file=sys.stderr)
+        return 0 if print_contacts(contacts, output_format) else EXIT_NOT_FOUND
+
+    if args.command == 'add':
+        from contacts_import import validate
+        from contacts_record import FIELDS
+        from contacts_storage import get_store
+        lines = args.contacts or [line for line in sys.stdin.read().splitlines() if line.strip()]
+        names = FIELDS[1:]
+        contacts, rejected = [], 0
+        for line in lines:
+            values = [value.strip() for value in line.split(',')]
+            contact, reason = validate(dict(zip(names, values))) if len(values) == len(names) \
+                else (None, f"ожидается {len(names)} полей через запятую")
+            if contact is None:
+                rejected += 1
+                print(f"Отклонено '{line}': {reason}", file=sys.stderr)
+            else:
+                contacts.append(contact)
+        try:
+            added, duplicates = get_store(filename).add(contacts) if contacts else (0, 0)
+        except ValueError as error:
+            print(f"Контакты не добавлены: {error}", file=sys.stderr)
+            return EXIT_ERROR
+        print_result({'added': added, 'duplicates': duplicates, 'rejected': rejected}, output_format)
+        return EXIT_ERROR if rejected else 0
+
+    if args.command == 'delete':
+        if not args.ids and not args.criteria:
+            parser.error("Укажите --id или критерии 'Поле=выражение'")
+        if args.ids and args.criteria:
+            parser.error("Укажите либо --id, либо критерии, но не то и другое")
+        if args.ids:
+            from contacts_delete import delete_contact
+            deleted = delete_contact(filename, args.ids)
+        else:
+            from contacts_delete import delete_matching
+            deleted = delete_matching(filename, **parse_criteria(parser, args.criteria))
+        print_result({'deleted': deleted}, output_format)
+        return 0
+
+    if args.command == 'organize':
+        from contacts_sort import external_sort
+        print_result({'sorted': external_sort(filename, args.memory_limit * 1024 * 1024)}, output_format)
+        return 0
+
+    if args.command == 'count':
+        from contacts_storage import count_contacts
+        print_result({'count': count_contacts(filename)}, output_format)
+        return 0
+
+    if args.command == 'import':
+        from contacts_import import import_file
+        import_file(filename, args.path)
+        return 0
+
+    if args.command == 'migrate':
+        from contacts_storage import migrate
+        try:
+            migrated = migrate(filename, args.target)
+        except ValueError as error:
+            parser.error(str(error))
+        print_result({'migrated': migrated, 'target': args.target}, output_format)
+        return 0
+
+    if args.command == 'serve':
+        from contacts_server import run_server
+        run_server(filename, args.host, args.port, args.unix)
+        return 0
+
+    if args.no_banner:
+        main_menu(filename)
+    else:
+        from decorators import welcome_info_decorator
+        welcome_info_decorator(filename)(main_menu)(filename)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создает разборщик аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Телефонный справочник. Без команды запускается интерактивное меню.",
+        epilog="Общие параметры указываются перед командой: main.py --format json search Иванов. "
+               "Коды завершения: 0 - успешно, 1 - ничего не найдено, 2 - ошибка.")
+    parser.add_argument('--file', default=DEFAULT_FILE, help=f"Файл с контактами (по умолчанию {DEFAULT_FILE})")
+    parser.add_argument('--format', choices=FORMATS, default='csv', help="Формат вывода команд (по умолчанию csv)")
+    parser.add_argument('--no-banner', action='store_true', help="Не показывать заставку при запуске меню")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Собирать показатели работы и вывести сводку при выходе (как {contacts_metrics.ENV_VAR}=1)")
+    parser.add_argument('--cprofile', metavar='PATH', help="Дополнительно сохранить профиль cProfile в файл")
+    subparsers = parser.add_subparsers(dest='command')
+
+    search_parser = subparsers.add_parser('search', help="Быстрый поиск по фрагменту в любом поле")
+    search_parser.add_argument('term', help="Фрагмент для поиска")
+    search_parser.add_argument('--fuzzy', action='store_true', help="Нечеткий поиск по ФИО (опечатки, латиница)")
+    search_parser.add_argument('--limit', type=non_negative_int, help="Вывести не больше указанного количества контактов")
+
+    filter_parser = subparsers.add_parser('filter', help="Фильтрация по регулярным выражениям")
+    filter_parser.add_argument('criteria', nargs='+', metavar='Поле=выражение', help="Критерии, например 'Фамилия=^Ва'")
+    filter_parser.add_argument('--limit', type=non_negative_int, help="Вывести не больше указанного количества контактов")
+
+    ordered_parser = subparsers.add_parser('ordered', help="Выборка по упорядоченному индексу в порядке индекса")
+    ordered_parser.add_argument('field', help="Первое поле индекса: ID, Фамилия или Организация")
+    ordered_parser.add_argument('--equal', action='append', default=[],
+                                help="Точное значение очередного поля индекса (можно повторять)")
+    ordered_parser.add_argument('--prefix', help="Префикс значения поля после полей из --equal")
+    ordered_parser.add_argument('--from', dest='low', help="Нижняя граница значения поля после полей из --equal")
+    ordered_parser.add_argument('--to', dest='high', help="Верхняя граница значения поля после полей из --equal")
+    ordered_parser.add_argument('--limit', type=non_negative_int, help="Вывести не больше указанного количества контактов")
+
+    page_parser = subparsers.add_parser('page', help="Одна страница справочника")
+    page_parser.add_argument('page', type=int, help="Номер страницы, начиная с 1")
+    page_parser.add_argument('--per-page', type=int, default=20, help="Записей на странице (по умолчанию 20)")
+
+    add_parser = subparsers.add_parser('add', help="Добавление контактов")
+    add_parser.add_argument('contacts', nargs='*', metavar='контакт',
+                            help="Фамилия,Имя,Отчество,Организация,Рабочий телефон,Личный телефон; "
+                                 "без аргументов контакты читаются из stdin по одному на строку")
+
+    delete_parser = subparsers.add_parser('delete', help="Удаление контактов по ID или по критериям")
+    delete_parser.add_argument('--id', dest='ids', action='append', default=[], help="ID удаляемого контакта")
+    delete_parser.add_argument('criteria', nargs='*', metavar='Поле=выражение', help="Критерии удаления")
+
+    organize_parser = subparsers.add_parser('organize', help="Сортировка по фамилии и имени с новыми ID")
+    organize_parser.add_argument('--memory-limit', type=int, default=64, help="Память для сортировки, МиБ")
+
+    subparsers.add_parser('count', help="Количество контактов")
+
+    import_parser = subparsers.add_parser('import', help="Импорт контактов из файла CSV или JSONL")
+    import_parser.add_argument('path', help="Путь к импортируемому файлу")
+
+    migrate_parser = subparsers.add_parser('migrate', help="Перенос справочника в другое хранилище (CSV или SQLite)")
+    migrate_parser.add_argument('target', help="Новый файл справочника: *.db, *.sqlite, *.sqlite3 - база SQLite, "
+                                               "иначе файл CSV; существующий файл заменяется")
+
+    serve_parser = subparsers.add_parser('serve', help="Сервер запросов на локальном сокете")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="Адрес для TCP-подключений")
+    serve_parser.add_argument('--port', type=int, default=8765, help="Порт для TCP-подключений")
+    serve_parser.add_argument('--unix', help="Путь к Unix-сокету вместо TCP")
+    return parser
+
+
+def main() -> None:
+    """Запускает меню или, если указана команда, выполняет ее без меню."""
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.profile or args.cprofile:
+        contacts_metrics.enable(args.cprofile)
+    try:
+        code = run_command(parser, args)
+    except FileNotFoundError as error:
+        print(f"Файл не найден: {error.filename}", file=sys.stderr)
+        code = EXIT_ERROR
+    except re.error as error:
+        print(f"Некорректное регулярное выражение: {error}", file=sys.stderr)
+        code = EXIT_ERROR
+    except BrokenPipeError:
+        # Вывод передан в head или другую программу, которая перестала читать: оставшийся вывод отбрасывается
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        code = 0
+    sys.exit(code)
+
+
 if __name__ == "__main__":
-    main_menu()
+    main()
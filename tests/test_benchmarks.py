@@ -0,0 +1,106 @@
+"""
+Генератор синтетического справочника детерминирован, а сценарии замеров выполняются на маленьком справочнике.
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from benchmarks.__main__ import run_scenario
+from benchmarks.generator import dataset, generate_rows, parse_size, write_phonebook
+from benchmarks.scenarios import SCENARIOS
+from contacts_record import FIELDS
+from contacts_storage import close_stores
+from contacts_store import ContactStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class GeneratorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_parse_size(self) -> None:
+        self.assertEqual(parse_size('10k'), 10_000)
+        self.assertEqual(parse_size('1M'), 1_000_000)
+        self.assertEqual(parse_size('10m'), 10_000_000)
+        self.assertEqual(parse_size('250'), 250)
+        with self.assertRaises(ValueError):
+            parse_size('1g')
+
+    def test_rows(self) -> None:
+        rows = list(generate_rows(500, seed=3))
+        self.assertEqual([row[0] for row in rows], [str(contact_id) for contact_id in range(1, 501)])
+        for row in rows:
+            self.assertEqual(len(row), len(FIELDS))
+            self.assertFalse(any(',' in value or '\n' in value for value in row))
+            self.assertRegex(row[5], r'^\+7\d{10}$')
+            self.assertRegex(row[6], r'^\+7\d{10}$')
+        self.assertEqual(rows, list(generate_rows(500, seed=3)))
+        self.assertNotEqual(rows, list(generate_rows(500, seed=4)))
+
+    def test_same_file_for_same_seed(self) -> None:
+        first = os.path.join(self.directory, 'first.csv')
+        second = os.path.join(self.directory, 'second.csv')
+        self.assertEqual(write_phonebook(first, 300, seed=5), (first, 300))
+        write_phonebook(second, 300, seed=5)
+        with open(first, 'rb') as file_1, open(second, 'rb') as file_2:
+            self.assertEqual(file_1.read(), file_2.read())
+        self.assertEqual(len(ContactStore(first)), 300)
+
+    def test_dataset_cached(self) -> None:
+        path = dataset(self.directory, 100, 0)
+        mtime_ns = os.stat(path).st_mtime_ns
+        self.assertEqual(dataset(self.directory, 100, 0), path)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime_ns)
+
+
+class ScenariosTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'phonebook.csv')
+        write_phonebook(self.source, 200)
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_every_scenario_runs(self) -> None:
+        with open(self.source, 'rb') as file:
+            original = file.read()
+        for name in SCENARIOS:
+            with self.subTest(scenario=name):
+                result = run_scenario(name, self.source, 200, memory=False)
+                self.assertEqual((result['scenario'], result['rows']), (name, 200))
+                self.assertGreaterEqual(result['seconds'], 0)
+        self.assertGreater(run_scenario('read_contacts', self.source, 200, memory=True)['peak_memory_bytes'], 0)
+        with open(self.source, 'rb') as file:
+            self.assertEqual(file.read(), original)  # Сценарии работают с копиями справочника
+
+    def test_command_line(self) -> None:
+        output = os.path.join(self.directory, 'results.json')
+        command = [sys.executable, '-m', 'benchmarks', '--size', '50', '--scenario', 'read_contacts',
+                   '--scenario', 'quick_search', '--no-memory', '--data-dir', self.directory]
+        subprocess.run(command + ['--output', output], cwd=ROOT, check=True, capture_output=True)
+        with open(output, encoding='utf-8') as file:
+            report = json.load(file)
+        self.assertEqual([(item['scenario'], item['rows']) for item in report['results']],
+                         [('read_contacts', 50), ('quick_search', 50)])
+        self.assertEqual(report['results'][0]['records'], 50)
+
+        compared = subprocess.run(command + ['--compare', output], cwd=ROOT, check=True, capture_output=True,
+                                  text=True)
+        self.assertTrue(re.search(r'^read_contacts\s', compared.stderr, re.MULTILINE))
+        self.assertEqual(len(json.loads(compared.stdout)['results']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
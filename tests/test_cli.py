@@ -0,0 +1,64 @@
+"""
+Команды командной строки main.py: разбор аргументов и коды завершения.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from contacts_store import HEADER
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+class CommandLineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id in range(1, 4):
+                file.write(f'{contact_id},Иванов,Иван,Петрович,ООО Ромашка,+7495{contact_id:07d},\n')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_main(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, MAIN, '--file', self.path, *args], capture_output=True,
+                              text=True, encoding='utf-8', timeout=60)
+
+    def test_limit(self) -> None:
+        for command in (['search', 'иванов'], ['filter', 'Фамилия=^Ив'], ['ordered', 'Фамилия', '--prefix', 'Ив']):
+            with self.subTest(command=command[0]):
+                result = self.run_main(*command, '--limit', '2')
+                self.assertEqual(result.returncode, 0, result.stderr)
+                self.assertEqual(len(result.stdout.splitlines()), 3)  # Заголовок и две записи
+
+    def test_invalid_limit(self) -> None:
+        for command in (['search', 'иванов'], ['filter', 'Фамилия=^Ив'], ['ordered', 'Фамилия']):
+            for limit in ('-1', 'abc'):
+                with self.subTest(command=command[0], limit=limit):
+                    result = self.run_main(*command, '--limit', limit)
+                    self.assertEqual(result.returncode, 2)
+                    self.assertIn('--limit', result.stderr)
+                    self.assertNotIn('Traceback', result.stderr)
+
+    def test_menu_phone_and_import(self) -> None:
+        source = os.path.join(self.directory, 'import.csv')
+        with open(source, 'w', encoding='utf-8') as file:
+            file.write('Петров,Петр,Петрович,ИП Петров,8 (495) 765-43-21,\n')
+        result = subprocess.run([sys.executable, MAIN, '--file', self.path, '--no-banner'],
+                                input=f'9\n0000002\n10\n{source}\n9\n4957654321\n7\n', capture_output=True,
+                                text=True, encoding='utf-8', timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('9 - Поиск по номеру телефона', result.stdout)
+        self.assertIn('10 - Импорт контактов', result.stdout)
+        self.assertIn('2, Иванов, Иван, Петрович, ООО Ромашка, +74950000002', result.stdout)
+        self.assertIn('4, Петров, Петр, Петрович, ИП Петров, +74957654321', result.stdout)
+        self.assertIn('Выход из программы.', result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Удаление по набору ID и по критериям за один проход по файлу и уточнение найденных контактов в памяти.
+"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from contacts_delete import delete_contact, delete_matching, prompt_delete_or_refine_search, refine_contacts
+from contacts_search import precise_search, quick_search
+from contacts_storage import close_stores, get_store, migrate, open_storage
+from contacts_store import HEADER, ContactStore
+
+ROWS = [
+    '1,Иванов,Иван,Иванович,ООО Ромашка,+74951234567,',
+    '2,Петрова,Анна,,АО Вектор,,+79161234567',
+    '',
+    '3,Сидоров,Петр,Петрович,ООО Ромашка,+74957654321,',
+    '4,Smith,John,,Acme Corp,+12025550100,',
+    '5,Кузнецов,Олег,,ООО Вектор,,',
+]
+
+
+class DeleteTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.writelines(row + '\n' for row in ROWS)
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def lines(self):
+        with open(self.path, encoding='utf-8') as file:
+            return file.read().splitlines()
+
+    def ids(self):
+        return [contact.id for contact in ContactStore(self.path).contacts()]
+
+    def test_delete_ids_in_one_pass(self) -> None:
+        self.assertEqual(delete_contact(self.path, ['2', '4', '42']), 2)
+        self.assertEqual(self.lines(), [HEADER] + [row for row in ROWS if row and row[0] not in '24'])
+        self.assertFalse(get_store(self.path).loaded)  # Файл переписан потоком, без загрузки хранилища
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_nothing_to_delete(self) -> None:
+        with open(self.path, 'rb') as file:
+            original = file.read()
+        self.assertEqual(delete_contact(self.path, []), 0)
+        self.assertEqual(delete_contact(self.path, ['42']), 0)
+        self.assertEqual(delete_matching(self.path, Фамилия='^нет$'), 0)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), original)
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_delete_matching(self) -> None:
+        matching = [contact.id for contact in precise_search(self.path, Организация='^ооо', Фамилия='ов$')]
+        self.assertEqual(matching, ['1', '3', '5'])
+        self.assertEqual(delete_matching(self.path, Организация='^ооо', Фамилия='ов$'), 3)
+        self.assertEqual(self.ids(), ['2', '4'])
+
+    def test_loaded_store_and_journal(self) -> None:
+        store = get_store(self.path)
+        store.update(['1'], {'Организация': 'АО Вектор'})  # Изменение пока только в журнале
+        self.assertEqual(delete_matching(self.path, Организация='вектор'), 3)
+        self.assertEqual(delete_contact(self.path, ['3']), 1)
+        close_stores()
+        self.assertEqual(self.ids(), ['4'])
+
+    def test_sqlite_store(self) -> None:
+        db_path = os.path.join(self.directory, 'contacts.db')
+        migrate(self.path, db_path)
+        self.assertEqual(delete_matching(db_path, Организация='ромашка'), 2)
+        self.assertEqual(delete_contact(db_path, ['4', '42']), 1)
+        self.assertEqual([contact.id for contact in open_storage(db_path).contacts()], ['2', '5'])
+
+    def test_refine_contacts(self) -> None:
+        found = quick_search(self.path, 'ов')
+        self.assertEqual([contact.id for contact in refine_contacts(found, 'РОМАШ')], ['1', '3'])
+        self.assertEqual(refine_contacts(found, 'нет такого'), [])
+
+    def test_prompt_refines_found_contacts(self) -> None:
+        found = quick_search(self.path, 'ов')
+        with mock.patch('builtins.input', side_effect=['ромашка', 'y']), redirect_stdout(io.StringIO()):
+            prompt_delete_or_refine_search(self.path, found)
+        self.assertEqual(self.ids(), ['2', '4', '5'])
+
+    def test_prompt_deletes_listed_ids(self) -> None:
+        found = quick_search(self.path, 'ов')
+        with mock.patch('builtins.input', side_effect=['1, 5']), redirect_stdout(io.StringIO()):
+            prompt_delete_or_refine_search(self.path, found)
+        self.assertEqual(self.ids(), ['2', '3', '4'])
+
+
+if __name__ == '__main__':
+    unittest.main()
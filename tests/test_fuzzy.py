@@ -0,0 +1,62 @@
+"""
+Нечеткий поиск находит опечатки в согласных и перестановки букв, которые меняют фонетический ключ.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts_fuzzy import FuzzyIndex, phonetic_key, words
+from contacts_store import HEADER, ContactStore
+
+NAMES = [('Васильев', 'Иван', 'Петрович'), ('Кузнецов', 'Петр', 'Иванович'), ('Сидорова', 'Анна', 'Сергеевна'),
+         ('Петров', 'Сергей', 'Олегович'), ('Волков', 'Василий', 'Андреевич')]
+
+
+class FuzzySearchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id, (last_name, first_name, middle_name) in enumerate(NAMES, start=1):
+                file.write(f'{contact_id},{last_name},{first_name},{middle_name},,+7495{contact_id:07d},\n')
+        self.store = ContactStore(self.path)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def surnames(self, term: str):
+        return [contact.last_name for contact in self.store.fuzzy_search(term)]
+
+    def test_phonetic_variants(self) -> None:
+        for term in ('Васильэв', 'Василиев', 'Васильева', 'Vasiliev', 'Vasilyev'):
+            with self.subTest(term=term):
+                self.assertEqual(self.surnames(term)[:1], ['Васильев'])
+
+    def test_consonant_typos(self) -> None:
+        for term, surname in (('Кузмецов', 'Кузнецов'), ('Васидьев', 'Васильев'), ('Сидлрова', 'Сидорова'),
+                              ('Kuzmetsov', 'Кузнецов')):
+            with self.subTest(term=term):
+                self.assertNotEqual(phonetic_key(words(term)[0]), phonetic_key(words(surname)[0]))
+                self.assertEqual(self.surnames(term)[:1], [surname])
+
+    def test_transpositions_and_dropped_letters(self) -> None:
+        for term, surname in (('Васлиьев', 'Васильев'), ('Кузнеоцв', 'Кузнецов'), ('Сидрова', 'Сидорова'),
+                              ('Кузецов', 'Кузнецов'), ('Петрв', 'Петров')):
+            with self.subTest(term=term):
+                self.assertIn(surname, self.surnames(term))
+
+    def test_unrelated_names_are_not_found(self) -> None:
+        self.assertEqual(self.surnames('Смирнов'), [])
+
+    def test_keys_added_after_first_search(self) -> None:
+        index = FuzzyIndex()
+        index.add(0, ('Васильев',))
+        self.assertEqual(index.candidates('васлиьев'), {0})
+        index.add(1, ('Кузнецов',))
+        self.assertEqual(index.candidates('кузмецов'), {1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Загрузка сохраненных индексов хранилищем, номера строк которого отличаются от позиций записей в файле.
+
+Процесс, который сам удалил запись, хранит на ее месте пропуск в номерах строк. Индекс, сохраненный
+другим процессом для того же состояния файла, должен указывать на те же записи и в нем.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts_store import HEADER, ContactStore
+
+SURNAMES = ['Иванов', 'Петров', 'Сидоров', 'Кузнецов', 'Смирнов', 'Попов', 'Семенов']
+
+
+class IndexSidecarRowidsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id in range(1, 31):
+                surname = SURNAMES[contact_id % len(SURNAMES)]
+                file.write(f'{contact_id},{surname},Иван,Петрович,ООО Ромашка,+7495{contact_id:07d},\n')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stores(self):
+        # Первый процесс удаляет запись сам, второй загружает файл с журналом заново
+        first = ContactStore(self.path)
+        self.assertEqual(first.delete(['3']), 1)
+        second = ContactStore(self.path)
+        self.assertEqual(len(second), len(first))
+        return first, second
+
+    def test_fuzzy_index_saved_by_another_store(self) -> None:
+        first, second = self.stores()
+        expected = [contact['ID'] for contact in second.fuzzy_search('Semenov')]
+        self.assertEqual(expected, ['6', '13', '20', '27'])
+        self.assertEqual([contact['ID'] for contact in first.fuzzy_search('Semenov')], expected)
+
+    def test_sorted_index_saved_by_another_store(self) -> None:
+        first, second = self.stores()
+        expected = [contact['ID'] for contact in second.ordered('Фамилия', prefix='Се')]
+        self.assertEqual(expected, ['6', '13', '20', '27'])
+        self.assertEqual([contact['ID'] for contact in first.ordered('Фамилия', prefix='Се')], expected)
+        self.assertEqual([contact['ID'] for contact in first.precise_search(Фамилия='^Семенов$')],
+                         ['6', '13', '20', '27'])
+
+
+if __name__ == '__main__':
+    unittest.main()
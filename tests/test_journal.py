@@ -0,0 +1,93 @@
+"""
+Журнал изменений файла контактов: запись операций и их применение при загрузке.
+"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from contacts_journal import Journal
+from contacts_storage import migrate, open_storage
+from contacts_store import HEADER, ContactStore
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        self.journal_path = self.path + '.journal'
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id in range(1, 6):
+                file.write(f'{contact_id},Иванов{contact_id},Иван,Петрович,ООО Ромашка,+7495{contact_id:07d},\n')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_empty_update_is_not_logged(self) -> None:
+        store = ContactStore(self.path)
+        self.assertEqual(store.update(['1', '2'], {}), 0)
+        self.assertEqual(store.update_checked([store.get('1')], {}), (0, []))
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertEqual(store.update(['1'], {'Имя': 'Петр'}), 1)
+        self.assertTrue(os.path.exists(self.journal_path))
+
+    def test_empty_update_sqlite(self) -> None:
+        db_path = os.path.join(self.directory, 'contacts.db')
+        migrate(self.path, db_path)
+        store = open_storage(db_path)
+        try:
+            self.assertEqual(store.update(['1', '2'], {}), 0)
+            self.assertEqual(store.update_checked([store.get('1')], {}), (0, []))
+        finally:
+            store.close()
+
+    def write_journal(self, *lines: bytes) -> None:
+        store = ContactStore(self.path)
+        store.update(['1'], {'Имя': 'Первый'})
+        store.update(['2'], {'Имя': 'Второй'})
+        with open(self.journal_path, 'ab') as file:
+            file.writelines(lines)
+
+    def test_replay(self) -> None:
+        self.write_journal()
+        store = ContactStore(self.path)
+        self.assertEqual([store.get(contact_id).first_name for contact_id in '123'], ['Первый', 'Второй', 'Иван'])
+
+    def test_torn_last_line(self) -> None:
+        self.write_journal(b'{"op": "delete", "ids": ["3"')
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            store = ContactStore(self.path)
+            self.assertEqual(len(store), 5)
+            self.assertEqual(store.get('2').first_name, 'Второй')
+            self.assertEqual(store.delete(['4']), 1)
+        self.assertEqual(stderr.getvalue(), '')
+        # Новая операция записана вместо незавершенной строки и применяется при следующей загрузке
+        store = ContactStore(self.path)
+        self.assertEqual([contact.id for contact in store.iter_contacts()], ['1', '2', '3', '5'])
+
+    def test_corrupt_middle_line(self) -> None:
+        self.write_journal(b'{"op": "delete", "ids": \xff\n', b'{"op": "delete", "ids": ["3"]}\n')
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            store = ContactStore(self.path)
+            self.assertEqual(len(store), 5)
+            self.assertEqual(store.get('2').first_name, 'Второй')
+        self.assertIn('строке 4', stderr.getvalue())
+        self.assertEqual(store.update(['5'], {'Имя': 'Пятый'}), 1)
+        store = ContactStore(self.path)
+        self.assertEqual(len(store), 5)
+        self.assertEqual([store.get(contact_id).first_name for contact_id in '125'], ['Первый', 'Второй', 'Пятый'])
+
+    def test_not_an_operation(self) -> None:
+        self.write_journal(b'[1, 2]\n')
+        base = os.stat(self.path)
+        with redirect_stderr(io.StringIO()):
+            self.assertEqual(len(Journal(self.path).read((base.st_mtime_ns, base.st_size))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
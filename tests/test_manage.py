@@ -0,0 +1,52 @@
+"""
+Редактирование контактов из меню: выбор по поиску в хранилище и проверка вводимых значений.
+"""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from contacts_manage import update_selected_contacts
+from contacts_storage import close_stores, get_store
+from contacts_store import HEADER
+
+
+class UpdateSelectedContactsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.write('1,Иванов,Иван,Петрович,ООО Ромашка,+74951234567,\n')
+            file.write('2,Петров,Петр,Иванович,ИП Петров,+74957654321,\n')
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_menu(self, answers) -> str:
+        output = io.StringIO()
+        with mock.patch('builtins.input', side_effect=answers), redirect_stdout(output):
+            update_selected_contacts(self.path)
+        return output.getvalue()
+
+    def test_comma_is_rejected(self) -> None:
+        output = self.run_menu(['ромашка', '1', 'Сидоров,Иван', 'Сидоров', '', '', '', '', ''])
+        self.assertIn('Некорректное значение', output)
+        store = get_store(self.path)
+        self.assertEqual(store.get('1').last_name, 'Сидоров')
+        self.assertEqual(store.get('2').last_name, 'Петров')
+        close_stores()
+        with open(self.path, encoding='utf-8') as file:
+            self.assertTrue(all(line.count(',') == 6 for line in file))
+        self.assertEqual(get_store(self.path).get('1').last_name, 'Сидоров')
+
+    def test_nothing_found(self) -> None:
+        self.assertIn('Контакты не найдены', self.run_menu(['Смирнов']))
+
+
+if __name__ == '__main__':
+    unittest.main()
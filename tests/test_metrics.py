@@ -0,0 +1,120 @@
+"""
+Сбор показателей работы: декоратор instrumented, счетчики и кэши contacts_metrics и флаги командной строки.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+import contacts_metrics
+from contacts_store import HEADER
+from decorators import instrumented
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+@instrumented()
+def double(value: int) -> int:
+    """Удваивает число."""
+    return value * 2
+
+
+@instrumented('деление')
+def divide(value: int, divisor: int) -> float:
+    return value / divisor
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Показатели - состояние модуля; каждый тест работает со своим пустым набором
+        for name, value in (('_calls', {}), ('_counters', Counter()), ('_caches', {}), ('enabled', False)):
+            patcher = mock.patch.object(contacts_metrics, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_disabled(self) -> None:
+        self.assertEqual(double(2), 4)
+        contacts_metrics.count('rows_scanned', 10)
+        contacts_metrics.cache('snapshot', True)
+        self.assertEqual((contacts_metrics._calls, contacts_metrics._counters, contacts_metrics._caches),
+                         ({}, Counter(), {}))
+
+    def test_wrapper_keeps_metadata(self) -> None:
+        self.assertEqual(double.__name__, 'double')
+        self.assertEqual(double.__doc__, "Удваивает число.")
+
+    def test_calls_recorded(self) -> None:
+        contacts_metrics.enabled = True
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(3), 6)
+        with self.assertRaises(ZeroDivisionError):
+            divide(1, 0)  # Вызов с исключением тоже учитывается
+        self.assertEqual(contacts_metrics._calls['double'].calls, 2)
+        self.assertEqual(contacts_metrics._calls['деление'].calls, 1)
+        self.assertEqual(sum(contacts_metrics._calls['double'].histogram.values()), 2)
+
+    def test_histogram_buckets(self) -> None:
+        stats = contacts_metrics.CallStats()
+        for seconds in (0.0004, 0.001, 0.003, 0.003, 0.9):
+            stats.add(seconds)
+        self.assertEqual(stats.calls, 5)
+        self.assertAlmostEqual(stats.seconds, 0.9074)
+        self.assertEqual(stats.histogram, Counter({0: 1, 1: 1, 2: 2, 10: 1}))
+
+    def test_summary(self) -> None:
+        contacts_metrics.enabled = True
+        double(1)
+        contacts_metrics.count('rows_scanned', 10)
+        contacts_metrics.count('rows_scanned', 5)
+        contacts_metrics.cache('snapshot', True)
+        contacts_metrics.cache('snapshot', True)
+        contacts_metrics.cache('snapshot', False)
+        summary = contacts_metrics.summary()
+        self.assertRegex(summary, r'double\s+1\s')
+        self.assertIn('rows_scanned: 15', summary)
+        self.assertIn('snapshot: попаданий 2 из 3 (67%)', summary)
+
+
+class CommandLineProfileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.write('1,Иванов,Иван,Петрович,ООО Ромашка,+74951234567,\n')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_main(self, *args: str, **environment: str) -> subprocess.CompletedProcess:
+        env = {key: value for key, value in os.environ.items()
+               if key not in (contacts_metrics.ENV_VAR, contacts_metrics.CPROFILE_ENV_VAR)}
+        env.update(environment)
+        return subprocess.run([sys.executable, MAIN, '--file', self.path, *args, 'search', 'иванов'],
+                              capture_output=True, text=True, encoding='utf-8', timeout=60, env=env)
+
+    def test_no_summary_by_default(self) -> None:
+        result = self.run_main()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn('Показатели работы справочника', result.stderr)
+
+    def test_profile_flag_and_environment(self) -> None:
+        for result in (self.run_main('--profile'), self.run_main(**{contacts_metrics.ENV_VAR: '1'})):
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn('Показатели работы справочника', result.stderr)
+            self.assertIn('Иванов', result.stdout)
+
+    def test_cprofile(self) -> None:
+        profile_path = os.path.join(self.directory, 'session.prof')
+        result = self.run_main('--cprofile', profile_path)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertTrue(os.path.getsize(profile_path))
+        self.assertIn('Показатели работы справочника', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
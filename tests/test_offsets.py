@@ -0,0 +1,99 @@
+"""
+Постраничный просмотр по индексу смещений строк выдает те же записи, что и разбор всего файла.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from contacts_display import read_page
+from contacts_offsets import OffsetIndex
+from contacts_storage import close_stores, get_store
+from contacts_store import HEADER, parse_line
+
+STRIDE = 4
+
+
+def make_rows(first: int, count: int):
+    return [f'{contact_id},Фамилия{contact_id},Имя,,Организация,+7495{contact_id:07d},\n'
+            for contact_id in range(first, first + count)]
+
+
+@mock.patch('contacts_offsets.STRIDE', STRIDE)
+class OffsetIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        rows = make_rows(1, 21)
+        rows.insert(5, '\n')  # Пустые строки не считаются записями
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.writelines(rows)
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def lines(self):
+        with open(self.path, encoding='utf-8') as file:
+            next(file)
+            return [line.rstrip('\n') for line in file if line.strip()]
+
+    def assert_pages(self, index: OffsetIndex) -> None:
+        lines = self.lines()
+        self.assertEqual(index.count, len(lines))
+        for start in range(len(lines) + 2):
+            for count in (0, 1, 3, STRIDE, STRIDE + 1, len(lines)):
+                with self.subTest(start=start, count=count):
+                    self.assertEqual(index.page(start, count), lines[start:start + count])
+
+    def test_pages_match_file(self) -> None:
+        self.assert_pages(OffsetIndex.open(self.path))
+
+    def test_loaded_from_saved_index(self) -> None:
+        OffsetIndex.open(self.path)
+        self.assertTrue(os.path.exists(OffsetIndex.path_for(self.path)))
+        with mock.patch.object(OffsetIndex, '_scan') as scan:
+            index = OffsetIndex.open(self.path)
+        scan.assert_not_called()
+        self.assert_pages(index)
+
+    def test_extended_after_append(self) -> None:
+        size = os.path.getsize(self.path)
+        OffsetIndex.open(self.path)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.writelines(make_rows(22, 7))
+        with mock.patch.object(OffsetIndex, '_scan', autospec=True, side_effect=OffsetIndex._scan) as scan:
+            index = OffsetIndex.open(self.path)
+        scan.assert_called_once_with(index, size)
+        self.assert_pages(index)
+        self.assert_pages(OffsetIndex.open(self.path))
+
+    def test_rebuilt_after_rewrite(self) -> None:
+        OffsetIndex.open(self.path)
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.writelines(make_rows(100, 30))  # Файл длиннее прежнего, но начало другое
+        with mock.patch.object(OffsetIndex, '_scan', autospec=True, side_effect=OffsetIndex._scan) as scan:
+            index = OffsetIndex.open(self.path)
+        scan.assert_called_once_with(index, 0)
+        self.assert_pages(index)
+
+    def test_read_page(self) -> None:
+        contacts = [parse_line(line) for line in self.lines()]
+        for page in range(1, 6):
+            with self.subTest(page=page):
+                self.assertEqual(read_page(self.path, page, 5), (contacts[(page - 1) * 5:page * 5], 5))
+        self.assertEqual(read_page(self.path, 6, 5), ([], 5))
+        self.assertEqual(read_page(self.path, 0, 5), ([], 5))
+
+    def test_read_page_with_journal(self) -> None:
+        get_store(self.path).update(['3'], {'Имя': 'Петр'})
+        contacts, total_pages = read_page(self.path, 1, 5)
+        self.assertEqual(total_pages, 5)
+        self.assertEqual(contacts[2]['Имя'], 'Петр')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Параллельный просмотр файла находит те же контакты, что и поиск через хранилище, и используется,
+только пока у файла нет актуального снимка и процесс еще не просматривал его.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import contacts_parallel
+from contacts_storage import close_stores
+from contacts_store import HEADER, ContactStore
+
+SURNAMES = ['Иванов', 'Петрова', 'Сидоров', 'Кузнецова', 'Smith', 'Ёлкин', 'ИВАНОВСКИЙ']
+ORGANIZATIONS = ['ООО Ромашка', 'ИП Васильев', 'АО "Газпром"', '']
+
+
+class ParallelScanTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id in range(1, 301):
+                file.write(f'{contact_id},{SURNAMES[contact_id % 7]},Имя{contact_id % 13},Отчество,'
+                           f'{ORGANIZATIONS[contact_id % 4]},+7495{contact_id:07d},+7916{contact_id * 7:07d}\n')
+
+    def tearDown(self) -> None:
+        close_stores()
+        contacts_parallel._scanned.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_same_results_as_store(self) -> None:
+        store = ContactStore(self.path)
+        for term in ('иванов', 'ИВАН', 'ё', 'smi', '00012', 'газпром"', 'нет такого'):
+            with self.subTest(term=term):
+                self.assertEqual(list(contacts_parallel.iter_quick_search(self.path, term, 3)),
+                                 store.quick_search(term))
+        for criteria in ({'Фамилия': '^Иванов'}, {'Организация': 'ип', 'Имя': r'Имя1\d'}, {'ID': '1.'},
+                         {'Личный телефон': '7$', 'Фамилия': 'ова$'}):
+            with self.subTest(criteria=criteria):
+                self.assertEqual(list(contacts_parallel.iter_precise_search(self.path, criteria, 3)),
+                                 store.precise_search(**criteria))
+
+    @mock.patch('contacts_parallel.PARALLEL_MIN_SIZE', 0)
+    def test_scan_once_per_process(self) -> None:
+        self.assertTrue(contacts_parallel.should_scan(self.path, 2))
+        list(contacts_parallel.iter_quick_search(self.path, 'иванов', 2))
+        self.assertFalse(contacts_parallel.should_scan(self.path, 2))
+
+    @mock.patch('contacts_parallel.PARALLEL_MIN_SIZE', 0)
+    def test_no_scan_with_snapshot(self) -> None:
+        len(ContactStore(self.path))  # Загрузка сохраняет снимок
+        self.assertFalse(contacts_parallel.should_scan(self.path, 2))
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('301,Новиков,Иван,Иванович,,+74950000301,\n')
+        self.assertTrue(contacts_parallel.should_scan(self.path, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
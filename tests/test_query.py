@@ -0,0 +1,150 @@
+"""
+Проверки плана запроса сравнением строк дают тот же результат, что и re.search с re.IGNORECASE.
+"""
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from contacts_query import compile_query, fold_case, split_literal_prefix
+from contacts_store import HEADER, ContactStore, parse_line
+from contacts_storage import close_stores, migrate, open_storage
+
+# Значения полей; переводов строки в значениях не бывает, поэтому '$' означает конец значения
+VALUES = [
+    '', 'Иванов', 'иванов', 'ИВАНОВА', 'Петров-Иванов', 'Ёлкин', 'елкин', 'ЁЛКИН', 'Smith', 'SMITHSON', 'smith.',
+    'a.b', 'axb', 'a+b', 'aab', 'b', '(495)', '+74951234567', '8(495)123', 'İnce', 'ince', 'INCE', 'i̇nce', 'ınce',
+    'Straße', 'STRASSE', 'STRAẞE', 'ſmith', 'Σοφία', 'ΣΟΦΊΑ', 'σοφίας', 'ΣΟΦΊΑΣ', 'ᲂльга', 'Ольга', 'µ', 'Μ',
+    '1', '12', '21', '1.', '10',
+]
+
+# Выражения для текстовых полей: литералы, якоря, экранированные метасимволы, квантификаторы
+# после литерала и альтернатива
+PATTERNS = [
+    '', '^', '$', '^$', 'иванов', 'ИВАНОВ', '^иванов', '^Иванов$', 'ов$', 'ова$', 'ёлк', '^ЕЛК', '^ёлкин$',
+    'smith', '^SMITH', '^smith$', 'smith\\.', '^smith\\.$', 'a\\.b', '^a.b$', 'a\\+b', 'a+b', '^a*b', 'ab*',
+    'a{2}b', '^\\(495\\)', '\\(495', '^\\+7495', '\\+7', '^8\\(', 'ince', '^ince$', '^İNCE', '^INCE$', 'İ',
+    'ı', '^ınce$', 'straße', 'STRASSE', '^straẞe$', '^ß', 'smi', '^ſmi', 'ſ', '^σοφία$', 'σοφίας$', 'ς$',
+    '^ΣΟΦΊΑΣ$', 'ольга', '^ольга$', 'µ', '^μ$', 'ов|ин', '^(иван|петр)', 'и[вн]а', '\\d+', '^\\w+$',
+]
+
+# Выражения для ID, которые оборачиваются в '^…$'
+ID_PATTERNS = ['1', '12', '1.', '1\\.', '\\d', '\\d+', '1|2', '', '2?1', '10?']
+
+
+def expected(field: str, pattern: str, value: str) -> bool:
+    return re.search(f'^{pattern}$' if field == 'ID' else pattern, value, re.IGNORECASE) is not None
+
+
+class QueryPlanTest(unittest.TestCase):
+    def test_text_fields_match_regex(self) -> None:
+        for pattern in PATTERNS:
+            plan = compile_query({'Фамилия': pattern})
+            for value in VALUES:
+                with self.subTest(pattern=pattern, value=value):
+                    self.assertEqual(plan.matches({'Фамилия': value}), expected('Фамилия', pattern, value))
+
+    def test_id_matches_whole_value(self) -> None:
+        for pattern in ID_PATTERNS:
+            plan = compile_query({'ID': pattern})
+            for value in VALUES:
+                with self.subTest(pattern=pattern, value=value):
+                    self.assertEqual(plan.matches({'ID': value}), expected('ID', pattern, value))
+
+    def test_several_fields(self) -> None:
+        plan = compile_query({'Фамилия': '^иван', 'Имя': 'ПЁТР$', 'ID': '\\d+'})
+        self.assertTrue(plan.matches({'ID': '7', 'Фамилия': 'Иванов', 'Имя': 'Пётр'}))
+        self.assertFalse(plan.matches({'ID': '7', 'Фамилия': 'Иванов', 'Имя': 'Петр'}))
+        self.assertFalse(plan.matches({'ID': 'x7', 'Фамилия': 'Иванов', 'Имя': 'Пётр'}))
+
+    def test_split_literal_prefix(self) -> None:
+        cases = [
+            ('иванов', ('иванов', '')),
+            ('ов$', ('ов', '$')),
+            ('a\\.b', ('a.b', '')),
+            ('\\+7\\(495\\)', ('+7(495)', '')),
+            ('ab*', ('a', 'b*')),
+            ('ab+c', ('a', 'b+c')),
+            ('ab{2}', ('a', 'b{2}')),
+            ('ab?$', ('a', 'b?$')),
+            ('a.b', ('a', '.b')),
+            ('\\d+', ('', '\\d+')),
+            ('ов|ин', ('', 'ов|ин')),
+            ('', ('', '')),
+        ]
+        for pattern, result in cases:
+            with self.subTest(pattern=pattern):
+                self.assertEqual(split_literal_prefix(pattern), result)
+
+    def test_index_hints(self) -> None:
+        self.assertEqual(compile_query({'ID': '12'}).id_literal, '12')
+        self.assertIsNone(compile_query({'ID': '1.'}).id_literal)
+        self.assertIsNone(compile_query({'ID': '1|2'}).id_literal)
+        self.assertEqual(compile_query({'Фамилия': '^ИВАН'}).prefixes, {'Фамилия': ('иван', False)})
+        self.assertEqual(compile_query({'Фамилия': '^Иванов$'}).prefixes, {'Фамилия': ('иванов', True)})
+        self.assertEqual(compile_query({'Фамилия': '^İnce'}).prefixes, {'Фамилия': ('ince', False)})
+        self.assertEqual(compile_query({'Фамилия': 'иван'}).prefixes, {})
+        self.assertEqual(compile_query({'Фамилия': '^(иван|петр)'}).prefixes, {})
+
+    def test_fold_case_agrees_with_ignorecase(self) -> None:
+        letters = [chr(code) for code in range(0x10000) if chr(code).lower() != chr(code).upper()]
+        for letter in letters:
+            regex = re.compile(re.escape(letter), re.IGNORECASE)
+            for other in {letter.lower(), letter.upper(), fold_case(letter)}:
+                if len(other) == 1:
+                    with self.subTest(letter=letter, other=other):
+                        self.assertEqual(fold_case(letter) == fold_case(other), regex.fullmatch(other) is not None)
+
+
+class StorePrefixCandidatesTest(unittest.TestCase):
+    """Кандидаты из упорядоченных индексов не теряют записей, которые нашел бы перебор."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        names = [value for value in VALUES if value and ',' not in value]
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id, name in enumerate(names, start=1):
+                file.write(f'{contact_id},{name},{names[-contact_id]},,{name} и партнеры,,\n')
+        with open(self.path, encoding='utf-8') as file:
+            next(file)
+            self.contacts = [contact for contact in map(parse_line, file) if contact is not None]
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def assert_parity(self, store) -> None:
+        for field in ('Фамилия', 'Имя', 'Организация'):
+            for pattern in PATTERNS:
+                with self.subTest(field=field, pattern=pattern):
+                    self.assertEqual(
+                        store.precise_search(**{field: pattern}),
+                        [contact for contact in self.contacts if expected(field, pattern, contact[field])])
+
+    def test_csv_store(self) -> None:
+        self.assert_parity(ContactStore(self.path))
+        self.assert_parity(ContactStore(self.path))  # Индексы прочитаны из файлов рядом со справочником
+
+    def test_sqlite_store(self) -> None:
+        db_path = os.path.join(self.directory, 'contacts.db')
+        migrate(self.path, db_path)
+        self.assert_parity(open_storage(db_path))
+
+    def test_sqlite_keys_rebuilt_from_version_1(self) -> None:
+        db_path = os.path.join(self.directory, 'contacts.db')
+        migrate(self.path, db_path)
+        close_stores()
+        with sqlite3.connect(db_path) as db:
+            db.create_function('py_lower', 1, str.lower)
+            db.execute("UPDATE contacts SET last_name_key = py_lower(last_name), first_name_key = py_lower(first_name)")
+            db.execute("PRAGMA user_version = 1")
+        db.close()
+        self.assert_parity(open_storage(db_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Обработка некорректных запросов сервером справочника: ошибка запроса возвращается клиенту в ответе.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts_server import PhonebookService
+from contacts_storage import close_stores
+from contacts_store import HEADER
+
+
+class PhonebookServiceErrorsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id in range(1, 6):
+                file.write(f'{contact_id},Иванов,Иван,Петрович,ООО Ромашка,+7495{contact_id:07d},\n')
+        self.service = PhonebookService(self.path)
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_negative_limit(self) -> None:
+        response = self.service.handle({'id': 1, 'op': 'quick_search', 'term': 'иванов', 'limit': -1})
+        self.assertEqual((response['id'], response['ok']), (1, False))
+        response = self.service.handle({'id': 2, 'op': 'quick_search', 'term': 'иванов', 'limit': '10'})
+        self.assertFalse(response['ok'])
+
+    def test_limit(self) -> None:
+        response = self.service.handle({'op': 'quick_search', 'term': 'иванов', 'limit': 2})
+        self.assertTrue(response['ok'])
+        self.assertEqual(len(response['result']['contacts']), 2)
+        self.assertTrue(response['result']['more'])
+
+    def test_unknown_criteria_fields(self) -> None:
+        for op in ('precise_search', 'delete'):
+            for field in ('filename', 'workers', 'self'):
+                response = self.service.handle({'op': op, 'criteria': {field: 'x'}})
+                self.assertFalse(response['ok'])
+                self.assertIn(field, response['error'])
+        self.assertEqual(self.service.handle({'op': 'count'})['result'], 5)
+
+    def test_criteria(self) -> None:
+        response = self.service.handle({'op': 'precise_search', 'criteria': {'ID': '2'}})
+        self.assertEqual([contact['ID'] for contact in response['result']['contacts']], ['2'])
+        response = self.service.handle({'op': 'delete', 'criteria': {'Личный телефон': '', 'ID': '[12]'}})
+        self.assertEqual(response['result'], {'deleted': 2})
+
+    def test_update_values(self) -> None:
+        for value in ('Иванов,Петров', 'Иванов\nПетров', 'Иванов\r'):
+            response = self.service.handle({'op': 'update', 'ids': ['1'], 'fields': {'Фамилия': value}})
+            self.assertFalse(response['ok'])
+        response = self.service.handle({'op': 'update', 'ids': ['1'], 'fields': {'Фамилия': 'Петров'}})
+        self.assertEqual(response['result'], {'updated': 1, 'conflicts': []})
+        contact = self.service.handle({'op': 'get', 'contact_id': 1})['result']
+        self.assertEqual(contact['Фамилия'], 'Петров')
+
+
+if __name__ == '__main__':
+    unittest.main()
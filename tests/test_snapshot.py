@@ -0,0 +1,96 @@
+"""
+Снимок файла контактов: запись и чтение колонок, проверка актуальности по размеру, времени модификации
+и CRC32 исходного файла.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts_snapshot import MTIME_GRANULARITY_NS, Snapshot, fresh_header, read_header, write_snapshot
+from contacts_store import HEADER, ContactStore
+
+ROWS = [('1', 'Иванов', 'Иван', '', 'ООО "Ромашка"', '+74951234567', ''),
+        ('2', 'Smith', 'John', 'Ёжикович', '', '', '+79161234567'),
+        ('3', '', '', '', '', '', '')]
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        self.snapshot_path = self.path + '.snapshot'
+        self.write_source(ROWS)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_source(self, rows) -> None:
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.writelines(','.join(row) + '\n' for row in rows)
+
+    def signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def test_round_trip(self) -> None:
+        self.assertTrue(write_snapshot(self.snapshot_path, ROWS, 7, self.path, self.signature()))
+        self.assertEqual(read_header(self.snapshot_path)[:3], (3, self.signature()[1], self.signature()[0]))
+        with Snapshot(self.snapshot_path) as snapshot:
+            self.assertEqual(list(zip(*(snapshot.column(column) for column in range(7)))), ROWS)
+        self.assertIsNotNone(fresh_header(self.snapshot_path, self.path, self.signature()))
+
+    def test_empty(self) -> None:
+        self.write_source([])
+        self.assertTrue(write_snapshot(self.snapshot_path, [], 7, self.path, self.signature()))
+        with Snapshot(self.snapshot_path) as snapshot:
+            self.assertEqual(snapshot.rows, 0)
+            self.assertEqual(snapshot.column(0), [])
+
+    def test_source_changed_before_write(self) -> None:
+        signature = self.signature()
+        self.write_source(ROWS[:2])
+        self.assertFalse(write_snapshot(self.snapshot_path, ROWS, 7, self.path, signature))
+        self.assertIsNone(read_header(self.snapshot_path))
+
+    def test_stale_after_append(self) -> None:
+        write_snapshot(self.snapshot_path, ROWS, 7, self.path, self.signature())
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('4,Петров,Петр,,,+74950000004,\n')
+        self.assertIsNone(fresh_header(self.snapshot_path, self.path, self.signature()))
+
+    def test_stale_after_rewrite_in_place(self) -> None:
+        # Файл переписан с тем же размером и временем модификации вскоре после записи снимка
+        mtime_ns, size = self.signature()
+        write_snapshot(self.snapshot_path, ROWS, 7, self.path, (mtime_ns, size))
+        with open(self.path, 'r+', encoding='utf-8') as file:
+            text = file.read().replace('Иванов', 'Петров')
+            file.seek(0)
+            file.write(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+        self.assertEqual(self.signature(), (mtime_ns, size))
+        self.assertIsNone(fresh_header(self.snapshot_path, self.path, self.signature()))
+        self.assertEqual(ContactStore(self.path).get('1').last_name, 'Петров')
+        self.assertEqual(ContactStore(self.path).get('1').last_name, 'Петров')  # Снимок построен заново
+
+    def test_old_source_checked_by_signature(self) -> None:
+        # Файл изменен задолго до записи снимка: CRC32 не пересчитывается, достаточно размера и времени
+        mtime_ns = self.signature()[0] - 10 * MTIME_GRANULARITY_NS
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+        write_snapshot(self.snapshot_path, ROWS, 7, self.path, self.signature())
+        with open(self.path, 'r+', encoding='utf-8') as file:
+            text = file.read().replace('Иванов', 'Петров')
+            file.seek(0)
+            file.write(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+        self.assertIsNotNone(fresh_header(self.snapshot_path, self.path, self.signature()))
+
+    def test_store_count_from_snapshot(self) -> None:
+        self.assertEqual(len(ContactStore(self.path)), 3)
+        self.assertIsNotNone(fresh_header(self.snapshot_path, self.path, self.signature()))
+        self.assertEqual(ContactStore(self.path).count(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Внешняя сортировка дает тот же порядок, что и сортировка в памяти, при любом числе серий и проходов слияния.
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import contacts_sort
+from contacts_display import read_contacts
+from contacts_sort import external_sort, russian_collation, sort_key
+from contacts_storage import close_stores, get_store, migrate, open_storage
+from contacts_store import HEADER, ContactStore
+
+LAST_NAMES = ['Иванов', 'иванов', 'Ёлкин', 'Елкин', 'Алексеев', 'Smith', 'Петров', 'Яковлев', '']
+FIRST_NAMES = ['Иван', 'Анна', 'Ёжик', 'Ежи', 'John', '']
+
+
+class ExternalSortTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        generator = random.Random(7)
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            for contact_id in range(1, 61):
+                # Одинаковые фамилия и имя встречаются много раз: их порядок проверяет устойчивость сортировки
+                file.write(f'{contact_id * 3},{generator.choice(LAST_NAMES)},{generator.choice(FIRST_NAMES)},'
+                           f'Отчество{contact_id},,,\n')
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def expected(self):
+        with russian_collation() as transform:
+            contacts = sorted(ContactStore(self.path).contacts(), key=lambda contact: sort_key(contact, transform))
+        return [(str(position), *contact.values()[1:]) for position, contact in enumerate(contacts, start=1)]
+
+    def assert_sorted(self, filename: str, expected) -> None:
+        self.assertEqual([contact.values() for contact in read_contacts(filename)], expected)
+
+    def test_in_memory(self) -> None:
+        expected = self.expected()
+        self.assertEqual(external_sort(self.path), len(expected))
+        self.assert_sorted(self.path, expected)
+
+    def test_several_runs_and_merge_passes(self) -> None:
+        expected = self.expected()
+        with mock.patch('contacts_sort.MAX_MERGE_FANIN', 3), \
+                mock.patch('contacts_sort._write_run', wraps=contacts_sort._write_run) as write_run:
+            external_sort(self.path, memory_limit=1)  # Каждая запись - отдельная серия
+        paths = [call.args[1] for call in write_run.call_args_list]
+        self.assertEqual(sum(not path.endswith('.merged') for path in paths), len(expected))
+        self.assertTrue(any(path.endswith('.merged.merged') for path in paths))  # Больше одного прохода
+        self.assert_sorted(self.path, expected)
+        self.assertEqual([name for name in os.listdir(self.directory) if name.startswith('.sort-')], [])
+
+    def test_journal_changes_included(self) -> None:
+        store = get_store(self.path)
+        store.update(['3'], {'Фамилия': 'Аааев'})
+        store.delete(['6'])
+        expected = self.expected()
+        external_sort(self.path, memory_limit=1)
+        self.assert_sorted(self.path, expected)
+        self.assertEqual(len(expected), 59)
+        self.assertIn('Аааев', [contact['Фамилия'] for contact in read_contacts(self.path)])
+
+    def test_failure_leaves_file_intact(self) -> None:
+        with open(self.path, 'rb') as file:
+            original = file.read()
+        read_run = contacts_sort._read_run
+        rows_read = 0
+
+        def failing_read_run(path):
+            nonlocal rows_read
+            for row in read_run(path):
+                rows_read += 1
+                if rows_read == 40:  # Часть отсортированных записей уже записана во временный файл
+                    raise OSError("Нет места на диске")
+                yield row
+
+        with mock.patch('contacts_sort._read_run', failing_read_run), self.assertRaises(OSError):
+            external_sort(self.path, memory_limit=2000)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), original)
+        self.assertEqual([name for name in os.listdir(self.directory) if name.startswith('.sort-')], [])
+
+        expected = self.expected()
+        external_sort(self.path, memory_limit=2000)  # Блокировка записи снята
+        self.assert_sorted(self.path, expected)
+
+    def test_sqlite_store(self) -> None:
+        expected = self.expected()
+        db_path = os.path.join(self.directory, 'contacts.db')
+        migrate(self.path, db_path)
+        with mock.patch('contacts_sort.MAX_MERGE_FANIN', 3):
+            self.assertEqual(external_sort(db_path, memory_limit=1), len(expected))
+        self.assertEqual([contact.values() for contact in open_storage(db_path).contacts()], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Добавление контактов с заданным ID: хранилища CSV и SQLite ведут себя одинаково.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts_storage import close_stores, migrate, open_storage
+from contacts_store import HEADER
+
+
+def contact(surname: str, contact_id: str = None):
+    fields = {'Фамилия': surname, 'Имя': 'Иван', 'Отчество': 'Петрович', 'Организация': 'ООО Ромашка',
+              'Рабочий телефон': '+74951234567', 'Личный телефон': ''}
+    if contact_id is not None:
+        fields['ID'] = contact_id
+    return fields
+
+
+class DuplicateIdTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        csv_path = os.path.join(self.directory, 'contacts.csv')
+        with open(csv_path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.write('1,Иванов,Иван,Петрович,ООО Ромашка,+74951234567,\n')
+        db_path = os.path.join(self.directory, 'contacts.db')
+        migrate(csv_path, db_path)
+        self.stores = [open_storage(csv_path), open_storage(db_path)]
+
+    def tearDown(self) -> None:
+        for store in self.stores:
+            store.close()
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_existing_id(self) -> None:
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                with self.assertRaises(ValueError):
+                    store.add([contact('Петров'), contact('Сидоров', '1')])
+                self.assertEqual(len(store), 1)
+                self.assertEqual(store.get('1').last_name, 'Иванов')
+
+    def test_repeated_id(self) -> None:
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                with self.assertRaises(ValueError):
+                    store.add([contact('Петров', '5'), contact('Сидоров', '5')])
+                self.assertEqual(len(store), 1)
+                self.assertEqual(store.add([contact('Петров', '5'), contact('Сидоров')]), (2, 0))
+                self.assertEqual([c.id for c in store.iter_contacts()], ['1', '5', '6'])
+
+    def test_duplicate_content(self) -> None:
+        for store in self.stores:
+            with self.subTest(store=type(store).__name__):
+                self.assertEqual(store.add([contact('Иванов', '1'), contact('Иванов')]), (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Потоковое чтение и поиск выдают те же контакты, что и хранилище, и не загружают файл без необходимости.
+"""
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+from contacts_display import iter_contacts, read_contacts
+from contacts_search import iter_precise_search, iter_quick_search, precise_search, quick_search
+from contacts_storage import close_stores, get_store
+from contacts_store import HEADER, ContactStore
+
+ROWS = [
+    '1,Иванов,Иван,Иванович,ООО Ромашка,+74951234567,',
+    '2,Петрова,Анна,,АО Вектор,,+79161234567',
+    '',
+    '3,Сидоров,Петр,Петрович,ООО Ромашка,+74957654321,',
+    '4,Smith,John,,Acme Corp,+12025550100,',
+]
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.writelines(row + '\n' for row in ROWS)
+
+    def tearDown(self) -> None:
+        close_stores()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_iter_contacts_reads_file_without_loading_store(self) -> None:
+        contacts = iter_contacts(self.path)
+        self.assertIsInstance(contacts, types.GeneratorType)
+        self.assertEqual(list(contacts), ContactStore(self.path).contacts())
+        self.assertFalse(get_store(self.path).loaded)
+        self.assertEqual(read_contacts(self.path), ContactStore(self.path).contacts())
+
+    def test_iter_contacts_applies_journal(self) -> None:
+        store = get_store(self.path)
+        store.update(['2'], {'Имя': 'Мария'})
+        store.delete(['3'])
+        close_stores()
+        self.assertEqual([contact['Имя'] for contact in iter_contacts(self.path)], ['Иван', 'Мария', 'John'])
+
+    def test_search_iterators_match_lists(self) -> None:
+        for term in ['ромашка', 'ПЕТР', '+7', 'нет такого']:
+            with self.subTest(term=term):
+                self.assertEqual(list(iter_quick_search(self.path, term)), quick_search(self.path, term))
+                self.assertEqual(quick_search(self.path, term), ContactStore(self.path).quick_search(term))
+        for criteria in [{'Организация': '^ооо'}, {'ID': '[24]'}, {'Фамилия': 'ов$', 'Имя': '^п'}]:
+            with self.subTest(criteria=criteria):
+                self.assertEqual(list(iter_precise_search(self.path, **criteria)),
+                                 precise_search(self.path, **criteria))
+                self.assertEqual(precise_search(self.path, **criteria),
+                                 ContactStore(self.path).precise_search(**criteria))
+
+    def test_iterator_stops_early(self) -> None:
+        found = iter_quick_search(self.path, 'о')
+        self.assertEqual(next(found)['ID'], '1')
+        found.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
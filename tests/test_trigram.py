@@ -0,0 +1,87 @@
+"""
+Быстрый поиск по индексу триграмм находит те же контакты, что и полный перебор строк файла.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts_store import HEADER, ContactStore, parse_line
+from contacts_trigram import TrigramIndex, trigrams
+
+ROWS = [
+    'Иванов,Иван,Иванович,ООО Ромашка,+74951234567,',
+    'ИВАНОВА,Анна,Сергеевна,АО "Газпром",,+79161234567',
+    'Ёлкин,Пётр,Семёнович,ИП Ёлкин,+74957654321,',
+    'Smith,John,,Acme Corp,+12025550100,',
+    'SMITHSON,Jane,,ACME Inc,,+447700900123',
+    'Петров,Ян,,,+74950000001,',
+    'İnce,Ömer,,Straße GmbH,+49301234567,',
+]
+TERMS = ['иванов', 'ИВАНОВ', 'Иван', 'ан', 'а', '', 'ёлк', 'ЁЛКИН', 'елкин', 'пётр', 'smith', 'SMITH', 'acme',
+         'мит', 'Ян', '+7495', '4567', '0000001', '1', '"газ', 'ООО Ром', 'о р', 'straße', 'STRASSE', 'i̇nce',
+         'ömer', 'нет такого']
+
+
+def full_scan(path: str, term: str):
+    with open(path, encoding='utf-8') as file:
+        next(file)
+        contacts = [contact for contact in map(parse_line, file) if contact is not None]
+    return [contact for contact in contacts if any(term.lower() in value.lower() for value in contact.values())]
+
+
+class TrigramIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.csv')
+        self.write(ROWS)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, rows) -> None:
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + '\n')
+            file.writelines(f'{contact_id},{row}\n' for contact_id, row in enumerate(rows, start=1))
+
+    def assert_parity(self, store: ContactStore) -> None:
+        for term in TERMS:
+            with self.subTest(term=term):
+                self.assertEqual(store.quick_search(term), full_scan(self.path, term))
+
+    def test_same_results_as_full_scan(self) -> None:
+        self.assert_parity(ContactStore(self.path))
+
+    def test_loaded_from_sidecar(self) -> None:
+        len(ContactStore(self.path))
+        self.assertTrue(os.path.exists(self.path + '.trigram'))
+        self.assert_parity(ContactStore(self.path))
+
+    def test_sidecar_rebuilt_after_file_change(self) -> None:
+        len(ContactStore(self.path))
+        self.write(ROWS[:3] + ['Сидоров,Семен,,ООО Иванов и партнеры,+74951112233,'] + ROWS[3:])
+        store = ContactStore(self.path)
+        self.assertEqual([contact.id for contact in store.quick_search('иванов')], ['1', '2', '4'])
+        self.assert_parity(store)
+        self.assert_parity(ContactStore(self.path))
+
+    def test_index_follows_store_changes(self) -> None:
+        store = ContactStore(self.path)
+        store.update(['4'], {'Фамилия': 'Иванов'})
+        store.delete(['1'])
+        store.add([{'Фамилия': 'Иванченко', 'Имя': 'Олег', 'Отчество': '', 'Организация': '',
+                    'Рабочий телефон': '+74953334455', 'Личный телефон': ''}])
+        expected = ['2', '4', '8']
+        self.assertEqual([contact.id for contact in store.quick_search('иван')], expected)
+        self.assertEqual([contact.id for contact in ContactStore(self.path).quick_search('иван')], expected)
+
+    def test_short_terms_are_not_indexed(self) -> None:
+        index = TrigramIndex()
+        index.add(0, ['Ян'])
+        self.assertEqual(trigrams(['Ян']), set())
+        self.assertIsNone(index.candidates('ян'))
+        self.assertEqual(index.candidates('абв'), set())
+
+
+if __name__ == '__main__':
+    unittest.main()